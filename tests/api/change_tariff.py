@@ -1,11 +1,10 @@
 import pytest
-import requests
 from urllib.parse import urljoin
-from api.constants import BASE_URL, MANAGER_PASSWORD, TEST_SUBSCRIBER_ID, MANAGER_LOGIN, TEST_TARIFF_ID
-from api.helpers import get_auth_token
+from tests.api.constants import BASE_URL, TEST_SUBSCRIBER_ID, TEST_TARIFF_ID
+from tests.api.helpers import get_role_token, get_session
 
 def test_change_subscriber_tariff_200():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/subscribers/{TEST_SUBSCRIBER_ID}/tariff")
     headers = {
@@ -16,7 +15,7 @@ def test_change_subscriber_tariff_200():
     payload = {
         "new_tariff_id": TEST_TARIFF_ID
     }
-    response = requests.put(url, headers=headers, json=payload)
+    response = get_session().put(url, headers=headers, json=payload)
     
     assert response.status_code == 200
     data = response.json()
@@ -26,7 +25,7 @@ def test_change_subscriber_tariff_200():
     assert response.elapsed.total_seconds() * 1000 < 500
 
 def test_change_subscriber_tariff_400():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/subscribers/{TEST_SUBSCRIBER_ID}/tariff")
     headers = {
@@ -37,7 +36,7 @@ def test_change_subscriber_tariff_400():
     payload = {
         "new_tariff_id": "wrong value"
     }
-    response = requests.put(url, headers=headers, json=payload)
+    response = get_session().put(url, headers=headers, json=payload)
     
     assert response.status_code == 400
     data = response.json()
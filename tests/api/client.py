@@ -0,0 +1,241 @@
+import base64
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tests.api.constants import (
+    AUTH_PATH, BASE_URL, CONNECT_TIMEOUT, POOL_SIZE, READ_TIMEOUT, REFRESH_PATH, RETRIES, RETRY_BACKOFF,
+    RETRY_STATUSES, ROLE_CREDENTIALS, TOKEN_LIFETIME, TOKEN_REFRESH_MARGIN,
+)
+
+
+class ClientConfig(NamedTuple):
+    """
+    Параметры HTTP клиента.
+
+    pool_size - число соединений с сервером, которые держатся открытыми
+    (keep-alive); retries и retry_backoff - повторы запросов при ошибках
+    соединения и ответах со статусами retry_statuses (POST не повторяется).
+    auth_path, refresh_path, token_lifetime и token_refresh_margin - параметры
+    TokenCache (см. tests.api.constants).
+    """
+    base_url: str = BASE_URL
+    pool_size: int = POOL_SIZE
+    connect_timeout: float = CONNECT_TIMEOUT
+    read_timeout: float = READ_TIMEOUT
+    retries: int = RETRIES
+    retry_backoff: float = RETRY_BACKOFF
+    retry_statuses: Tuple[int, ...] = RETRY_STATUSES
+    auth_path: str = AUTH_PATH
+    refresh_path: str = REFRESH_PATH
+    token_lifetime: float = TOKEN_LIFETIME
+    token_refresh_margin: float = TOKEN_REFRESH_MARGIN
+
+
+class Token(NamedTuple):
+    """Токены роли и момент истечения access_token (секунды эпохи)."""
+    access_token: str
+    refresh_token: Optional[str]
+    expires_at: float
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    """HTTPAdapter с таймаутом по умолчанию для запросов, где он не указан."""
+
+    def __init__(self, timeout: Tuple[float, float], **kwargs: Any):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(config: ClientConfig = ClientConfig()) -> requests.Session:
+    """
+    Создает сессию с пулом соединений, таймаутами и повторами запросов.
+
+    Args:
+        config (ClientConfig): Параметры клиента
+
+    Returns:
+        requests.Session: Сессия, переиспользующая соединения между запросами
+    """
+    retry = Retry(
+        total=config.retries,
+        backoff_factor=config.retry_backoff,
+        status_forcelist=config.retry_statuses,
+        raise_on_status=False,
+    )
+    adapter = _TimeoutAdapter(
+        (config.connect_timeout, config.read_timeout),
+        pool_connections=config.pool_size,
+        pool_maxsize=config.pool_size,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class TokenCache:
+    """
+    Кэш токенов авторизации по ролям (subscriber, manager, admin).
+
+    Токен роли запрашивается через /auth один раз и переиспользуется до
+    истечения срока действия; истекающий токен обновляется по refresh_token,
+    а если обновить не удалось - запрашивается заново. Без срока действия
+    в ответе и в токене токен считается действующим token_lifetime секунд.
+    """
+
+    def __init__(self,
+                 session: requests.Session,
+                 base_url: str = BASE_URL,
+                 credentials: Optional[Dict[str, Dict[str, str]]] = None,
+                 clock: Callable[[], float] = time.time,
+                 auth_path: str = AUTH_PATH,
+                 refresh_path: str = REFRESH_PATH,
+                 token_lifetime: float = TOKEN_LIFETIME,
+                 refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        self.session = session
+        self.base_url = base_url
+        self.credentials = ROLE_CREDENTIALS if credentials is None else credentials
+        self.clock = clock
+        self.auth_path = auth_path
+        self.refresh_path = refresh_path
+        self.token_lifetime = token_lifetime
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[str, Token] = {}
+        self._lock = threading.Lock()
+
+    def get(self, role: str) -> str:
+        """
+        Возвращает действующий access_token роли.
+
+        Args:
+            role (str): Роль (ключ credentials)
+
+        Returns:
+            str: access_token
+        """
+        if role not in self.credentials:
+            raise ValueError(f"Неизвестная роль: {role}")
+        with self._lock:
+            token = self._tokens.get(role)
+            if token is None or token.expires_at - self.refresh_margin <= self.clock():
+                refreshed = self._refresh(token.refresh_token) if token and token.refresh_token else None
+                token = refreshed or self._login(role)
+                self._tokens[role] = token
+            return token.access_token
+
+    def invalidate(self, role: Optional[str] = None) -> None:
+        """Сбрасывает токен роли (или все токены), например после ответа 401."""
+        with self._lock:
+            if role is None:
+                self._tokens.clear()
+            else:
+                self._tokens.pop(role, None)
+
+    def _login(self, role: str) -> Token:
+        response = self.session.post(urljoin(self.base_url, self.auth_path), json=self.credentials[role])
+        response.raise_for_status()
+        return self._token(response.json())
+
+    def _refresh(self, refresh_token: str) -> Optional[Token]:
+        response = self.session.post(urljoin(self.base_url, self.refresh_path), json={"refresh_token": refresh_token})
+        if response.status_code != 200:
+            return None
+        return self._token(response.json())
+
+    def _token(self, data: Dict[str, Any]) -> Token:
+        access_token = data["access_token"]
+        if "expires_in" in data:
+            expires_at = self.clock() + float(data["expires_in"])
+        else:
+            expires_at = _jwt_expiration(access_token) or self.clock() + self.token_lifetime
+        return Token(access_token, data.get("refresh_token"), expires_at)
+
+
+class ApiClient:
+    """
+    Общий клиент API биллинга: сессия с пулом соединений и кэш токенов по ролям.
+
+    Пример:
+        client = ApiClient()
+        response = client.get(f"/subscribers/{subscriber_id}/balance", role="manager")
+    """
+
+    def __init__(self, config: ClientConfig = ClientConfig()):
+        self.config = config
+        self.session = create_session(config)
+        self.tokens = TokenCache(self.session, config.base_url, auth_path=config.auth_path,
+                                 refresh_path=config.refresh_path, token_lifetime=config.token_lifetime,
+                                 refresh_margin=config.token_refresh_margin)
+
+    def url(self, path: str) -> str:
+        return urljoin(self.config.base_url, path)
+
+    def request(self, method: str, path: str, role: Optional[str] = None, **kwargs: Any) -> requests.Response:
+        """
+        Выполняет запрос; с role добавляет заголовок Authorization с токеном роли.
+
+        На ответ 401 токен роли запрашивается заново и запрос повторяется один раз.
+
+        Args:
+            method (str): HTTP метод
+            path (str): Путь относительно base_url
+            role (str, optional): Роль, от имени которой выполняется запрос
+            **kwargs: Параметры requests.Session.request (json, headers, timeout и т.д.)
+
+        Returns:
+            requests.Response: Ответ сервера
+        """
+        if role is None:
+            return self.session.request(method, self.url(path), **kwargs)
+        headers = kwargs.pop("headers", None) or {}
+        response = self._authorized(method, path, role, headers, kwargs)
+        if response.status_code == 401:
+            self.tokens.invalidate(role)
+            response = self._authorized(method, path, role, headers, kwargs)
+        return response
+
+    def get(self, path: str, role: Optional[str] = None, **kwargs: Any) -> requests.Response:
+        return self.request("GET", path, role, **kwargs)
+
+    def post(self, path: str, role: Optional[str] = None, **kwargs: Any) -> requests.Response:
+        return self.request("POST", path, role, **kwargs)
+
+    def put(self, path: str, role: Optional[str] = None, **kwargs: Any) -> requests.Response:
+        return self.request("PUT", path, role, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> 'ApiClient':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _authorized(self, method: str, path: str, role: str, headers: Dict[str, str],
+                    kwargs: Dict[str, Any]) -> requests.Response:
+        headers = {**headers, "Authorization": f"Bearer {self.tokens.get(role)}"}
+        return self.session.request(method, self.url(path), headers=headers, **kwargs)
+
+
+def _jwt_expiration(token: str) -> Optional[float]:
+    """Срок действия из поля exp JWT токена (без проверки подписи)."""
+    try:
+        payload = token.split(".")[1]
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(data["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
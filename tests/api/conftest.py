@@ -0,0 +1,59 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _BillingStub(BaseHTTPRequestHandler):
+    """Локальная заглушка API: /auth, /auth/refresh и остальные GET/POST запросы с проверкой токена."""
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    logins = 0
+    refreshes = 0
+    token = None
+    expires_in = 3600
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_POST(self):
+        stub = type(self)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/auth":
+            stub.logins += 1
+        elif self.path == "/auth/refresh":
+            stub.refreshes += 1
+        else:
+            return self.do_GET()
+        stub.token = f"access-{stub.logins}-{stub.refreshes}"
+        self._reply(200, {"access_token": stub.token, "refresh_token": "refresh-token", "expires_in": stub.expires_in})
+
+    def do_GET(self):
+        if self.headers.get("Authorization") != f"Bearer {type(self).token}":
+            return self._reply(401, {})
+        self._reply(200, {"balance": 100.0})
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def billing_stub():
+    stub = type("BillingStub", (_BillingStub,), {})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield stub, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
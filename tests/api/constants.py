@@ -15,4 +15,32 @@ MANAGER_LOGIN = "login"
 MANAGER_PASSWORD = "password"
 
 ADMIN_LOGIN = "login"
-ADMIN_PASSWORD = "password"
\ No newline at end of file
+ADMIN_PASSWORD = "password"
+
+ROLE_CREDENTIALS = {
+    "subscriber": {"login": SUBSCRIBER_LOGIN, "password": SUBSCRIBER_PASSWORD},
+    "manager": {"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD},
+    "admin": {"login": ADMIN_LOGIN, "password": ADMIN_PASSWORD},
+}
+
+# Авторизация: значения по умолчанию для ClientConfig, для другого сервера задаются в нем.
+# Если путь обновления токена не поддерживается, токен запрашивается заново через AUTH_PATH;
+# TOKEN_LIFETIME используется, только если срока действия нет ни в ответе (expires_in), ни в JWT (exp)
+AUTH_PATH = "/auth"
+REFRESH_PATH = "/auth/refresh"
+TOKEN_LIFETIME = 300  # секунд
+TOKEN_REFRESH_MARGIN = 10  # секунд до истечения, когда токен уже обновляется
+
+# Пул соединений и повторы запросов
+POOL_SIZE = 10
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10.0
+RETRIES = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = (502, 503, 504)
+
+# Замеры задержки: прогревочные запросы, число замеров и SLO (перцентиль -> предел в мс)
+LATENCY_WARMUP = 5
+LATENCY_SAMPLES = 50
+LATENCY_SLO = {50: 200, 99: 500}
+LATENCY_RESULTS_PATH = "latency-results/latency.jsonl"
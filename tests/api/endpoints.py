@@ -0,0 +1,30 @@
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from tests.api.constants import AUTH_PATH, ROLE_CREDENTIALS, TEST_CALL_ID, TEST_SUBSCRIBER_ID
+
+
+class Endpoint(NamedTuple):
+    """
+    Запрос к API биллинга, как его отправляют тесты tests/api.
+
+    role - роль, токен которой передается в заголовке Authorization
+    (None - без авторизации); expected_statuses - коды успешного ответа.
+    """
+    name: str
+    method: str
+    path: str
+    role: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    expected_statuses: Tuple[int, ...] = (200,)
+
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    endpoint.name: endpoint for endpoint in (
+        Endpoint("auth", "POST", AUTH_PATH, payload=ROLE_CREDENTIALS["subscriber"]),
+        Endpoint("balance", "GET", f"/subscribers/{TEST_SUBSCRIBER_ID}/balance", role="manager"),
+        Endpoint("tariff", "GET", f"/subscribers/{TEST_SUBSCRIBER_ID}/tariff", role="manager"),
+        Endpoint("call", "GET", f"/calls/{TEST_CALL_ID}", role="manager"),
+        Endpoint("notification", "POST", f"/notifications/{TEST_SUBSCRIBER_ID}", role="manager",
+                 payload={"type": "limit_100"}),
+    )
+}
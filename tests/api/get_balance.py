@@ -1,69 +1,73 @@
 import pytest
-import requests
 from urllib.parse import urljoin
 
-from tests.api.constants import BASE_URL, MANAGER_LOGIN, MANAGER_PASSWORD, SUBSCRIBER_LOGIN, SUBSCRIBER_PASSWORD, TEST_SUBSCRIBER_ID
-from tests.api.helpers import get_auth_token
+from tests.api.constants import BASE_URL, TEST_SUBSCRIBER_ID
+from tests.api.endpoints import ENDPOINTS
+from tests.api.helpers import get_client, get_role_token, get_session
+from tests.api.latency import check_latency_slo
 
 def test_get_subscriber_balance_by_manager_200():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/subscribers/{TEST_SUBSCRIBER_ID}/balance")
     headers = {
         "Accept": "application/json",
         "Authorization": f"Bearer {token}"
     }
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
     
     assert response.status_code == 200
     balance = response.json().get("balance")
     assert isinstance(balance, (int, float))
-    assert response.elapsed.total_seconds() * 1000 < 500
+    check_latency_slo(ENDPOINTS["balance"], get_client())
 
 def test_get_subscriber_balance_by_manager_400():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/subscribers/{'any_value'}/balance")
     headers = {
         "Accept": "application/json",
         "Authorization": f"Bearer {token}"
     }
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
     
     assert response.status_code == 400
     balance = response.json().get("balance")
     assert isinstance(balance, (int, float))
-    assert response.elapsed.total_seconds() * 1000 < 500
+    check_latency_slo(ENDPOINTS["balance"]._replace(name="balance_400", path="/subscribers/any_value/balance",
+                                                 expected_statuses=(400,)), get_client())
 
 def test_get_subscriber_balance_by_subscriber_200():
-    token = get_auth_token({"login": SUBSCRIBER_LOGIN, "password": SUBSCRIBER_PASSWORD})
+    token = get_role_token("subscriber")
     
     url = urljoin(BASE_URL, f"/subscribers/{TEST_SUBSCRIBER_ID}/balance")
     headers = {
         "Accept": "application/json",
         "Authorization": f"Bearer {token}"
     }
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
     
     assert response.status_code == 200
     balance = response.json().get("balance")
     assert isinstance(balance, (int, float))
-    assert response.elapsed.total_seconds() * 1000 < 500
+    check_latency_slo(ENDPOINTS["balance"]._replace(name="balance_subscriber", role="subscriber"), get_client())
 
 def test_get_subscriber_balance_by_subscriber_400():
-    token = get_auth_token({"login": SUBSCRIBER_LOGIN, "password": SUBSCRIBER_PASSWORD})
+    token = get_role_token("subscriber")
     
     url = urljoin(BASE_URL, f"/subscribers/{'wrong_id'}/balance")
     headers = {
         "Accept": "application/json",
         "Authorization": f"Bearer {token}"
     }
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
     
     assert response.status_code == 400
     balance = response.json().get("balance")
     assert isinstance(balance, (int, float))
-    assert response.elapsed.total_seconds() * 1000 < 500
+    check_latency_slo(ENDPOINTS["balance"]._replace(name="balance_subscriber_400", role="subscriber",
+                                                 path="/subscribers/wrong_id/balance", expected_statuses=(400,)),
+                      get_client())
 
 test_get_subscriber_balance_by_manager_200()
 test_get_subscriber_balance_by_manager_400()
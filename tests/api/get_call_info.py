@@ -1,37 +1,39 @@
 import pytest
-import requests
 from urllib.parse import urljoin
 
-from tests.api.constants import BASE_URL, MANAGER_LOGIN, MANAGER_PASSWORD, TEST_CALL_ID
-from tests.api.helpers import get_auth_token
+from tests.api.constants import BASE_URL, TEST_CALL_ID
+from tests.api.endpoints import ENDPOINTS
+from tests.api.helpers import get_client, get_role_token, get_session
+from tests.api.latency import check_latency_slo
 
 def test_get_call_info_200():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/calls/{TEST_CALL_ID}")
     headers = {
         "Accept": "application/json",
         "Authorization": f"Bearer {token}"
     }
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
     
     assert response.status_code == 200
     assert len(response.content) > 0
-    assert response.elapsed.total_seconds() * 1000 < 500
+    check_latency_slo(ENDPOINTS["call"], get_client())
 
 def test_get_call_info_400():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/calls/{'wrong value'}")
     headers = {
         "Accept": "application/json",
         "Authorization": f"Bearer {token}"
     }
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
     
     assert response.status_code == 400
     assert len(response.content) > 0
-    assert response.elapsed.total_seconds() * 1000 < 500
+    check_latency_slo(ENDPOINTS["call"]._replace(name="call_400", path="/calls/wrong value", expected_statuses=(400,)),
+                      get_client())
 
 test_get_call_info_200()
 test_get_call_info_400()
\ No newline at end of file
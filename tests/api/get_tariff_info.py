@@ -1,43 +1,45 @@
 import pytest
-import requests
 from urllib.parse import urljoin
 
-from tests.api.constants import BASE_URL, MANAGER_LOGIN, MANAGER_PASSWORD, TEST_SUBSCRIBER_ID
-from tests.api.helpers import get_auth_token
+from tests.api.constants import BASE_URL, TEST_SUBSCRIBER_ID
+from tests.api.endpoints import ENDPOINTS
+from tests.api.helpers import get_client, get_role_token, get_session
+from tests.api.latency import check_latency_slo
 
 def test_get_subscriber_tariff_200():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/subscribers/{TEST_SUBSCRIBER_ID}/tariff")
     headers = {
         "Accept": "application/json",
         "Authorization": f"Bearer {token}"
     }
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
     
     assert response.status_code == 200
     data = response.json()
     assert "tariff_name" in data
     assert isinstance(data["tariff_name"], str)
     assert len(data["tariff_name"].strip()) > 0
-    assert response.elapsed.total_seconds() * 1000 < 500
+    check_latency_slo(ENDPOINTS["tariff"], get_client())
 
 def test_get_subscriber_tariff_400():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/subscribers/{'any_value'}/tariff")
     headers = {
         "Accept": "application/json",
         "Authorization": f"Bearer {token}"
     }
-    response = requests.get(url, headers=headers)
+    response = get_session().get(url, headers=headers)
     
     assert response.status_code == 400
     data = response.json()
     assert "tariff_name" in data
     assert isinstance(data["tariff_name"], str)
     assert len(data["tariff_name"].strip()) > 0
-    assert response.elapsed.total_seconds() * 1000 < 500
+    check_latency_slo(ENDPOINTS["tariff"]._replace(name="tariff_400", path="/subscribers/any_value/tariff",
+                                                expected_statuses=(400,)), get_client())
 
 test_get_subscriber_tariff_200()
 test_get_subscriber_tariff_400()
\ No newline at end of file
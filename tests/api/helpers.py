@@ -1,9 +1,33 @@
+from typing import Dict, Optional
+
 import requests
-from urllib.parse import urljoin
 
-from api.constants import BASE_URL
+from tests.api.client import ApiClient
+from tests.api.constants import AUTH_PATH
+
+_client: Optional[ApiClient] = None
+
+
+def get_client() -> ApiClient:
+    """Общий для всех тестов API клиент (пул соединений и кэш токенов)."""
+    global _client
+    if _client is None:
+        _client = ApiClient()
+    return _client
+
+
+def get_session() -> requests.Session:
+    """Сессия общего клиента: запросы через нее переиспользуют соединения."""
+    return get_client().session
+
+
+def get_role_token(role: str) -> str:
+    """Кэшированный access_token роли (subscriber, manager, admin)."""
+    return get_client().tokens.get(role)
+
 
-def get_auth_token(credentials):
-    url = urljoin(BASE_URL, "/auth")
-    response = requests.post(url, json=credentials)
-    return response.json()["access_token"]
\ No newline at end of file
+def get_auth_token(credentials: Dict[str, str]) -> str:
+    """Новый access_token по логину и паролю (без кэширования)."""
+    client = get_client()
+    response = client.session.post(client.url(AUTH_PATH), json=credentials)
+    return response.json()["access_token"]
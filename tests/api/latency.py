@@ -0,0 +1,144 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from tests.api.client import ApiClient
+from tests.api.constants import LATENCY_RESULTS_PATH, LATENCY_SAMPLES, LATENCY_SLO, LATENCY_WARMUP
+from tests.api.endpoints import Endpoint
+from tests.benchmarks.suite import percentile
+
+
+class LatencySamples(NamedTuple):
+    """
+    Замеры задержки одного endpoint.
+
+    samples_ms - задержки в миллисекундах в порядке измерения, statuses -
+    коды ответов тех же запросов.
+    """
+    name: str
+    samples_ms: List[float]
+    statuses: List[int]
+
+    def percentile(self, q: float) -> float:
+        return percentile(self.samples_ms, q)
+
+    def to_dict(self, slo: Dict[float, float]) -> Dict[str, Any]:
+        return {
+            "endpoint": self.name,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "samples": len(self.samples_ms),
+            "percentiles_ms": {f"p{q}": self.percentile(q) for q in sorted(slo)},
+            "slo_ms": {f"p{q}": limit for q, limit in sorted(slo.items())},
+            "samples_ms": self.samples_ms,
+            "statuses": self.statuses,
+        }
+
+
+def measure_latency(name: str,
+                    send: Callable[[], Any],
+                    samples: int = LATENCY_SAMPLES,
+                    warmup: int = LATENCY_WARMUP,
+                    clock: Callable[[], int] = time.perf_counter_ns) -> LatencySamples:
+    """
+    Измеряет задержку запроса по серии замеров.
+
+    Первые warmup запросов не учитываются: на них открывается соединение
+    пула и запрашивается токен. Время замеряется монотонными часами с
+    наносекундным разрешением.
+
+    Args:
+        name (str): Имя endpoint
+        send (Callable[[], Any]): Функция, отправляющая запрос и возвращающая ответ
+        samples (int): Количество замеров
+        warmup (int): Количество прогревочных запросов
+        clock (Callable[[], int]): Часы в наносекундах
+
+    Returns:
+        LatencySamples: Замеры
+    """
+    if samples < 1:
+        raise ValueError("Количество замеров должно быть положительным")
+    for _ in range(warmup):
+        send()
+    samples_ms = []
+    statuses = []
+    for _ in range(samples):
+        started = clock()
+        response = send()
+        samples_ms.append((clock() - started) / 1e6)
+        statuses.append(getattr(response, "status_code", 0))
+    return LatencySamples(name, samples_ms, statuses)
+
+
+def measure_endpoint(endpoint: Endpoint, client: ApiClient, **options: Any) -> LatencySamples:
+    """Измеряет задержку endpoint из tests/api/endpoints.py (см. measure_latency)."""
+    return measure_latency(
+        endpoint.name,
+        lambda: client.request(endpoint.method, endpoint.path, endpoint.role, json=endpoint.payload),
+        **options,
+    )
+
+
+def assert_latency_slo(measurement: LatencySamples, slo: Optional[Dict[float, float]] = None) -> None:
+    """
+    Проверяет перцентили задержки по SLO.
+
+    Args:
+        measurement (LatencySamples): Замеры
+        slo (Dict[float, float], optional): Перцентиль -> предел в мс (по умолчанию LATENCY_SLO)
+
+    Raises:
+        AssertionError: Если какой-либо перцентиль превышает предел
+    """
+    slo = LATENCY_SLO if slo is None else slo
+    violations = [
+        f"p{q} = {measurement.percentile(q):.1f} мс >= {limit} мс"
+        for q, limit in sorted(slo.items())
+        if measurement.percentile(q) >= limit
+    ]
+    assert not violations, f"{measurement.name}: нарушен SLO задержки ({', '.join(violations)})"
+
+
+def save_samples(measurement: LatencySamples,
+                 slo: Optional[Dict[float, float]] = None,
+                 path: str = LATENCY_RESULTS_PATH) -> None:
+    """
+    Дописывает замеры в файл JSON Lines для отслеживания задержек между запусками.
+
+    Args:
+        measurement (LatencySamples): Замеры
+        slo (Dict[float, float], optional): SLO, перцентили которого сохраняются
+        path (str): Путь к файлу
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(measurement.to_dict(LATENCY_SLO if slo is None else slo), ensure_ascii=False) + '\n')
+
+
+def check_latency_slo(endpoint: Endpoint,
+                      client: ApiClient,
+                      slo: Optional[Dict[float, float]] = None,
+                      path: Optional[str] = LATENCY_RESULTS_PATH,
+                      **options: Any) -> LatencySamples:
+    """
+    Измеряет задержку endpoint, сохраняет замеры и проверяет SLO.
+
+    Args:
+        endpoint (Endpoint): Endpoint
+        client (ApiClient): Клиент API
+        slo (Dict[float, float], optional): Перцентиль -> предел в мс
+        path (str, optional): Файл для замеров (None - не сохранять)
+        **options: Параметры measure_latency (samples, warmup)
+
+    Returns:
+        LatencySamples: Замеры
+    """
+    measurement = measure_endpoint(endpoint, client, **options)
+    if path is not None:
+        save_samples(measurement, slo, path)
+    assert_latency_slo(measurement, slo)
+    return measurement
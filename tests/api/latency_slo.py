@@ -0,0 +1,32 @@
+import itertools
+import json
+
+import pytest
+
+from tests.api.client import ApiClient, ClientConfig
+from tests.api.endpoints import ENDPOINTS
+from tests.api.latency import LatencySamples, assert_latency_slo, check_latency_slo, measure_latency
+
+
+def test_latency_slo_percentiles_and_export(billing_stub, tmp_path):
+    stub, base_url = billing_stub
+    path = tmp_path / "latency.jsonl"
+    with ApiClient(ClientConfig(base_url=base_url)) as client:
+        measurement = check_latency_slo(ENDPOINTS["balance"], client, {99: 500}, str(path), samples=20, warmup=2)
+
+    assert len(measurement.samples_ms) == 20
+    assert set(measurement.statuses) == {200}
+    assert stub.connections == 1
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["endpoint"] == "balance"
+    assert saved["samples_ms"] == measurement.samples_ms
+    assert saved["slo_ms"] == {"p99": 500}
+
+    # 99 замеров по 1 мс и один в 1 с: медиана в норме, p99.9 - нет
+    ticks = itertools.accumulate([0] + [1_000_000, 0] * 99 + [1_000_000_000, 0])
+    measurement = measure_latency("stub", lambda: None, samples=100, warmup=0, clock=lambda: next(ticks))
+    assert measurement.percentile(50) == 1.0
+    assert_latency_slo(measurement, {50: 2, 99: 2})
+    with pytest.raises(AssertionError, match="p99.9 = 1000.0"):
+        assert_latency_slo(measurement, {50: 2, 99.9: 500})
+    assert measurement == LatencySamples("stub", [1.0] * 99 + [1000.0], [0] * 100)
@@ -0,0 +1,239 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from tests.api.client import ApiClient, ClientConfig
+from tests.api.endpoints import ENDPOINTS, Endpoint
+from tests.benchmarks.suite import percentile
+
+LOAD_PERCENTILES = (50, 95, 99, 99.9)
+# По умолчанию нагружаются только читающие endpoints: notification отправляет абоненту SMS
+DEFAULT_LOAD_ENDPOINTS = ("balance", "tariff", "call")
+OPEN_LOOP = "open"
+CLOSED_LOOP = "closed"
+
+
+class LoadProfile(NamedTuple):
+    """
+    Профиль нагрузки.
+
+    В открытом цикле (open) запросы отправляются с частотой rps независимо от
+    ответов сервера; частота линейно растет от нуля до rps за ramp_up секунд.
+    В закрытом цикле (closed) concurrency пользователей отправляют запросы
+    друг за другом с паузой think_time; пользователи подключаются равномерно
+    за ramp_up секунд. concurrency ограничивает число одновременных запросов
+    в обоих режимах.
+    """
+    mode: str = OPEN_LOOP
+    rps: float = 10.0
+    concurrency: int = 10
+    duration: float = 10.0
+    ramp_up: float = 0.0
+    think_time: float = 0.0
+
+
+class EndpointLoad:
+    """Замеры одного endpoint: задержки успешных и неуспешных запросов и число ошибок."""
+
+    __slots__ = ('latencies', 'errors')
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        requests = len(self.latencies)
+        result = {
+            "requests": requests,
+            "errors": self.errors,
+            "error_rate": self.errors / requests if requests else 0.0,
+            "throughput_rps": requests / seconds if seconds else 0.0,
+        }
+        for q in LOAD_PERCENTILES:
+            result[f"p{q}_ms"] = percentile(self.latencies, q) * 1000 if requests else None
+        return result
+
+
+class LoadReport:
+    """Результат нагрузочного прогона по endpoint."""
+
+    def __init__(self, profile: LoadProfile, endpoints: Sequence[Endpoint]):
+        self.profile = profile
+        self.endpoints: Dict[str, EndpointLoad] = {endpoint.name: EndpointLoad() for endpoint in endpoints}
+        self.seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "profile": self.profile._asdict(),
+            "seconds": self.seconds,
+            "endpoints": {name: load.summary(self.seconds) for name, load in self.endpoints.items()},
+        }
+
+    def format_table(self) -> str:
+        """Форматирует результаты таблицей по endpoint."""
+        lines = [
+            f"{'endpoint':>14} {'запросов':>9} {'ошибки,%':>9} {'запросов/с':>11} "
+            + " ".join(f"{f'p{q}, мс':>10}" for q in LOAD_PERCENTILES)
+        ]
+        for name, load in self.endpoints.items():
+            summary = load.summary(self.seconds)
+            percentiles = " ".join(
+                f"{summary[f'p{q}_ms']:>10.1f}" if summary[f'p{q}_ms'] is not None else f"{'-':>10}"
+                for q in LOAD_PERCENTILES
+            )
+            lines.append(
+                f"{name:>14} {summary['requests']:>9} {summary['error_rate'] * 100:>9.2f} "
+                f"{summary['throughput_rps']:>11.1f} {percentiles}"
+            )
+        return '\n'.join(lines)
+
+
+class LoadGenerator:
+    """
+    Нагрузочный генератор для API биллинга на asyncio.
+
+    Запросы отправляются общим ApiClient (пул соединений, кэш токенов) в пуле
+    из concurrency потоков, а asyncio планирует их отправку по профилю.
+    Endpoints чередуются по кругу. Задержка в открытом цикле считается от
+    запланированного момента отправки, поэтому ожидание свободного потока
+    при перегрузке сервера тоже попадает в замер.
+    """
+
+    def __init__(self,
+                 endpoints: Sequence[Endpoint],
+                 profile: LoadProfile,
+                 client: Optional[ApiClient] = None):
+        if profile.mode not in (OPEN_LOOP, CLOSED_LOOP):
+            raise ValueError(f"Неизвестный режим нагрузки: {profile.mode}")
+        if not endpoints:
+            raise ValueError("Не заданы endpoints")
+        self.endpoints = list(endpoints)
+        self.profile = profile
+        self.client = client or ApiClient(ClientConfig(pool_size=profile.concurrency, retries=0))
+
+    async def run(self) -> LoadReport:
+        """Выполняет прогон и возвращает отчет."""
+        report = LoadReport(self.profile, self.endpoints)
+        # Токены запрашиваются до прогона, чтобы /auth не попадал в замеры других endpoints
+        for role in {endpoint.role for endpoint in self.endpoints if endpoint.role}:
+            self.client.tokens.get(role)
+
+        with ThreadPoolExecutor(max_workers=self.profile.concurrency) as executor:
+            started = time.perf_counter()
+            if self.profile.mode == OPEN_LOOP:
+                await self._open_loop(executor, report, started)
+            else:
+                await self._closed_loop(executor, report, started)
+            report.seconds = time.perf_counter() - started
+        return report
+
+    async def _open_loop(self, executor: ThreadPoolExecutor, report: LoadReport, started: float) -> None:
+        endpoints = itertools.cycle(self.endpoints)
+        tasks = []
+        for offset in arrival_offsets(self.profile.rps, self.profile.duration, self.profile.ramp_up):
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self._send(executor, next(endpoints), report, scheduled)))
+        await asyncio.gather(*tasks)
+
+    async def _closed_loop(self, executor: ThreadPoolExecutor, report: LoadReport, started: float) -> None:
+        deadline = started + self.profile.duration
+        users = self.profile.concurrency
+
+        async def user(index: int) -> None:
+            await asyncio.sleep(self.profile.ramp_up * index / users)
+            endpoints = itertools.islice(itertools.cycle(self.endpoints), index, None)
+            while time.perf_counter() < deadline:
+                await self._send(executor, next(endpoints), report, time.perf_counter())
+                if self.profile.think_time:
+                    await asyncio.sleep(self.profile.think_time)
+
+        await asyncio.gather(*(user(index) for index in range(users)))
+
+    async def _send(self, executor: ThreadPoolExecutor, endpoint: Endpoint, report: LoadReport,
+                    scheduled: float) -> None:
+        loop = asyncio.get_running_loop()
+        ok = await loop.run_in_executor(executor, self._request, endpoint)
+        load = report.endpoints[endpoint.name]
+        load.latencies.append(time.perf_counter() - scheduled)
+        if not ok:
+            load.errors += 1
+
+    def _request(self, endpoint: Endpoint) -> bool:
+        try:
+            response = self.client.request(endpoint.method, endpoint.path, endpoint.role, json=endpoint.payload)
+        except Exception:
+            return False
+        return response.status_code in endpoint.expected_statuses
+
+
+def arrival_offsets(rps: float, duration: float, ramp_up: float = 0.0) -> Iterator[float]:
+    """
+    Моменты отправки запросов (секунды от начала) в открытом цикле.
+
+    Частота растет линейно от 0 до rps за ramp_up секунд, затем постоянна;
+    k-й запрос отправляется, когда ожидаемое число запросов достигает k.
+
+    Args:
+        rps (float): Целевая частота запросов в секунду
+        duration (float): Длительность прогона с учетом разгона
+        ramp_up (float): Длительность разгона
+
+    Returns:
+        Iterator[float]: Возрастающие моменты отправки
+    """
+    if rps <= 0:
+        raise ValueError("Частота запросов должна быть положительной")
+    ramp_up = min(ramp_up, duration)
+    ramp_requests = rps * ramp_up / 2
+    for k in itertools.count(1):
+        if k <= ramp_requests:
+            offset = math.sqrt(2 * ramp_up * k / rps)
+        else:
+            offset = ramp_up + (k - ramp_requests) / rps
+        if offset > duration:
+            return
+        yield offset
+
+
+def run_load(endpoints: Sequence[Endpoint], profile: LoadProfile, client: Optional[ApiClient] = None) -> LoadReport:
+    """Выполняет нагрузочный прогон (см. LoadGenerator)."""
+    return asyncio.run(LoadGenerator(endpoints, profile, client).run())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Нагрузка на endpoints API биллинга")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=list(DEFAULT_LOAD_ENDPOINTS),
+                        help="Endpoints для нагрузки (по умолчанию - balance, tariff, call)")
+    parser.add_argument("--mode", choices=(OPEN_LOOP, CLOSED_LOOP), default=OPEN_LOOP)
+    parser.add_argument("--rps", type=float, default=10.0, help="Целевая частота запросов (открытый цикл)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность прогона, с")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Длительность разгона, с")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Пауза пользователя (закрытый цикл), с")
+    parser.add_argument("--base-url", help="Адрес API (по умолчанию - BASE_URL)")
+    parser.add_argument("--output", help="Сохранить отчет в JSON")
+    args = parser.parse_args(argv)
+
+    profile = LoadProfile(args.mode, args.rps, args.concurrency, args.duration, args.ramp_up, args.think_time)
+    # Повторы запросов скрыли бы ошибки и исказили задержки
+    config = ClientConfig(pool_size=args.concurrency, retries=0)
+    if args.base_url:
+        config = config._replace(base_url=args.base_url)
+    with ApiClient(config) as client:
+        report = run_load([ENDPOINTS[name] for name in args.endpoints], profile, client)
+    print(report.format_table())
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
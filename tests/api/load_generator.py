@@ -0,0 +1,32 @@
+import pytest
+
+from tests.api.client import ApiClient, ClientConfig
+from tests.api.endpoints import ENDPOINTS, Endpoint
+from tests.api.load import CLOSED_LOOP, OPEN_LOOP, LoadProfile, arrival_offsets, run_load
+
+
+def test_load_generator_open_and_closed_loop(billing_stub):
+    stub, base_url = billing_stub
+    endpoints = [ENDPOINTS["balance"], ENDPOINTS["notification"], Endpoint("tariff_change", "PUT", "/tariff")]
+    offsets = list(arrival_offsets(rps=100, duration=1.0, ramp_up=0.5))
+    # 25 запросов за разгон и 50 после него
+    assert len(offsets) == 75
+    assert offsets == sorted(offsets)
+
+    with ApiClient(ClientConfig(base_url=base_url, pool_size=4, retries=0)) as client:
+        report = run_load(endpoints, LoadProfile(OPEN_LOOP, rps=100, concurrency=4, duration=1.0, ramp_up=0.5),
+                          client)
+        summary = report.to_dict()["endpoints"]
+        assert sum(endpoint["requests"] for endpoint in summary.values()) == 75
+        assert summary["balance"]["error_rate"] == 0.0
+        assert summary["notification"]["error_rate"] == 0.0
+        assert summary["tariff_change"]["error_rate"] == 1.0
+        assert summary["balance"]["p50_ms"] <= summary["balance"]["p99.9_ms"]
+
+        report = run_load(endpoints[:2], LoadProfile(CLOSED_LOOP, concurrency=2, duration=0.3), client)
+        assert all(load.latencies and not load.errors for load in report.endpoints.values())
+        assert "p99.9, мс" in report.format_table()
+
+    assert stub.logins == 1
+    with pytest.raises(ValueError):
+        run_load(endpoints, LoadProfile(mode="burst"))
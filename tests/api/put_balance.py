@@ -1,12 +1,11 @@
 import pytest
-import requests
 from urllib.parse import urljoin
 
-from tests.api.constants import BASE_URL, SUBSCRIBER_LOGIN, SUBSCRIBER_PASSWORD, TEST_SUBSCRIBER_ID
-from tests.api.helpers import get_auth_token
+from tests.api.constants import BASE_URL, TEST_SUBSCRIBER_ID
+from tests.api.helpers import get_role_token, get_session
 
 def test_top_up_subscriber_balance_200():
-    token = get_auth_token({"login": SUBSCRIBER_LOGIN, "password": SUBSCRIBER_PASSWORD})
+    token = get_role_token("subscriber")
     
     url = urljoin(BASE_URL, f"/subscribers/{TEST_SUBSCRIBER_ID}/balance")
     headers = {
@@ -18,7 +17,7 @@ def test_top_up_subscriber_balance_200():
         "amount": 50.00,
         "payment_method": "wallet"
     }
-    response = requests.post(url, headers=headers, json=payload)
+    response = get_session().post(url, headers=headers, json=payload)
     
     assert response.status_code == 200
     result = response.json()
@@ -26,7 +25,7 @@ def test_top_up_subscriber_balance_200():
     assert response.elapsed.total_seconds() * 1000 < 500
 
 def test_top_up_subscriber_balance_400():
-    token = get_auth_token({"login": SUBSCRIBER_LOGIN, "password": SUBSCRIBER_PASSWORD})
+    token = get_role_token("subscriber")
     
     url = urljoin(BASE_URL, f"/subscribers/{TEST_SUBSCRIBER_ID}/balance")
     headers = {
@@ -38,7 +37,7 @@ def test_top_up_subscriber_balance_400():
         "amount": -50.00,
         "payment_method": "wallet"
     }
-    response = requests.post(url, headers=headers, json=payload)
+    response = get_session().post(url, headers=headers, json=payload)
     
     assert response.status_code == 400
     result = response.json()
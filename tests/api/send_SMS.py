@@ -1,12 +1,11 @@
 import pytest
-import requests
 from urllib.parse import urljoin
 
-from tests.api.constants import BASE_URL, MANAGER_LOGIN, MANAGER_PASSWORD, TEST_SUBSCRIBER_ID
-from tests.api.helpers import get_auth_token
+from tests.api.constants import BASE_URL, TEST_SUBSCRIBER_ID
+from tests.api.helpers import get_role_token, get_session
 
 def test_send_sms_notification_200():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/notifications/{TEST_SUBSCRIBER_ID}")
     headers = {
@@ -17,13 +16,13 @@ def test_send_sms_notification_200():
     payload = {
         "type": "limit_100"
     }
-    response = requests.post(url, headers=headers, json=payload)
+    response = get_session().post(url, headers=headers, json=payload)
     
     assert response.status_code == 200
     assert response.elapsed.total_seconds() * 1000 < 500
 
 def test_send_sms_notification_400():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, f"/notifications/{TEST_SUBSCRIBER_ID}")
     headers = {
@@ -34,7 +33,7 @@ def test_send_sms_notification_400():
     payload = {
         "type": "limit_1000"
     }
-    response = requests.post(url, headers=headers, json=payload)
+    response = get_session().post(url, headers=headers, json=payload)
     
     assert response.status_code == 400
     assert response.elapsed.total_seconds() * 1000 < 500
@@ -0,0 +1,43 @@
+import pytest
+
+from tests.api.client import ApiClient, ClientConfig
+
+
+def test_pooled_session_reuses_connection_and_token(billing_stub):
+    stub, base_url = billing_stub
+    with ApiClient(ClientConfig(base_url=base_url, pool_size=2)) as client:
+        for _ in range(20):
+            response = client.get("/subscribers/1/balance", role="manager")
+            assert response.status_code == 200
+
+    assert stub.logins == 1
+    assert stub.connections == 1
+
+
+def test_token_cache_refreshes_expired_token(billing_stub):
+    stub, base_url = billing_stub
+    stub.expires_in = 0
+    with ApiClient(ClientConfig(base_url=base_url)) as client:
+        first = client.tokens.get("subscriber")
+        second = client.tokens.get("subscriber")
+
+        assert first != second
+        assert (stub.logins, stub.refreshes) == (1, 1)
+
+        # Токен, отозванный сервером, запрашивается заново по ответу 401
+        stub.expires_in = 3600
+        client.tokens.get("admin")
+        stub.token = "revoked"
+        assert client.get("/subscribers/1/balance", role="admin").status_code == 200
+        assert stub.logins == 3
+
+        with pytest.raises(ValueError):
+            client.tokens.get("operator")
+
+    # Сервер без пути обновления токена: истекший токен запрашивается заново
+    stub.expires_in = 0
+    with ApiClient(ClientConfig(base_url=base_url, refresh_path="/token/refresh")) as client:
+        logins = stub.logins
+        client.tokens.get("subscriber")
+        client.tokens.get("subscriber")
+        assert (stub.logins - logins, stub.refreshes) == (2, 1)
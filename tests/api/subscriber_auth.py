@@ -1,8 +1,8 @@
 import pytest
-import requests
 from urllib.parse import urljoin
 
 from tests.api.constants import BASE_URL, SUBSCRIBER_LOGIN, SUBSCRIBER_PASSWORD
+from tests.api.helpers import get_session
 
 def test_client_authentication_200():
     url = urljoin(BASE_URL, "/auth")
@@ -10,7 +10,7 @@ def test_client_authentication_200():
         "login": SUBSCRIBER_LOGIN,
         "password": SUBSCRIBER_PASSWORD
     }
-    response = requests.post(url, json=payload)
+    response = get_session().post(url, json=payload)
     
     assert response.status_code == 200
     data = response.json()
@@ -26,7 +26,7 @@ def test_client_authentication_400():
         "login": SUBSCRIBER_LOGIN,
         "password": "wrong value"
     }
-    response = requests.post(url, json=payload)
+    response = get_session().post(url, json=payload)
     
     assert response.status_code == 400
     data = response.json()
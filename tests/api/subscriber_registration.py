@@ -1,12 +1,11 @@
 import pytest
-import requests
 from urllib.parse import urljoin
 
-from tests.api.constants import BASE_URL, MANAGER_LOGIN, MANAGER_PASSWORD
-from tests.api.helpers import get_auth_token
+from tests.api.constants import BASE_URL
+from tests.api.helpers import get_role_token, get_session
 
 def test_register_client_201():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, "/auth/registration")
     headers = {
@@ -18,13 +17,13 @@ def test_register_client_201():
         "full_name": "Test Client",
         "role": "client"
     }
-    response = requests.post(url, headers=headers, json=payload)
+    response = get_session().post(url, headers=headers, json=payload)
     
     assert response.status_code == 201
     assert response.elapsed.total_seconds() * 1000 < 500
 
 def test_register_client_400():
-    token = get_auth_token({"login": MANAGER_LOGIN, "password": MANAGER_PASSWORD})
+    token = get_role_token("manager")
     
     url = urljoin(BASE_URL, "/auth/registration")
     headers = {
@@ -36,7 +35,7 @@ def test_register_client_400():
         "full_name": "Test Client",
         "role": "client"
     }
-    response = requests.post(url, headers=headers, json=payload)
+    response = get_session().post(url, headers=headers, json=payload)
     
     assert response.status_code == 400
     assert response.elapsed.total_seconds() * 1000 < 500
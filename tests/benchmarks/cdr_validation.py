@@ -0,0 +1,637 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, time as day_time, timedelta
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from tests.cdr.cache import RACY_WINDOW_NS, ResultCache
+from tests.cdr.columnar import validate_cdr_file_columnar
+from tests.cdr.helpers import is_cdr_file_valid, validate_all_cdr_files, validate_cdr_file
+from tests.cdr.overlaps import CallOverlapIndex
+from tests.cdr.profiling import ValidationStats
+from tests.cdr.sql_injection import SQL_EXTENDED_PATTERNS, SQL_KEYWORDS, SqlInjectionScanner
+from tests.cdr.timestamps import SECONDS_PER_DAY, parse_timestamp
+from tests.generators.positive_cdr_generator import generate_multiple_cdr_files
+
+
+def benchmark_parallel_validation(directory: str,
+                                  worker_counts: List[int],
+                                  chunksize: int = 16,
+                                  repeat: int = 3) -> List[Dict[str, float]]:
+    """
+    Сравнивает пропускную способность validate_all_cdr_files при разном числе процессов.
+
+    Args:
+        directory (str): Директория с CDR файлами
+        worker_counts (List[int]): Варианты количества процессов
+        chunksize (int): Количество задач в очереди на один процесс
+        repeat (int): Количество повторов, берется лучшее время
+
+    Returns:
+        List[Dict[str, float]]: Результаты замеров для каждого количества процессов
+    """
+    num_files = sum(1 for name in os.listdir(directory) if name.endswith('.txt'))
+    results = []
+    for workers in worker_counts:
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            validate_all_cdr_files(directory, workers=workers, chunksize=chunksize)
+            best = min(best, time.perf_counter() - started)
+        results.append({
+            "workers": workers,
+            "files": num_files,
+            "seconds": best,
+            "files_per_second": num_files / best,
+        })
+    return results
+
+
+def print_results(results: List[Dict[str, float]]) -> None:
+    """Печатает таблицу результатов и ускорение относительно первого замера."""
+    baseline = results[0]["seconds"]
+    print(f"{'процессов':>10} {'файлов':>8} {'сек':>8} {'файлов/с':>10} {'ускорение':>10}")
+    for row in results:
+        print(
+            f"{row['workers']:>10} {row['files']:>8} {row['seconds']:>8.3f} "
+            f"{row['files_per_second']:>10.1f} {baseline / row['seconds']:>10.2f}"
+        )
+
+
+def generate_heavy_subscriber_calls(num_records: int,
+                                    num_subscribers: int = 5,
+                                    seed: int = 0) -> List[Tuple[str, datetime, datetime, int]]:
+    """
+    Генерирует звонки нескольких абонентов с большим количеством записей в хронологическом порядке.
+
+    Returns:
+        List[Tuple[str, datetime, datetime, int]]: Абонент, начало, окончание и номер строки
+    """
+    rng = random.Random(seed)
+    subscribers = [f"7900{index:07d}" for index in range(num_subscribers)]
+    current = datetime(2025, 6, 1)
+    calls = []
+    for line_no in range(1, num_records + 1):
+        current += timedelta(seconds=rng.randint(0, 120))
+        end = current + timedelta(seconds=rng.randint(1, 300))
+        calls.append((rng.choice(subscribers), current, end, line_no))
+    return calls
+
+
+def _pairwise_overlaps(calls: List[Tuple[str, datetime, datetime, int]]) -> int:
+    # Прежний алгоритм: сравнение каждого звонка со всеми предыдущими звонками абонента
+    calls_by_subscriber = {}
+    found = 0
+    for subscriber, start, end, line_no in calls:
+        previous = calls_by_subscriber.setdefault(subscriber, [])
+        for other_start, other_end, _ in previous:
+            if not (end <= other_start or start >= other_end):
+                found += 1
+        previous.append((start, end, line_no))
+    return found
+
+
+def _sweep_overlaps(calls: List[Tuple[str, datetime, datetime, int]]) -> int:
+    index = CallOverlapIndex()
+    found = 0
+    for subscriber, start, end, line_no in calls:
+        found += len(index.add(subscriber, start, end, line_no))
+    return found
+
+
+def benchmark_overlap_detector(num_records: int = 1_000_000,
+                               num_subscribers: int = 5,
+                               pairwise_limit: int = 20_000) -> List[Dict[str, float]]:
+    """
+    Сравнивает индекс пересечений с попарным сравнением звонков абонента.
+
+    Попарное сравнение квадратично, поэтому оно замеряется только на первых
+    pairwise_limit записях.
+
+    Args:
+        num_records (int): Количество синтетических записей
+        num_subscribers (int): Количество абонентов, между которыми распределены записи
+        pairwise_limit (int): Количество записей для замера попарного сравнения
+
+    Returns:
+        List[Dict[str, float]]: Результаты замеров для каждого алгоритма
+    """
+    calls = generate_heavy_subscriber_calls(num_records, num_subscribers)
+    results = []
+    for name, detector, sample in (
+            ("pairwise", _pairwise_overlaps, calls[:pairwise_limit]),
+            ("sweep", _sweep_overlaps, calls[:pairwise_limit]),
+            ("sweep", _sweep_overlaps, calls)):
+        started = time.perf_counter()
+        found = detector(sample)
+        seconds = time.perf_counter() - started
+        results.append({
+            "algorithm": name,
+            "records": len(sample),
+            "conflicts": found,
+            "seconds": seconds,
+            "records_per_second": len(sample) / seconds,
+        })
+    return results
+
+
+def print_overlap_results(results: List[Dict[str, float]]) -> None:
+    """Печатает таблицу результатов замера поиска пересечений."""
+    print(f"{'алгоритм':>10} {'записей':>10} {'конфликтов':>11} {'сек':>8} {'записей/с':>12}")
+    for row in results:
+        print(
+            f"{row['algorithm']:>10} {row['records']:>10} {row['conflicts']:>11} "
+            f"{row['seconds']:>8.3f} {row['records_per_second']:>12.0f}"
+        )
+
+
+def generate_timestamp_pairs(num_records: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Генерирует пары меток начала и окончания звонков в формате YYYY-MM-DDTHH:MM:SS."""
+    rng = random.Random(seed)
+    current = datetime(2025, 6, 1)
+    pairs = []
+    for _ in range(num_records):
+        current += timedelta(seconds=rng.randint(0, 30))
+        end = current + timedelta(seconds=rng.randint(1, 300))
+        pairs.append((current.isoformat(), end.isoformat()))
+    return pairs
+
+
+def _multipass_datetime_checks(pairs: List[Tuple[str, str]]) -> int:
+    # Исходный путь: отдельный разбор datetime.fromisoformat в каждом проходе
+    # (проверка записи, хронология, полночь) и datetime.combine для полуночи
+    found = 0
+    prev_start = None
+    for start_time, end_time in pairs:
+        start_dt = datetime.fromisoformat(start_time)
+        end_dt = datetime.fromisoformat(end_time)
+        if end_dt < start_dt or (end_dt - start_dt).total_seconds() < 1:
+            found += 1
+
+        current_start = datetime.fromisoformat(start_time)
+        if prev_start is not None and current_start < prev_start:
+            found += 1
+        prev_start = current_start
+
+        start_dt = datetime.fromisoformat(start_time)
+        end_dt = datetime.fromisoformat(end_time)
+        if start_dt.date() < end_dt.date():
+            midnight = datetime.combine(end_dt.date(), day_time.min)
+            if not (start_dt == midnight or end_dt == midnight):
+                found += 1
+    return found
+
+
+def _datetime_checks(pairs: List[Tuple[str, str]]) -> int:
+    # Один разбор datetime.fromisoformat на запись, проверки на datetime
+    found = 0
+    prev_start = None
+    for start_time, end_time in pairs:
+        start_dt = datetime.fromisoformat(start_time)
+        end_dt = datetime.fromisoformat(end_time)
+        if end_dt < start_dt or (end_dt - start_dt).total_seconds() < 1:
+            found += 1
+
+        if prev_start is not None and start_dt < prev_start:
+            found += 1
+        prev_start = start_dt
+
+        if start_dt.date() < end_dt.date():
+            midnight = datetime.combine(end_dt.date(), day_time.min)
+            if not (start_dt == midnight or end_dt == midnight):
+                found += 1
+    return found
+
+
+def _epoch_checks(pairs: List[Tuple[str, str]]) -> int:
+    # Новый путь: один разбор в секунды эпохи и целочисленные проверки
+    found = 0
+    prev_start = None
+    for start_time, end_time in pairs:
+        start = parse_timestamp(start_time)
+        end = parse_timestamp(end_time)
+        if end < start or end - start < 1:
+            found += 1
+
+        if prev_start is not None and start < prev_start:
+            found += 1
+        prev_start = start
+
+        end_day = end // SECONDS_PER_DAY
+        if start // SECONDS_PER_DAY < end_day:
+            midnight = end_day * SECONDS_PER_DAY
+            if not (start == midnight or end == midnight):
+                found += 1
+    return found
+
+
+def benchmark_timestamp_checks(num_records: int = 1_000_000) -> List[Dict[str, float]]:
+    """
+    Сравнивает проверки длительности, хронологии и полуночи на datetime и на секундах эпохи.
+
+    Замеряются исходный путь с разбором в каждом проходе, один разбор в datetime
+    на запись и один разбор в секунды эпохи с целочисленными проверками.
+
+    Args:
+        num_records (int): Количество пар меток времени
+
+    Returns:
+        List[Dict[str, float]]: Результаты замеров для каждого варианта
+    """
+    pairs = generate_timestamp_pairs(num_records)
+    results = []
+    for name, checks in (("multipass", _multipass_datetime_checks),
+                         ("datetime", _datetime_checks),
+                         ("epoch", _epoch_checks)):
+        started = time.perf_counter()
+        found = checks(pairs)
+        seconds = time.perf_counter() - started
+        results.append({
+            "parser": name,
+            "records": num_records,
+            "errors": found,
+            "seconds": seconds,
+            "records_per_second": num_records / seconds,
+        })
+    return results
+
+
+def print_timestamp_results(results: List[Dict[str, float]]) -> None:
+    """Печатает таблицу результатов замера разбора меток времени."""
+    baseline = results[0]["seconds"]
+    print(f"{'разбор':>10} {'записей':>10} {'ошибок':>8} {'сек':>8} {'записей/с':>12} {'ускорение':>10}")
+    for row in results:
+        print(
+            f"{row['parser']:>10} {row['records']:>10} {row['errors']:>8} {row['seconds']:>8.3f} "
+            f"{row['records_per_second']:>12.0f} {baseline / row['seconds']:>10.2f}"
+        )
+
+
+def write_large_cdr_file(file_path: str, num_records: int, num_subscribers: int = 10000, seed: int = 0) -> None:
+    """Записывает CDR файл из num_records корректных записей в хронологическом порядке."""
+    rng = random.Random(seed)
+    subscribers = [f"7900{index:07d}" for index in range(num_subscribers)]
+    current = datetime(2025, 6, 1)
+    with open(file_path, 'w') as f:
+        for _ in range(num_records):
+            current += timedelta(seconds=rng.randint(0, 2))
+            end = current + timedelta(seconds=rng.randint(1, 120))
+            f.write(f"{rng.choice(['01', '02'])},{rng.choice(subscribers)}, {rng.choice(subscribers)}, "
+                    f"{current.isoformat()}, {end.isoformat()}\n")
+
+
+def benchmark_columnar_validation(num_records: int = 1_000_000,
+                                  file_path: Optional[str] = None) -> List[Dict[str, float]]:
+    """
+    Сравнивает потоковую и пакетную (столбцы NumPy) проверку одного большого файла
+    при чтении файла обычным способом и через отображение в память.
+
+    Args:
+        num_records (int): Количество записей в сгенерированном файле
+        file_path (str, optional): Готовый CDR файл вместо сгенерированного
+
+    Returns:
+        List[Dict[str, float]]: Результаты замеров для каждого режима
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if file_path is None:
+            file_path = os.path.join(directory, "CDR_large.txt")
+            write_large_cdr_file(file_path, num_records)
+        with open(file_path, 'rb') as f:
+            num_lines = sum(1 for _ in f)
+
+        results = []
+        modes = (
+            ("stream", validate_cdr_file),
+            ("stream mmap", partial(validate_cdr_file, use_mmap=True)),
+            ("columnar", validate_cdr_file_columnar),
+            ("columnar mmap", partial(validate_cdr_file_columnar, use_mmap=True)),
+        )
+        for name, validate in modes:
+            started = time.perf_counter()
+            # Подробности ошибок печатаются валидатором и в замер не входят
+            with contextlib.redirect_stdout(io.StringIO()):
+                validate(file_path)
+            seconds = time.perf_counter() - started
+            results.append({
+                "mode": name,
+                "records": num_lines,
+                "seconds": seconds,
+                "records_per_minute": num_lines / seconds * 60,
+            })
+    return results
+
+
+def print_columnar_results(results: List[Dict[str, float]]) -> None:
+    """Печатает таблицу результатов замера пакетной проверки."""
+    baseline = results[0]["seconds"]
+    print(f"{'режим':>14} {'записей':>10} {'сек':>8} {'записей/мин':>14} {'ускорение':>10}")
+    for row in results:
+        print(
+            f"{row['mode']:>14} {row['records']:>10} {row['seconds']:>8.3f} "
+            f"{row['records_per_minute']:>14.0f} {baseline / row['seconds']:>10.2f}"
+        )
+
+
+def generate_sql_lines(num_records: int, hostile_share: float, seed: int = 0) -> List[Tuple[str, List[str]]]:
+    """
+    Генерирует строки CDR и их поля; доля hostile_share строк содержит фрагменты SQL-инъекций.
+
+    Returns:
+        List[Tuple[str, List[str]]]: Строка и ее поля без пробелов по краям
+    """
+    rng = random.Random(seed)
+    payloads = ["'; DROP TABLE calls; --", "' OR '1'='1", "1; SELECT * FROM users"]
+    current = datetime(2025, 6, 1)
+    lines = []
+    for _ in range(num_records):
+        current += timedelta(seconds=rng.randint(0, 30))
+        end = current + timedelta(seconds=rng.randint(1, 300))
+        parts = [rng.choice(['01', '02']), f"7900{rng.randint(0, 9999999):07d}",
+                 f"7900{rng.randint(0, 9999999):07d}", current.isoformat(), end.isoformat()]
+        if rng.random() < hostile_share:
+            parts[rng.randrange(5)] = rng.choice(payloads)
+        lines.append((', '.join(parts), parts))
+    return lines
+
+
+def _keyword_loop_scan(lines: List[Tuple[str, List[str]]], patterns: Tuple[str, ...]) -> int:
+    # Прежний способ: приведение каждого поля к нижнему регистру и поиск каждого шаблона по очереди
+    found = 0
+    for _, parts in lines:
+        for part in parts:
+            if any(pattern in part.lower() for pattern in patterns):
+                found += 1
+                break
+    return found
+
+
+def _scanner_scan(lines: List[Tuple[str, List[str]]], patterns: Tuple[str, ...]) -> int:
+    scanner = SqlInjectionScanner(patterns)
+    return sum(1 for line, parts in lines if scanner.find(line, parts) is not None)
+
+
+def benchmark_sql_scanner(num_records: int = 1_000_000, hostile_share: float = 0.1) -> List[Dict[str, float]]:
+    """
+    Сравнивает поиск SQL-инъекций циклом по ключевым словам и скомпилированным сканером.
+
+    Замеры выполняются для чистых строк и для строк с долей hostile_share
+    инъекций, со стандартным и расширенным списком шаблонов.
+
+    Args:
+        num_records (int): Количество строк
+        hostile_share (float): Доля строк с инъекциями во втором наборе
+
+    Returns:
+        List[Dict[str, float]]: Результаты замеров
+    """
+    results = []
+    for data_name, share in (("clean", 0.0), ("hostile", hostile_share)):
+        lines = generate_sql_lines(num_records, share)
+        for patterns_name, patterns in (("keywords", SQL_KEYWORDS), ("extended", SQL_EXTENDED_PATTERNS)):
+            for scan_name, scan in (("loop", _keyword_loop_scan), ("scanner", _scanner_scan)):
+                started = time.perf_counter()
+                found = scan(lines, patterns)
+                seconds = time.perf_counter() - started
+                results.append({
+                    "data": data_name,
+                    "patterns": patterns_name,
+                    "scan": scan_name,
+                    "found": found,
+                    "seconds": seconds,
+                    "records_per_second": num_records / seconds,
+                })
+    return results
+
+
+def print_sql_results(results: List[Dict[str, float]]) -> None:
+    """Печатает таблицу результатов замера поиска SQL-инъекций."""
+    print(f"{'данные':>8} {'шаблоны':>9} {'поиск':>8} {'найдено':>8} {'сек':>8} {'записей/с':>12}")
+    for row in results:
+        print(
+            f"{row['data']:>8} {row['patterns']:>9} {row['scan']:>8} {row['found']:>8} "
+            f"{row['seconds']:>8.3f} {row['records_per_second']:>12.0f}"
+        )
+
+
+def benchmark_result_cache(directory: str, workers: int = 1) -> List[Dict[str, float]]:
+    """
+    Сравнивает проверку директории без кэша, с пустым кэшем и повторную проверку
+    неизмененной директории.
+
+    Args:
+        directory (str): Директория с CDR файлами
+        workers (int): Количество процессов
+
+    Returns:
+        List[Dict[str, float]]: Результаты замеров для каждого режима
+    """
+    num_files = sum(1 for name in os.listdir(directory) if name.endswith('.txt'))
+    # Файлы моложе RACY_WINDOW_NS кэш перепроверяет по хешу, поэтому ждем
+    time.sleep(RACY_WINDOW_NS / 1e9)
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        db_path = os.path.join(cache_dir, "cache.sqlite")
+        runs = [("без кэша", None), ("пустой кэш", db_path), ("повтор", db_path)]
+        for mode, path in runs:
+            cache = ResultCache(path) if path else None
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                validate_all_cdr_files(directory, workers=workers, cache=cache)
+            if cache is not None:
+                cache.close()
+            seconds = time.perf_counter() - started
+            results.append({
+                "mode": mode,
+                "files": num_files,
+                "seconds": seconds,
+                "files_per_second": num_files / seconds,
+            })
+    return results
+
+
+def print_cache_results(results: List[Dict[str, float]]) -> None:
+    """Печатает таблицу результатов замера кэша и ускорение относительно проверки без кэша."""
+    baseline = results[0]["seconds"]
+    print(f"{'режим':>12} {'файлов':>8} {'сек':>8} {'файлов/с':>10} {'ускорение':>10}")
+    for row in results:
+        print(
+            f"{row['mode']:>12} {row['files']:>8} {row['seconds']:>8.3f} "
+            f"{row['files_per_second']:>10.1f} {baseline / row['seconds']:>10.2f}"
+        )
+
+
+def benchmark_fail_fast(num_files: int = 20, num_records: int = 100_000) -> List[Dict[str, float]]:
+    """
+    Сравнивает время отклонения файла при полной проверке, остановке на первой
+    ошибке, предварительной проверке структуры и их сочетании (is_cdr_file_valid).
+
+    Args:
+        num_files (int): Количество сгенерированных файлов (все они отклоняются)
+        num_records (int): Количество записей в файле
+
+    Returns:
+        List[Dict[str, float]]: Результаты замеров для каждого режима
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for seed in range(num_files):
+            path = os.path.join(directory, f"CDR_{seed:03d}.txt")
+            write_large_cdr_file(path, num_records, seed=seed)
+            paths.append(path)
+
+        results = []
+        modes = (
+            ("полная", validate_cdr_file),
+            ("fail-fast", partial(validate_cdr_file, fail_fast=True)),
+            ("структура", partial(validate_cdr_file, prescan=True)),
+            ("is_valid", is_cdr_file_valid),
+        )
+        for name, validate in modes:
+            started = time.perf_counter()
+            for path in paths:
+                validate(path)
+            seconds = time.perf_counter() - started
+            results.append({
+                "mode": name,
+                "files": num_files,
+                "seconds": seconds,
+                "ms_per_file": seconds / num_files * 1000,
+            })
+    return results
+
+
+def print_fail_fast_results(results: List[Dict[str, float]]) -> None:
+    """Печатает таблицу времени отклонения файла и ускорение относительно полной проверки."""
+    baseline = results[0]["seconds"]
+    print(f"{'режим':>10} {'файлов':>8} {'сек':>8} {'мс/файл':>10} {'ускорение':>10}")
+    for row in results:
+        print(
+            f"{row['mode']:>10} {row['files']:>8} {row['seconds']:>8.3f} "
+            f"{row['ms_per_file']:>10.2f} {baseline / row['seconds']:>10.2f}"
+        )
+
+
+def profile_validation(num_records: int = 300_000,
+                       file_path: Optional[str] = None,
+                       columnar: bool = False) -> ValidationStats:
+    """
+    Проверяет большой CDR файл с профилированием правил, этапов разбора и проходов.
+
+    Args:
+        num_records (int): Количество записей в сгенерированном файле
+        file_path (str, optional): Готовый CDR файл вместо сгенерированного
+        columnar (bool): Профилировать пакетную проверку столбцами NumPy
+
+    Returns:
+        ValidationStats: Профиль проверки
+    """
+    stats = ValidationStats()
+    validate = validate_cdr_file_columnar if columnar else validate_cdr_file
+    with tempfile.TemporaryDirectory() as directory:
+        if file_path is None:
+            file_path = os.path.join(directory, "CDR_large.txt")
+            write_large_cdr_file(file_path, num_records)
+        validate(file_path, stats=stats)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарки валидатора CDR файлов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parallel = commands.add_parser("parallel", help="Параллельная валидация множества файлов")
+    parallel.add_argument("--dir", help="Директория с CDR файлами (по умолчанию - сгенерированная)")
+    parallel.add_argument("--files", type=int, default=2000, help="Количество файлов для генерации")
+    parallel.add_argument("--workers", type=int, nargs="+",
+                          default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parallel.add_argument("--chunksize", type=int, default=16)
+    parallel.add_argument("--repeat", type=int, default=3)
+
+    overlap = commands.add_parser("overlap", help="Поиск пересечений звонков абонентов")
+    overlap.add_argument("--records", type=int, default=1_000_000)
+    overlap.add_argument("--subscribers", type=int, default=5)
+    overlap.add_argument("--pairwise-limit", type=int, default=20_000)
+
+    timestamps = commands.add_parser("timestamps", help="Разбор меток времени и проверки на их основе")
+    timestamps.add_argument("--records", type=int, default=1_000_000)
+
+    columnar = commands.add_parser("columnar", help="Пакетная проверка большого файла столбцами NumPy")
+    columnar.add_argument("--records", type=int, default=1_000_000)
+    columnar.add_argument("--file", help="CDR файл (по умолчанию - сгенерированный)")
+
+    sql = commands.add_parser("sql", help="Поиск SQL-инъекций в чистых и враждебных файлах")
+    sql.add_argument("--records", type=int, default=1_000_000)
+    sql.add_argument("--hostile-share", type=float, default=0.1)
+
+    cache = commands.add_parser("cache", help="Повторная проверка директории с кэшем результатов")
+    cache.add_argument("--dir", help="Директория с CDR файлами (по умолчанию - сгенерированная)")
+    cache.add_argument("--files", type=int, default=2000, help="Количество файлов для генерации")
+    cache.add_argument("--workers", type=int, default=1)
+
+    fail_fast = commands.add_parser("failfast", help="Отклонение файлов с остановкой на первой ошибке")
+    fail_fast.add_argument("--files", type=int, default=20)
+    fail_fast.add_argument("--records", type=int, default=100_000)
+
+    profile = commands.add_parser("profile", help="Время каждого правила и прохода проверки большого файла")
+    profile.add_argument("--records", type=int, default=300_000)
+    profile.add_argument("--file", help="CDR файл (по умолчанию - сгенерированный)")
+    profile.add_argument("--columnar", action="store_true", help="Профилировать пакетную проверку")
+    profile.add_argument("--format", choices=("json", "prometheus"), default="json")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "profile":
+        stats = profile_validation(args.records, args.file, args.columnar)
+        if args.format == "prometheus":
+            print(stats.to_prometheus(), end='')
+        else:
+            print(stats.to_json())
+        return
+
+    if args.command == "failfast":
+        print_fail_fast_results(benchmark_fail_fast(args.files, args.records))
+        return
+
+    if args.command == "cache":
+        if args.dir:
+            print_cache_results(benchmark_result_cache(args.dir, args.workers))
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            generate_multiple_cdr_files(directory, args.files, start_time=datetime(2025, 6, 1), seed=0)
+            print_cache_results(benchmark_result_cache(directory, args.workers))
+        return
+
+    if args.command == "sql":
+        print_sql_results(benchmark_sql_scanner(args.records, args.hostile_share))
+        return
+
+    if args.command == "columnar":
+        print_columnar_results(benchmark_columnar_validation(args.records, args.file))
+        return
+
+    if args.command == "timestamps":
+        print_timestamp_results(benchmark_timestamp_checks(args.records))
+        return
+
+    if args.command == "overlap":
+        print_overlap_results(benchmark_overlap_detector(args.records, args.subscribers, args.pairwise_limit))
+        return
+
+    if args.dir:
+        print_results(benchmark_parallel_validation(args.dir, args.workers, args.chunksize, args.repeat))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        generate_multiple_cdr_files(directory, args.files, start_time=datetime(2025, 6, 1), seed=0)
+        print_results(benchmark_parallel_validation(directory, args.workers, args.chunksize, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
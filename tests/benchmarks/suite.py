@@ -0,0 +1,349 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # На Windows пиковая память не замеряется
+    resource = None
+
+from tests.cdr.helpers import validate_all_cdr_files, validate_cdr_file
+from tests.cdr.report import ERROR_RULES
+from tests.generators.negative_cdr_generator import generate_error_cdr_file
+from tests.generators.positive_cdr_generator import generate_cdr_file, generate_multiple_cdr_files
+from tests.generators.vectorized_cdr_generator import (
+    generate_cdr_file_streaming, generate_cdr_file_vectorized, np,
+)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Допустимое ухудшение относительно базовой линии (доля)
+DEFAULT_TOLERANCE = 0.2
+# Абсолютный запас для малых величин, которые сильно зависят от шума
+LATENCY_SLACK_MS = 1.0
+MEMORY_SLACK_MB = 8.0
+RECORDS_PER_FILE = 10
+DEFAULT_MAX_FILES = 10_000
+PERCENTILES = (50, 95, 99)
+START_TIME = datetime(2025, 6, 1)
+BASELINE_VERSION = 1
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Вычисляет перцентиль методом ближайшего ранга.
+
+    Args:
+        values (Sequence[float]): Непустая выборка
+        q (float): Перцентиль от 0 до 100
+
+    Returns:
+        float: Значение выборки, не меньше которого q% значений
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(case: str, size: int, records: int, latencies: List[float]) -> Dict[str, Any]:
+    """
+    Сводит замеры одного сценария: пропускная способность и перцентили задержки.
+
+    Args:
+        case (str): Имя сценария
+        size (int): Размер корпуса (записей), для которого выполнен сценарий
+        records (int): Количество записей, обработанных за одно измерение
+        latencies (List[float]): Время каждого измерения в секундах
+
+    Returns:
+        Dict[str, Any]: Результат сценария
+    """
+    seconds = sum(latencies)
+    result = {
+        "case": case,
+        "size": size,
+        "records": records,
+        "samples": len(latencies),
+        "seconds": seconds,
+        "records_per_second": records * len(latencies) / seconds if seconds else 0.0,
+        "peak_memory_mb": None,
+    }
+    for q in PERCENTILES:
+        result[f"p{q}_ms"] = percentile(latencies, q) * 1000
+    return result
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Ключ результата в файле базовой линии."""
+    return f"{result['case']}/{result['size']}"
+
+
+def _timed(func: Callable, *args: Any, **kwargs: Any) -> float:
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss - в килобайтах на Linux и в байтах на macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _child_main(connection: Any, func: Callable, args: Tuple) -> None:
+    try:
+        before = _peak_rss_mb()
+        result = func(*args)
+        after = _peak_rss_mb()
+        if before is not None:
+            result["peak_memory_mb"] = after - before
+        connection.send(result)
+    except BaseException as exc:
+        connection.send(exc)
+    finally:
+        connection.close()
+
+
+def run_isolated(func: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+    """
+    Выполняет сценарий в отдельном процессе, чтобы пиковая память
+    относилась только к нему и не зависела от предыдущих сценариев.
+
+    Args:
+        func (Callable[..., Dict[str, Any]]): Сценарий, возвращающий результат summarize()
+        *args: Аргументы сценария
+
+    Returns:
+        Dict[str, Any]: Результат сценария с приростом пикового RSS в peak_memory_mb
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_child_main, args=(sender, func, args))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"Процесс сценария завершился с кодом {process.exitcode}") from None
+    finally:
+        process.join()
+        receiver.close()
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def bench_generate_positive(path: str, size: int) -> Dict[str, Any]:
+    """Генерация одного корректного файла из size записей."""
+    latency = _timed(generate_cdr_file, path, START_TIME, size, size)
+    return summarize("generate_positive", size, size, [latency])
+
+
+def bench_generate_vectorized(path: str, size: int) -> Dict[str, Any]:
+    """Генерация одного корректного файла из size записей массивами NumPy."""
+    latency = _timed(generate_cdr_file_vectorized, path, START_TIME, size, size)
+    return summarize("generate_vectorized", size, size, [latency])
+
+
+def bench_generate_streaming(path: str, size: int) -> Dict[str, Any]:
+    """Потоковая генерация одного корректного файла из size записей (память не зависит от size)."""
+    latency = _timed(generate_cdr_file_streaming, path, START_TIME, size, size)
+    return summarize("generate_streaming", size, size, [latency])
+
+
+def bench_generate_negative(directory: str, size: int, num_files: int) -> Dict[str, Any]:
+    """Генерация файлов с ошибками одной случайной категории; задержка - на файл."""
+    rng = random.Random(size)
+    latencies = []
+    for index in range(num_files):
+        path = os.path.join(directory, f"cdr_negative_{index:07d}.txt")
+        error_config = {rng.choice(ERROR_RULES): 1}
+        latencies.append(_timed(generate_error_cdr_file, path, error_config, START_TIME, rng=rng))
+    return summarize("generate_negative", size, RECORDS_PER_FILE, latencies)
+
+
+def bench_validate_file(path: str, size: int, repeat: int) -> Dict[str, Any]:
+    """Проверка одного файла из size записей; задержка - на повтор."""
+    latencies = [_timed(validate_cdr_file, path) for _ in range(repeat)]
+    return summarize("validate_file", size, size, latencies)
+
+
+def bench_validate_files(directory: str, size: int) -> Dict[str, Any]:
+    """Проверка каждого файла корпуса по отдельности; задержка - на файл."""
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".txt"))
+    latencies = [_timed(validate_cdr_file, path) for path in paths]
+    return summarize("validate_files", size, RECORDS_PER_FILE, latencies)
+
+
+def bench_validate_directory(directory: str, size: int, repeat: int, workers: int) -> Dict[str, Any]:
+    """Проверка директории validate_all_cdr_files; задержка - на повтор."""
+    num_files = sum(1 for name in os.listdir(directory) if name.endswith(".txt"))
+    latencies = [_timed(validate_all_cdr_files, directory, workers=workers) for _ in range(repeat)]
+    return summarize("validate_directory", size, num_files * RECORDS_PER_FILE, latencies)
+
+
+def run_suite(sizes: Sequence[int] = DEFAULT_SIZES,
+              repeat: int = 3,
+              workers: int = 1,
+              negative_share: float = 0.5,
+              max_files: int = DEFAULT_MAX_FILES) -> List[Dict[str, Any]]:
+    """
+    Генерирует синтетические корпуса и замеряет генераторы и валидатор.
+
+    Для каждого размера size создаются файл из size записей и директория
+    из size / 10 файлов по 10 записей (не больше max_files), в которой
+    доля negative_share - файлы с ошибками. Каждый сценарий выполняется
+    в отдельном процессе.
+
+    Args:
+        sizes (Sequence[int]): Размеры корпусов в записях
+        repeat (int): Количество повторов проверки файла и директории
+        workers (int): Количество процессов validate_all_cdr_files
+        negative_share (float): Доля файлов с ошибками в директории
+        max_files (int): Предельное количество файлов в директории
+
+    Returns:
+        List[Dict[str, Any]]: Результаты сценариев
+    """
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            corpus = os.path.join(directory, "files")
+            os.makedirs(corpus)
+            file_path = os.path.join(directory, "cdr_large.txt")
+            num_files = max(1, min(size // RECORDS_PER_FILE, max_files))
+            num_negative = int(num_files * negative_share)
+
+            if np is not None:
+                results.append(run_isolated(bench_generate_vectorized, file_path, size))
+                results.append(run_isolated(bench_generate_streaming, file_path, size))
+            results.append(run_isolated(bench_generate_positive, file_path, size))
+            if num_negative:
+                results.append(run_isolated(bench_generate_negative, corpus, size, num_negative))
+            generate_multiple_cdr_files(corpus, num_files - num_negative, start_time=START_TIME, seed=size)
+
+            results.append(run_isolated(bench_validate_file, file_path, size, repeat))
+            results.append(run_isolated(bench_validate_files, corpus, size))
+            results.append(run_isolated(bench_validate_directory, corpus, size, repeat, workers))
+    return results
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """Загружает базовую линию (пустую, если файла нет)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Неподдерживаемая версия базовой линии: {data.get('version')}")
+    return data["results"]
+
+
+def save_baseline(path: str, results: List[Dict[str, Any]]) -> None:
+    """Сохраняет результаты в базовую линию; результаты других размеров и сценариев сохраняются."""
+    baseline = load_baseline(path)
+    baseline.update({result_key(result): result for result in results})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": BASELINE_VERSION, "results": baseline}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_with_baseline(results: List[Dict[str, Any]],
+                          baseline: Dict[str, Dict[str, Any]],
+                          tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Сравнивает результаты с базовой линией.
+
+    Регрессией считается падение пропускной способности, рост задержки p95
+    или пиковой памяти больше чем на долю tolerance (для задержки и памяти -
+    сверх небольшого абсолютного запаса). Сценарии без базовой линии пропускаются.
+
+    Args:
+        results (List[Dict[str, Any]]): Результаты run_suite()
+        baseline (Dict[str, Dict[str, Any]]): Результаты, загруженные load_baseline()
+        tolerance (float): Допустимое ухудшение (доля)
+
+    Returns:
+        List[str]: Описания регрессий
+    """
+    regressions = []
+    for result in results:
+        key = result_key(result)
+        base = baseline.get(key)
+        if base is None:
+            continue
+
+        if result["records_per_second"] < base["records_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: пропускная способность {result['records_per_second']:.0f} записей/с "
+                f"(базовая линия {base['records_per_second']:.0f})"
+            )
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance) + LATENCY_SLACK_MS:
+            regressions.append(f"{key}: задержка p95 {result['p95_ms']:.2f} мс (базовая линия {base['p95_ms']:.2f})")
+        peak, base_peak = result.get("peak_memory_mb"), base.get("peak_memory_mb")
+        if peak is not None and base_peak is not None and peak > base_peak * (1 + tolerance) + MEMORY_SLACK_MB:
+            regressions.append(f"{key}: пиковая память {peak:.1f} МБ (базовая линия {base_peak:.1f})")
+    return regressions
+
+
+def print_suite_results(results: List[Dict[str, Any]]) -> None:
+    """Печатает таблицу результатов сценариев."""
+    print(f"{'сценарий':>18} {'размер':>10} {'записей/с':>12} {'p50 мс':>9} {'p95 мс':>9} "
+          f"{'p99 мс':>9} {'память МБ':>10}")
+    for row in results:
+        memory = "-" if row["peak_memory_mb"] is None else f"{row['peak_memory_mb']:.1f}"
+        print(
+            f"{row['case']:>18} {row['size']:>10} {row['records_per_second']:>12.0f} "
+            f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {memory:>10}"
+        )
+
+
+def _record_count(value: str) -> int:
+    # Размер можно указать как 1e6
+    return int(float(value))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Набор бенчмарков генераторов и валидатора CDR с базовой линией")
+    parser.add_argument("--sizes", type=_record_count, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Размеры корпусов в записях (от 1e3 до 1e8)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1, help="Количество процессов validate_all_cdr_files")
+    parser.add_argument("--negative-share", type=float, default=0.5, help="Доля файлов с ошибками")
+    parser.add_argument("--max-files", type=int, default=DEFAULT_MAX_FILES)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Файл базовой линии (JSON)")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результаты как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", help="Файл для результатов (JSON)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.repeat, args.workers, args.negative_share, args.max_files)
+    print_suite_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nБазовая линия сохранена: {args.baseline}")
+        return 0
+
+    regressions = compare_with_baseline(results, load_baseline(args.baseline), args.tolerance)
+    if regressions:
+        print("\nРегрессии относительно базовой линии:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
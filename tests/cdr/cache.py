@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from tests.cdr.rules import DEFAULT_CONFIG, CdrRuleConfig, resolve_rules
+
+# Версия реализации правил проверки: увеличивается при изменении проверок или
+# текста сообщений, после чего все сохраненные результаты считаются устаревшими
+RULESET_VERSION = 2
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+# Файл, измененный незадолго до сохранения результата, мог измениться еще раз
+# в пределах точности mtime, не поменяв размер; такому файлу размер и mtime
+# не доверяются, и содержимое хешируется заново
+RACY_WINDOW_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    checked_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    errors TEXT NOT NULL,
+    used_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_digest ON results (digest);
+CREATE INDEX IF NOT EXISTS results_used ON results (used_ns);
+"""
+
+
+def ruleset_key(rules: Optional[Iterable[str]] = None,
+                disabled_rules: Iterable[str] = (),
+                config: CdrRuleConfig = DEFAULT_CONFIG) -> str:
+    """
+    Возвращает ключ набора правил для ResultCache.
+
+    Ключ зависит от RULESET_VERSION, имен включенных правил и параметров
+    правил, поэтому результаты, полученные с другим набором правил или
+    конфигурацией (в том числе после register_rule), не используются.
+
+    Args:
+        rules (Iterable[str], optional): Имена включенных правил (по умолчанию - все)
+        disabled_rules (Iterable[str]): Имена выключенных правил
+        config (CdrRuleConfig): Параметры правил
+
+    Returns:
+        str: Ключ набора правил
+    """
+    payload = json.dumps({
+        "version": RULESET_VERSION,
+        "rules": [rule.name for rule in resolve_rules(rules, disabled_rules)],
+        "config": config._asdict(),
+    }, sort_keys=True)
+    return f"{RULESET_VERSION}:{hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()}"
+
+
+class FileSignature(NamedTuple):
+    """Состояние файла перед проверкой: размер, время изменения, хеш содержимого и время осмотра."""
+    size: int
+    mtime_ns: int
+    digest: str
+    seen_ns: int
+
+
+class ResultCache:
+    """
+    Сохраняемые между запусками результаты валидации CDR файлов (SQLite).
+
+    Результат хранится по пути файла вместе с размером, mtime и хешем
+    содержимого. Если размер и mtime файла не изменились, результат берется
+    без чтения файла; иначе файл хешируется, и результат берется по хешу
+    (файл перезаписан без изменений или скопирован под другим именем).
+    При смене набора правил (см. ruleset_key) кэш очищается, при превышении
+    max_bytes удаляются давно не использовавшиеся записи.
+    """
+
+    def __init__(self,
+                 db_path: str,
+                 ruleset: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            db_path (str): Путь к файлу базы данных
+            ruleset (str, optional): Ключ набора правил; результаты с другим ключом
+                не используются (по умолчанию - ruleset_key() для всех правил)
+            max_bytes (int): Предельный суммарный размер сохраненных результатов
+        """
+        if max_bytes <= 0:
+            raise ValueError("Размер кэша должен быть положительным")
+
+        self.db_path = db_path
+        self.ruleset = ruleset_key() if ruleset is None else ruleset
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Пути, взятые из кэша без изменений; время использования обновляется при commit()
+        self._used: List[str] = []
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(db_path)
+        self._connection.executescript(_SCHEMA)
+        self._check_ruleset()
+
+    def __enter__(self) -> 'ResultCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def lookup(self, file_path: str) -> Tuple[Optional[Dict[str, List[str]]], Optional[FileSignature]]:
+        """
+        Ищет сохраненный результат проверки файла.
+
+        Args:
+            file_path (str): Путь к CDR файлу
+
+        Returns:
+            Tuple[Optional[Dict[str, List[str]]], Optional[FileSignature]]: Сохраненный
+                результат (None, если его нет) и состояние файла для store()
+                (None, если файл не существует или не читается - такой результат не сохраняется)
+        """
+        path = os.path.abspath(file_path)
+        seen_ns = time.time_ns()
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, None
+
+        row = self._connection.execute(
+            "SELECT size, mtime_ns, checked_ns, digest, errors FROM results WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None:
+            size, mtime_ns, checked_ns, digest, errors = row
+            unchanged = size == stat.st_size and mtime_ns == stat.st_mtime_ns
+            if unchanged and mtime_ns + RACY_WINDOW_NS < checked_ns:
+                return self._hit(path, errors), FileSignature(size, mtime_ns, digest, checked_ns)
+
+        try:
+            digest = file_digest(path)
+        except OSError:
+            # Файл удален или недоступен после stat: проверка сообщит об ошибке чтения
+            self.misses += 1
+            return None, None
+        signature = FileSignature(stat.st_size, stat.st_mtime_ns, digest, seen_ns)
+        if row is not None and row[3] == signature.digest:
+            errors = row[4]
+        else:
+            found = self._connection.execute(
+                "SELECT errors FROM results WHERE digest = ? AND size = ? LIMIT 1",
+                (signature.digest, signature.size)
+            ).fetchone()
+            if found is None:
+                self.misses += 1
+                return None, signature
+            errors = found[0]
+
+        # Содержимое уже проверялось: запоминаем новое состояние файла
+        self._save(path, signature, errors)
+        self.hits += 1
+        return json.loads(errors), signature
+
+    def store(self, file_path: str, signature: FileSignature, errors: Dict[str, List[str]]) -> None:
+        """
+        Сохраняет результат проверки файла в состоянии signature, полученном от lookup().
+
+        Args:
+            file_path (str): Путь к CDR файлу
+            signature (FileSignature): Состояние файла до проверки
+            errors (Dict[str, List[str]]): Результат валидации
+        """
+        self._save(os.path.abspath(file_path), signature, json.dumps(errors, ensure_ascii=False))
+
+    def commit(self) -> None:
+        """Удаляет лишние записи, если кэш превысил предельный размер, и сохраняет изменения."""
+        if self._used:
+            now = time.time_ns()
+            self._connection.executemany(
+                "UPDATE results SET used_ns = ? WHERE path = ?", [(now, path) for path in self._used]
+            )
+            self._used = []
+        total = self._connection.execute(
+            "SELECT COALESCE(SUM(LENGTH(CAST(errors AS BLOB)) + LENGTH(CAST(path AS BLOB))), 0) FROM results"
+        ).fetchone()[0]
+        if total > self.max_bytes:
+            rows = self._connection.execute(
+                "SELECT path, LENGTH(CAST(errors AS BLOB)) + LENGTH(CAST(path AS BLOB)) "
+                "FROM results ORDER BY used_ns"
+            )
+            evicted = []
+            for path, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((path,))
+                total -= size
+            self._connection.executemany("DELETE FROM results WHERE path = ?", evicted)
+        self._connection.commit()
+
+    def clear(self) -> None:
+        """Удаляет все сохраненные результаты."""
+        self._connection.execute("DELETE FROM results")
+        self._connection.commit()
+
+    def close(self) -> None:
+        """Сохраняет изменения и закрывает базу данных."""
+        self.commit()
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _check_ruleset(self) -> None:
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'ruleset'").fetchone()
+        if row is not None and row[0] == self.ruleset:
+            return
+        self._connection.execute("DELETE FROM results")
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('ruleset', ?)", (self.ruleset,)
+        )
+        self._connection.commit()
+
+    def _hit(self, path: str, errors: str) -> Dict[str, List[str]]:
+        self._used.append(path)
+        self.hits += 1
+        return json.loads(errors)
+
+    def _save(self, path: str, signature: FileSignature, errors: str) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO results (path, size, mtime_ns, checked_ns, digest, errors, used_ns) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, signature.size, signature.mtime_ns, signature.seen_ns, signature.digest, errors, time.time_ns())
+        )
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Вычисляет хеш содержимого файла (BLAKE2b, 128 бит).
+
+    Args:
+        file_path (str): Путь к файлу
+
+    Returns:
+        str: Хеш в шестнадцатеричном виде
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
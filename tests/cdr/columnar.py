@@ -0,0 +1,661 @@
+import locale
+import mmap
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from tests.cdr.helpers import CdrRecord, CdrStreamValidator, check_file_presence
+from tests.cdr.overlaps import CallOverlapIndex
+from tests.cdr.profiling import TimingStat, ValidationStats
+from tests.cdr.rules import DEFAULT_CONFIG, CdrRuleConfig
+from tests.cdr.sql_injection import SQL_KEYWORDS, SqlInjectionScanner
+from tests.cdr.timestamps import SECONDS_PER_DAY, format_day, normalize_timestamp
+
+# Время в столбцах хранится в микросекундах от начала эпохи, чтобы метки
+# с долями секунды сравнивались так же точно, как в потоковом валидаторе
+TICKS_PER_SECOND = 1_000_000
+TICKS_PER_DAY = SECONDS_PER_DAY * TICKS_PER_SECOND
+
+# Строка фиксированного формата без пробелов:
+# TT,SSSSSSSSSSS,CCCCCCCCCCC,YYYY-MM-DDTHH:MM:SS,YYYY-MM-DDTHH:MM:SS
+RECORD_WIDTH = 66
+# Количество записей, которые разбираются одной матрицей байт
+BLOCK_ROWS = 16384
+# Сколько предыдущих звонков абонента перебирается векторно при поиске пересечений
+MAX_OVERLAP_LAG = 64
+# Правила, которые проверяются векторно; с другими правилами строки проверяются по одной
+VECTORIZED_RULES = frozenset({
+    "operator_code", "call_type", "phone_numbers", "timestamps", "sql_injection",
+    "call_overlap", "time_sequence", "midnight_crossing", "record_count",
+})
+
+_COMMA_OFFSETS = (2, 14, 26, 46)
+# Содержимое цифровых полей и меток времени фиксированного формата (d - любая цифра)
+_FIXED_FIELD_TEMPLATES = ('d' * 11, 'dddd-dd-ddtdd:dd:dd')
+_WHITESPACE = b' \t\v\f'
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+class CdrColumns(NamedTuple):
+    """
+    Записи CDR в виде столбцов NumPy, по одному элементу на строку.
+
+    Числовые поля равны -1, если значение не состоит ровно из ожидаемого
+    количества цифр (2 для типа вызова, 11 для номеров). Строки с
+    fixed == False (пустые, с другим количеством полей или в нестандартном
+    формате) проверяются потоковым валидатором по одной.
+    """
+    line_no: Any
+    call_type: Any
+    subscriber: Any
+    contact: Any
+    # Время начала и окончания в микросекундах от начала эпохи
+    start: Any
+    end: Any
+    start_valid: Any
+    end_valid: Any
+    fixed: Any
+    # Положение строки в data, чтобы получать исходный текст для сообщений об ошибках
+    offsets: Any
+    lengths: Any
+    data: Union[bytes, mmap.mmap]
+
+
+def load_cdr_columns(data: Union[bytes, mmap.mmap], first_line: int = 1) -> CdrColumns:
+    """
+    Загружает содержимое CDR файла или его фрагмента в столбцы.
+
+    Строки фиксированного формата разбираются векторно сразу блоками.
+    Остальные строки разбираются по одной так же, как в потоковом валидаторе.
+
+    Args:
+        data (Union[bytes, mmap.mmap]): Содержимое файла или фрагмента, начинающегося
+            с начала строки; отображение файла в память разбирается без копирования
+        first_line (int): Номер первой строки фрагмента в файле
+
+    Returns:
+        CdrColumns: Столбцы записей
+    """
+    _require_numpy()
+    # Как при чтении файла в текстовом режиме, '\r\n' и '\r' считаются переводом строки
+    # find, а не in: проверка вхождения в mmap перебирает байты по одному
+    if data.find(b'\r') >= 0:
+        data = bytes(data).replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buf == ord('\n'))
+    offsets = np.concatenate(([0], newlines + 1)).astype(np.int64)
+    ends = np.concatenate((newlines, [len(buf)])).astype(np.int64)
+    # После завершающего перевода строки новой строки нет
+    if len(buf) == 0 or buf[-1] == ord('\n'):
+        offsets, ends = offsets[:-1], ends[:-1]
+
+    num_lines = len(offsets)
+    columns = CdrColumns(
+        line_no=np.arange(first_line, first_line + num_lines, dtype=np.int64),
+        call_type=np.full(num_lines, -1, dtype=np.int64),
+        subscriber=np.full(num_lines, -1, dtype=np.int64),
+        contact=np.full(num_lines, -1, dtype=np.int64),
+        start=np.zeros(num_lines, dtype=np.int64),
+        end=np.zeros(num_lines, dtype=np.int64),
+        start_valid=np.zeros(num_lines, dtype=bool),
+        end_valid=np.zeros(num_lines, dtype=bool),
+        fixed=np.zeros(num_lines, dtype=bool),
+        offsets=offsets,
+        lengths=ends - offsets,
+        data=data,
+    )
+
+    candidates, compact, compact_offsets = _fixed_layout_candidates(buf, offsets)
+    positions = np.arange(RECORD_WIDTH, dtype=np.int64)
+    for block_start in range(0, len(candidates), BLOCK_ROWS):
+        rows = candidates[block_start:block_start + BLOCK_ROWS]
+        _load_fixed_rows(columns, compact[compact_offsets[rows, None] + positions], rows)
+
+    for row in np.flatnonzero(~columns.fixed):
+        _load_other_row(columns, int(row))
+
+    return columns
+
+
+def validate_cdr_columns(columns: CdrColumns,
+                         total_lines: Optional[int] = None,
+                         sql_patterns: Iterable[str] = SQL_KEYWORDS,
+                         verbose: bool = False,
+                         rules: Optional[Iterable[str]] = None,
+                         disabled_rules: Iterable[str] = (),
+                         config: CdrRuleConfig = DEFAULT_CONFIG,
+                         stats: Optional[ValidationStats] = None) -> Dict[str, list]:
+    """
+    Проверяет записи в столбцах векторными операциями.
+
+    Результат совпадает с validate_cdr_file для того же содержимого: те же
+    категории, сообщения и порядок ошибок. Номера строк с ошибками берутся
+    из булевых масок, текст строки разбирается заново только для сообщений.
+    Если включено правило, которое не проверяется векторно (см. VECTORIZED_RULES),
+    или config не совместим с форматом фиксированной ширины (номера не из 11
+    цифр, нецифровой код оператора или тип вызова), строки проверяются
+    потоковым валидатором по одной.
+
+    Args:
+        columns (CdrColumns): Столбцы, загруженные load_cdr_columns
+        total_lines (int, optional): Количество строк во всем файле
+            (по умолчанию - количество строк в столбцах)
+        sql_patterns (Iterable[str]): Шаблоны SQL-инъекций
+        verbose (bool): Выводить подробности ошибок (через CdrStreamValidator.echo)
+        rules (Iterable[str], optional): Имена включенных правил (по умолчанию - все)
+        disabled_rules (Iterable[str]): Имена выключенных правил
+        config (CdrRuleConfig): Параметры правил
+        stats (ValidationStats, optional): Профиль, в который добавляется время каждого прохода
+
+    Returns:
+        Dict[str, list]: Словарь с непустыми категориями ошибок
+    """
+    _require_numpy()
+    merged = CdrStreamValidator(sql_patterns=sql_patterns, verbose=verbose,
+                                rules=rules, disabled_rules=disabled_rules, config=config)
+    if total_lines is None:
+        total_lines = len(columns.line_no)
+    enabled = frozenset(rule.name for rule in merged.rules)
+    if not (enabled <= VECTORIZED_RULES and _fits_fixed_layout(config)):
+        with _measure(stats, "serial_lines", len(columns.line_no)):
+            for row in range(len(columns.line_no)):
+                merged.line_no = int(columns.line_no[row]) - 1
+                merged.feed(_row_text(columns, row))
+        return merged.finish(total_lines=total_lines)
+
+    echo = merged.echo if verbose else None
+    # Ошибки собираются вместе с номером строки и упорядочиваются по нему в конце
+    found: Dict[str, List[Tuple[int, Any]]] = {category: [] for category in merged.errors}
+
+    with _measure(stats, "fixed_records", len(columns.line_no)):
+        _check_fixed_records(columns, found, merged.sql_scanner, config, enabled, echo)
+    with _measure(stats, "other_lines", len(columns.line_no)):
+        _check_other_lines(columns, found, merged)
+    if "time_sequence" in enabled:
+        with _measure(stats, "time_sequence", len(columns.line_no)):
+            _check_time_sequence(columns, found)
+    if "midnight_crossing" in enabled:
+        with _measure(stats, "midnight_crossing", len(columns.line_no)):
+            _check_midnight_crossing(columns, found, echo)
+    if "call_overlap" in enabled:
+        with _measure(stats, "call_overlap", len(columns.line_no)):
+            _check_simultaneous_calls(columns, found, echo, config.late_call_window)
+
+    for category, entries in found.items():
+        entries.sort(key=itemgetter(0))
+        merged.errors[category].extend(value for _, value in entries)
+
+    return merged.finish(total_lines=total_lines)
+
+
+def validate_cdr_file_columnar(file_path: str,
+                               sql_patterns: Iterable[str] = SQL_KEYWORDS,
+                               use_mmap: bool = False,
+                               verbose: bool = False,
+                               rules: Optional[Iterable[str]] = None,
+                               disabled_rules: Iterable[str] = (),
+                               config: CdrRuleConfig = DEFAULT_CONFIG,
+                               stats: Optional[ValidationStats] = None) -> Dict[str, List[str]]:
+    """
+    Валидирует CDR файл в пакетном режиме: файл целиком загружается в столбцы NumPy.
+
+    Args:
+        file_path (str): Путь к CDR файлу для валидации
+        sql_patterns (Iterable[str]): Шаблоны SQL-инъекций
+        use_mmap (bool): Разбирать файл через отображение в память, не читая его в буфер
+        verbose (bool): Выводить подробности ошибок (через CdrStreamValidator.echo)
+        rules (Iterable[str], optional): Имена включенных правил (по умолчанию - все)
+        disabled_rules (Iterable[str]): Имена выключенных правил
+        config (CdrRuleConfig): Параметры правил
+        stats (ValidationStats, optional): Профиль, в который добавляется время загрузки и каждого прохода
+
+    Returns:
+        Dict[str, List[str]]: Словарь с категориями ошибок и их описаниями
+    """
+    errors = check_file_presence(file_path)
+    if errors is not None:
+        return errors
+
+    with open(file_path, 'rb') as f:
+        if not use_mmap:
+            with _measure(stats, "load") as stat:
+                columns = load_cdr_columns(f.read())
+                stat.records += len(columns.line_no)
+            return validate_cdr_columns(columns, sql_patterns=sql_patterns, verbose=verbose, rules=rules,
+                                        disabled_rules=disabled_rules, config=config, stats=stats)
+        # Столбцы ссылаются на отображение, поэтому освобождаются до его закрытия
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with _measure(stats, "load") as stat:
+                columns = load_cdr_columns(mapped)
+                stat.records += len(columns.line_no)
+            return validate_cdr_columns(columns, sql_patterns=sql_patterns, verbose=verbose, rules=rules,
+                                        disabled_rules=disabled_rules, config=config, stats=stats)
+
+
+class _RecordValidator(CdrStreamValidator):
+    """Валидатор отдельных строк: межзаписные правила проверяются по столбцам."""
+
+    def check_simultaneous_calls(self, record: CdrRecord) -> None:
+        pass
+
+    def check_time_sequence(self, record: CdrRecord) -> None:
+        pass
+
+    def check_midnight_crossing(self, record: CdrRecord) -> None:
+        pass
+
+
+@contextmanager
+def _measure(stats: Optional[ValidationStats], name: str, records: int = 0) -> Iterator[TimingStat]:
+    # Замер прохода по столбцам; без профиля замер не сохраняется
+    if stats is None:
+        yield TimingStat()
+        return
+    with stats.measure('pass', name) as stat:
+        stat.records += records
+        yield stat
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Для пакетной проверки CDR требуется пакет numpy")
+
+
+def _lookup_table(values: Any, size: int) -> Any:
+    table = np.zeros(size, dtype=bool)
+    table[[value for value in values if value < size]] = True
+    return table
+
+
+def _digits_value(chars: Any) -> Tuple[Any, Any]:
+    # Значение и признак корректности для матрицы символов-цифр
+    digits = chars - np.uint8(ord('0'))
+    valid = (digits <= 9).all(axis=1)
+    digits = digits.astype(np.int64)
+    weights = 10 ** np.arange(chars.shape[1] - 1, -1, -1, dtype=np.int64)
+    return digits @ weights, valid
+
+
+def _fixed_timestamps(chars: Any) -> Tuple[Any, Any]:
+    # Метки YYYY-MM-DDTHH:MM:SS в микросекундах и признак корректной даты и времени
+    valid = ((chars[:, 4] == ord('-')) & (chars[:, 7] == ord('-')) & (chars[:, 10] == ord('T'))
+             & (chars[:, 13] == ord(':')) & (chars[:, 16] == ord(':')))
+    fields = []
+    for begin, end in ((0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19)):
+        value, digits_ok = _digits_value(chars[:, begin:end])
+        fields.append(value)
+        valid &= digits_ok
+    year, month, day, hour, minute, second = fields
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    days_in_month = np.array(_DAYS_IN_MONTH, dtype=np.int64)[np.clip(month, 0, 12)] + (leap & (month == 2))
+    valid &= ((year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= days_in_month)
+              & (hour <= 23) & (minute <= 59) & (second <= 59))
+
+    # Номер дня от начала эпохи по григорианскому календарю
+    shifted_year = year - (month <= 2)
+    era = shifted_year // 400
+    year_of_era = shifted_year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    days = era * 146097 + day_of_era - 719468
+
+    seconds = days * SECONDS_PER_DAY + hour * 3600 + minute * 60 + second
+    return seconds * TICKS_PER_SECOND, valid
+
+
+def _fixed_layout_candidates(buf: Any, offsets: Any) -> Tuple[Any, Any, Any]:
+    # Строки, которые без пробелов на краях полей имеют ширину фиксированного формата:
+    # возвращаются их номера, байты файла без пробелов и начала строк в них
+    space = _lookup_table(_WHITESPACE, 256)[buf]
+    newline = buf == ord('\n')
+    comma = buf == ord(',')
+    kept = ~space & ~newline
+    allowed = _lookup_table(range(0x20, 0x7f), 256)[buf] | space | newline
+
+    if len(offsets) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, buf, empty
+    # Сегмент строки включает ее перевод строки; у пустой строки в середине файла
+    # reduceat возвращает значение для байта перевода строки, то есть 0
+    kept_count = np.add.reduceat(kept, offsets, dtype=np.int64)
+    comma_count = np.add.reduceat(comma, offsets, dtype=np.int64)
+    other_count = np.add.reduceat(~allowed, offsets, dtype=np.int64)
+    candidate = (kept_count == RECORD_WIDTH) & (comma_count == 4) & (other_count == 0)
+
+    # Пробелы внутри поля (между двумя значащими символами, не запятыми) исключают строку
+    spaces = np.flatnonzero(space)
+    if len(spaces):
+        run_break = np.diff(spaces) != 1
+        before = spaces[np.r_[True, run_break]] - 1
+        after = spaces[np.r_[run_break, True]] + 1
+        content = kept & ~comma
+        inner = (content[np.maximum(before, 0)] & (before >= 0)
+                 & content[np.minimum(after, len(buf) - 1)] & (after < len(buf)))
+        candidate[np.searchsorted(offsets, before[inner], side='right') - 1] = False
+
+    compact_offsets = np.zeros(len(offsets), dtype=np.int64)
+    np.cumsum(kept_count[:-1], out=compact_offsets[1:])
+    return np.flatnonzero(candidate), buf[kept], compact_offsets
+
+
+def _load_fixed_rows(columns: CdrColumns, record: Any, rows: Any) -> None:
+    # Записи-кандидаты без пробелов: запятые должны стоять на границах полей
+    layout = np.ones(len(rows), dtype=bool)
+    for offset in _COMMA_OFFSETS:
+        layout &= record[:, offset] == ord(',')
+    rows, record = rows[layout], record[layout]
+
+    call_type, call_type_ok = _digits_value(record[:, 0:2])
+    subscriber, subscriber_ok = _digits_value(record[:, 3:14])
+    contact, contact_ok = _digits_value(record[:, 15:26])
+    start, start_ok = _fixed_timestamps(record[:, 27:46])
+    end, end_ok = _fixed_timestamps(record[:, 47:66])
+
+    # Строки с некорректной меткой времени разбираются по одной, как в потоковом валидаторе
+    timed = start_ok & end_ok
+    rows = rows[timed]
+    columns.call_type[rows] = np.where(call_type_ok, call_type, -1)[timed]
+    columns.subscriber[rows] = np.where(subscriber_ok, subscriber, -1)[timed]
+    columns.contact[rows] = np.where(contact_ok, contact, -1)[timed]
+    columns.start[rows] = start[timed]
+    columns.end[rows] = end[timed]
+    columns.start_valid[rows] = True
+    columns.end_valid[rows] = True
+    columns.fixed[rows] = True
+
+
+def _load_other_row(columns: CdrColumns, row: int) -> None:
+    parts = _row_parts(columns, row)
+    if len(parts) != 5:
+        return
+
+    record = CdrRecord.from_parts(parts, int(columns.line_no[row]))
+    columns.call_type[row] = _fixed_digits(record.call_type, 2)
+    columns.subscriber[row] = _fixed_digits(str(record.subscriber), 11)
+    columns.contact[row] = _fixed_digits(str(record.contact), 11)
+    if record.start is not None:
+        columns.start[row] = int(record.start * TICKS_PER_SECOND)
+        columns.start_valid[row] = True
+    if record.end is not None:
+        columns.end[row] = int(record.end * TICKS_PER_SECOND)
+        columns.end_valid[row] = True
+
+
+def _fixed_digits(value: str, width: int) -> int:
+    if len(value) == width and value.isascii() and value.isdigit():
+        return int(value)
+    return -1
+
+
+def _fits_fixed_fields(pattern: str) -> bool:
+    # Может ли шаблон встретиться внутри цифрового поля или метки времени фиксированного формата
+    for template in _FIXED_FIELD_TEMPLATES:
+        for offset in range(len(template) - len(pattern) + 1):
+            if all(char in '0123456789' if expected == 'd' else char == expected
+                   for char, expected in zip(pattern, template[offset:])):
+                return True
+    return False
+
+
+def _fits_fixed_layout(config: CdrRuleConfig) -> bool:
+    # Векторные проверки рассчитаны на номера из 11 цифр и цифровые типы вызова из 2 символов
+    code = config.operator_code
+    return (config.number_length == 11
+            and code.isascii() and code.isdigit() and len(code) < 11
+            and all(len(call_type) == 2 and call_type.isascii() and call_type.isdigit()
+                    for call_type in config.call_types))
+
+
+def _row_text(columns: CdrColumns, row: int) -> str:
+    offset = int(columns.offsets[row])
+    raw = columns.data[offset:offset + int(columns.lengths[row])]
+    return raw.decode(locale.getpreferredencoding(False))
+
+
+def _row_parts(columns: CdrColumns, row: int) -> List[str]:
+    return [part.strip() for part in _row_text(columns, row).strip().split(',')]
+
+
+def _check_fixed_records(columns: CdrColumns,
+                         found: Dict[str, List[Tuple[int, Any]]],
+                         sql_scanner: SqlInjectionScanner,
+                         config: CdrRuleConfig,
+                         enabled: FrozenSet[str],
+                         echo: Optional[Callable[[str], None]]) -> None:
+    # Правила отдельной записи для строк фиксированного формата: все поля
+    # имеют нужную длину, а метки времени корректны
+    fixed = columns.fixed
+    line_no = columns.line_no
+    subscriber = columns.subscriber
+
+    if "operator_code" in enabled:
+        # Код оператора: цифры номера абонента после первой
+        expected = config.operator_code
+        operator_code = subscriber // 10 ** (10 - len(expected)) % 10 ** len(expected)
+        for row in np.flatnonzero(fixed & (((subscriber >= 0) & (operator_code != int(expected))) | (subscriber < 0))):
+            number = _row_parts(columns, row)[1]
+            code = number[1:1 + len(expected)]
+            if code != expected:
+                found["operator_code"].append((int(line_no[row]), (
+                    f"Строка {line_no[row]}: Неверный код оператора '{code}' "
+                    f"в номере {number}. Ожидается код '{expected}'"
+                )))
+
+    if "call_type" in enabled:
+        allowed = [int(call_type) for call_type in config.call_types]
+        for row in np.flatnonzero(fixed & ~np.isin(columns.call_type, allowed)):
+            call_type = _row_parts(columns, row)[0]
+            found["record_format"].append((int(line_no[row]), (
+                f"Строка {line_no[row]}: Неподдерживаемый тип вызова '{call_type}' "
+                f"(допустимо: {' или '.join(config.call_types)})"
+            )))
+
+    if "phone_numbers" in enabled:
+        # Поля номеров в фиксированном формате всегда из 11 символов
+        for row in np.flatnonzero(fixed & ((subscriber < 0) | (columns.contact < 0))):
+            phone_errors = [
+                "Номер содержит нецифровые символы"
+                for number in (subscriber[row], columns.contact[row])
+                if number < 0
+            ]
+            found["phone_numbers"].append((int(line_no[row]), phone_errors))
+            if echo is not None:
+                echo(f"Строка {line_no[row]}: " + "; ".join(phone_errors))
+
+    if "timestamps" in enabled:
+        _check_fixed_timestamps(columns, found)
+    if "sql_injection" in enabled:
+        _check_fixed_sql_injection(columns, found, sql_scanner)
+
+
+def _check_fixed_timestamps(columns: CdrColumns, found: Dict[str, List[Tuple[int, Any]]]) -> None:
+    fixed = columns.fixed
+    line_no = columns.line_no
+    duration = columns.end - columns.start
+    for row in np.flatnonzero(fixed & (duration < TICKS_PER_SECOND)):
+        parts = _row_parts(columns, row)
+        time_errors = []
+        if duration[row] < 0:
+            time_errors.append(f"Время окончания ({parts[4]}) раньше времени начала ({parts[3]})")
+        time_errors.append("Длительность звонка менее 1 секунды")
+        found["timestamps"].append((int(line_no[row]), f"Строка {line_no[row]}: " + "; ".join(time_errors)))
+
+
+def _check_fixed_sql_injection(columns: CdrColumns,
+                               found: Dict[str, List[Tuple[int, Any]]],
+                               sql_scanner: SqlInjectionScanner) -> None:
+    fixed = columns.fixed
+    line_no = columns.line_no
+    # Обычно шаблон не может встретиться в цифровом поле или метке времени,
+    # и проверять нужно только записи с нецифровыми символами в номерах или типе вызова
+    suspicious = fixed & ((columns.call_type < 0) | (columns.subscriber < 0) | (columns.contact < 0))
+    if any(_fits_fixed_fields(pattern) for pattern in sql_scanner.patterns):
+        suspicious = fixed
+    for row in np.flatnonzero(suspicious):
+        parts = _row_parts(columns, row)
+        part = sql_scanner.find(','.join(parts), parts)
+        if part is not None:
+            found["security"].append((
+                int(line_no[row]),
+                f"Строка {line_no[row]}: Обнаружена возможная SQL-инъекция в поле '{part}'"
+            ))
+
+
+def _check_other_lines(columns: CdrColumns,
+                       found: Dict[str, List[Tuple[int, Any]]],
+                       merged: CdrStreamValidator) -> None:
+    # Строки не фиксированного формата проверяются потоковым валидатором по одной
+    # с теми же правилами и параметрами; подробности выводятся через merged.echo
+    validator = _RecordValidator(sql_patterns=merged.sql_scanner.patterns, verbose=merged.verbose,
+                                 rules=[rule.name for rule in merged.rules], config=merged.config)
+    validator.echo = merged.echo
+    errors = validator.errors
+    for row in np.flatnonzero(~columns.fixed):
+        line_no = int(columns.line_no[row])
+        counts = {category: len(values) for category, values in errors.items()}
+        validator.line_no = line_no - 1
+        validator.feed(_row_text(columns, row))
+        for category, values in errors.items():
+            found[category].extend((line_no, value) for value in values[counts[category]:])
+
+
+def _check_time_sequence(columns: CdrColumns, found: Dict[str, List[Tuple[int, Any]]]) -> None:
+    # Каждая запись с корректным временем начала сравнивается с предыдущей такой записью
+    rows = np.flatnonzero(columns.start_valid)
+    start = columns.start[rows]
+    violations = np.flatnonzero(start[1:] < start[:-1])
+    for current, previous in zip(rows[violations + 1], rows[violations]):
+        line_no = int(columns.line_no[current])
+        found["time_sequence"].append((line_no, (
+            f"Строка {line_no}: Нарушение хронологического порядка. "
+            f"Текущее время начала {_row_parts(columns, current)[3]} раньше времени начала "
+            f"предыдущей записи {normalize_timestamp(_row_parts(columns, previous)[3])}"
+        )))
+
+
+def _check_midnight_crossing(columns: CdrColumns,
+                             found: Dict[str, List[Tuple[int, Any]]],
+                             echo: Optional[Callable[[str], None]]) -> None:
+    start, end = columns.start, columns.end
+    start_day = start // TICKS_PER_DAY
+    end_day = end // TICKS_PER_DAY
+    midnight = end_day * TICKS_PER_DAY
+    crossing = (columns.start_valid & columns.end_valid & (start_day < end_day)
+                & (start != midnight) & (end != midnight))
+
+    for row in np.flatnonzero(crossing):
+        line_no = int(columns.line_no[row])
+        found["midnight_crossing"].append((line_no, "Звонок пересекает полночь и не делится на 2 звонка"))
+        if echo is not None:
+            parts = _row_parts(columns, row)
+            echo(
+                f"Строка {line_no}: Звонок пересекает полночь "
+                f"(с {parts[3]} по {parts[4]}) "
+                f"и должен быть разделен на две записи: "
+                f"1) до 23:59:59 {format_day(int(start_day[row]))} и "
+                f"2) с 00:00:00 {format_day(int(end_day[row]))}"
+            )
+
+
+def _segmented_prefix_max(values: Any, groups: Any) -> Any:
+    # Накопленный максимум внутри подряд идущих групп (сканирование удвоением шага)
+    result = values.copy()
+    shift = 1
+    while shift < len(result):
+        same_group = groups[shift:] == groups[:-shift]
+        np.maximum(result[shift:], np.where(same_group, result[:-shift], result[shift:]), out=result[shift:])
+        shift *= 2
+    return result
+
+
+def _check_simultaneous_calls(columns: CdrColumns,
+                              found: Dict[str, List[Tuple[int, Any]]],
+                              echo: Optional[Callable[[str], None]],
+                              late_call_window: Optional[int]) -> None:
+    # Пересечения ищутся так же, как в CallOverlapIndex: звонок i конфликтует
+    # с предыдущим звонком j абонента, если j заканчивается позже начала i
+    # и позже линии заметания i минус окно late_call_window и начинается раньше конца i
+    rows = np.flatnonzero(columns.start_valid & columns.end_valid)
+    if len(rows) == 0:
+        return
+    watermark = np.maximum.accumulate(columns.start[rows])
+
+    # Номера из 11 цифр уже являются ключами, остальным абонентам выдаются отрицательные ключи
+    window = None if late_call_window is None else late_call_window * TICKS_PER_SECOND
+    keys = columns.subscriber[rows].copy()
+    other_keys: Dict[str, int] = {}
+    for position in np.flatnonzero(keys < 0):
+        subscriber = _row_parts(columns, rows[position])[1]
+        keys[position] = other_keys.setdefault(subscriber, -2 - len(other_keys))
+    names = {key: subscriber for subscriber, key in other_keys.items()}
+
+    # Далее звонки абонента идут подряд в порядке строк
+    order = np.argsort(keys, kind='stable')
+    rows, keys, watermark = rows[order], keys[order], watermark[order]
+    start = columns.start[rows]
+    end = columns.end[rows]
+    positions = np.arange(len(rows))
+    group_start = np.maximum.accumulate(np.where(np.r_[True, keys[1:] != keys[:-1]], positions, 0))
+    # Самое позднее окончание звонков абонента до текущего включительно
+    latest_end = _segmented_prefix_max(end, keys)
+
+    # Предыдущие звонки абонента перебираются с увеличением отступа, пока среди
+    # более ранних остается звонок, заканчивающийся позже начала текущего
+    current, other = [positions[:0]], [positions[:0]]
+    pending = positions
+    lag = 1
+    while len(pending) and lag <= MAX_OVERLAP_LAG:
+        pending = pending[pending - lag >= group_start[pending]]
+        pending = pending[latest_end[pending - lag] > start[pending]]
+        previous = pending - lag
+        hit = (end[previous] > start[pending]) & (start[previous] < end[pending])
+        if window is not None:
+            hit &= end[previous] > watermark[pending] - window
+        current.append(pending[hit])
+        other.append(previous[hit])
+        lag += 1
+    current, other = np.concatenate(current), np.concatenate(other)
+
+    if len(pending):
+        # Абоненты с длинными сериями пересекающихся звонков проверяются индексом пересечений
+        slow = np.isin(keys, np.unique(keys[pending]))
+        fast = ~slow[current]
+        slow_current, slow_other = _index_conflicts(rows, keys, start, end, watermark, np.flatnonzero(slow), window)
+        current = np.concatenate((current[fast], slow_current))
+        other = np.concatenate((other[fast], slow_other))
+
+    line_no = columns.line_no[rows]
+    for position in np.lexsort((line_no[other], line_no[current])):
+        call = current[position]
+        call_dir = "исходящих" if columns.call_type[rows[call]] == 1 else "входящих"
+        found["call_logic"].append((int(line_no[call]), f"Конфликт {call_dir} вызовов"))
+        if echo is not None:
+            key = int(keys[call])
+            subscriber = names[key] if key < 0 else f"{key:011d}"
+            echo(
+                f"Строка {line_no[call]}: Конфликт {call_dir} вызова с строкой {line_no[other[position]]} "
+                f"для абонента {subscriber} (пересечение временных интервалов)"
+            )
+
+
+def _index_conflicts(rows: Any, keys: Any, start: Any, end: Any, watermark: Any,
+                     selected: Any, window: Optional[int]) -> Tuple[Any, Any]:
+    # Пересечения выбранных звонков через CallOverlapIndex в порядке строк;
+    # вместо номеров строк в индексе хранятся позиции звонков в массивах
+    index = CallOverlapIndex(window=window)
+    current, other = [], []
+    for position in selected[np.argsort(rows[selected])]:
+        key, call_start, call_end = int(keys[position]), int(start[position]), int(end[position])
+        index.advance(int(watermark[position]))
+        for other_position, _ in index.conflicts(key, call_start, call_end):
+            current.append(position)
+            other.append(other_position)
+        index.insert(key, call_start, call_end, int(position))
+    return np.array(current, dtype=np.int64), np.array(other, dtype=np.int64)
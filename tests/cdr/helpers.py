@@ -1,249 +1,696 @@
 import os
-from datetime import datetime, time
-from typing import List, Dict, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Callable, List, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
 import re
 
-def validate_cdr_file(file_path: str) -> Dict[str, List[str]]:
+from tests.cdr.cache import ResultCache
+from tests.cdr.overlaps import CallOverlapIndex
+from tests.cdr.profiling import ValidationStats
+from tests.cdr.reader import iter_mmap_lines
+from tests.cdr.record import PHONE_NUMBER_LENGTH, CdrRecord
+from tests.cdr.report import ERROR_CODES, ERROR_RULES, FIELD_NAMES, CdrError, ErrorValue
+from tests.cdr.rules import (
+    DEFAULT_CONFIG, NUMBER_FIELDS, TIME_FIELDS, CdrRule, CdrRuleConfig, required_fields, resolve_rules
+)
+from tests.cdr.sql_injection import SQL_KEYWORDS, SqlInjectionScanner
+from tests.cdr.timestamps import SECONDS_PER_DAY, day_number, format_day, normalize_timestamp
+
+def _new_errors() -> Dict[str, list]:
+    return {rule: [] for rule in ERROR_RULES}
+
+
+class CdrStreamValidator:
     """
-    Валидирует CDR файл и возвращает список найденных ошибок с описанием.
-    
-    Args:
-        file_path (str): Путь к CDR файлу для валидации
-        
-    Returns:
-        Dict[str, List[str]]: Словарь с категориями ошибок и их описаниями
+    Потоковый валидатор CDR: каждая строка читается и разбирается один раз,
+    все проверки выполняются по результату этого разбора.
+
+    Состояние между строками ограничено предыдущим временем начала, звонками,
+    активными на линии заметания индекса пересечений, и звонками, закончившимися
+    за config.late_call_window секунд до нее, поэтому расход памяти не зависит
+    от размера файла (кроме late_call_window=None - точной проверки записей вне
+    хронологии со всеми предыдущими звонками).
+
+    Ошибки собираются в двух видах: словарь errors с описаниями по категориям
+    и список issues из CdrError. Подробности ошибок печатаются в консоль
+    только при verbose=True. После max_errors ошибок в issues, а при fail_fast -
+    после первой ошибки (или первой ошибки категорий fail_rules) признак stopped
+    сообщает, что дальнейшие строки можно не проверять.
+
+    Проверяются правила из реестра tests.cdr.rules (по умолчанию - все) с
+    параметрами config. Все включенные правила выполняются за один проход
+    по результату одного разбора строки; поля, которые не читает ни одно
+    правило (например, метки времени), не разбираются.
     """
-    errors = {
-        "file_structure": [],
-        "record_format": [],
-        "phone_numbers": [],
-        "timestamps": [],
-        "call_logic": [],
-        "security": [],
-        "time_sequence": [],
-        "midnight_crossing": [],
-        "operator_code": []
-    }
-    
-    # Проверка существования файла
-    if not os.path.exists(file_path):
-        errors["file_structure"].append("Файл не существует")
-        return errors
-    
-    # Проверка размера файла
-    if os.path.getsize(file_path) == 0:
-        errors["file_structure"].append("Файл пустой")
-        return errors
-    
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-    
-    # Проверка количества записей
-    if len(lines) < 10:
-        errors["file_structure"].append(len(lines))
-    elif len(lines) > 10:
-        errors["file_structure"].append(len(lines))
-    
-    # Проверка каждой записи
-    for i, line in enumerate(lines, 1):
+
+    def __init__(self,
+                 first_line: int = 1,
+                 sql_patterns: Iterable[str] = SQL_KEYWORDS,
+                 max_errors: Optional[int] = None,
+                 verbose: bool = False,
+                 fail_fast: bool = False,
+                 fail_rules: Optional[Iterable[str]] = None,
+                 rules: Optional[Iterable[str]] = None,
+                 disabled_rules: Iterable[str] = (),
+                 config: CdrRuleConfig = DEFAULT_CONFIG,
+                 stats: Optional[ValidationStats] = None):
+        self.errors = _new_errors()
+        self.issues: List[CdrError] = []
+        self.max_errors = max_errors
+        self.verbose = verbose
+        self.fail_fast = fail_fast
+        self.fail_rules = None if fail_rules is None else frozenset(fail_rules)
+        if self.fail_rules is not None and not self.fail_rules <= set(ERROR_RULES):
+            unknown = ", ".join(sorted(self.fail_rules - set(ERROR_RULES)))
+            raise ValueError(f"Неизвестные категории ошибок: {unknown}")
+        self.stopped = False
+        self.line_count = 0
+        self.line_no = first_line - 1
+        # Последняя запись с корректным временем начала
+        self.prev_timed: Optional[CdrRecord] = None
+        self.overlaps = CallOverlapIndex(window=config.late_call_window)
+        self.sql_scanner = SqlInjectionScanner(sql_patterns)
+        # Текст и поля текущей строки (для правил, читающих строку целиком)
+        self.line_text = ''
+        self.line_parts: List[str] = []
+
+        self.config = config
+        self.rules = resolve_rules(rules, disabled_rules)
+        fields = required_fields(self.rules)
+        self._parse_numbers = not fields.isdisjoint(NUMBER_FIELDS)
+        self._parse_times = not fields.isdisjoint(TIME_FIELDS)
+        self.stats = stats
+        self._record_checks = [self._bind_rule(rule) for rule in self.rules if rule.scope != 'file']
+        self._file_checks = [self._bind_rule(rule) for rule in self.rules if rule.scope == 'file']
+        # Номер из 11 цифр хранится как int: код оператора сравнивается без перевода в строку
+        code = config.operator_code
+        self._operator_divisor = 10 ** max(PHONE_NUMBER_LENGTH - 1 - len(code), 0)
+        self._operator_modulus = 10 ** len(code)
+        self._operator_number = int(code) if code.isascii() and code.isdigit() else None
+        self._call_types = frozenset(config.call_types)
+        self.total_lines = 0
+
+        if stats is not None:
+            # Замеры подменяют этапы разбора на этом объекте;
+            # без профилирования они вызываются напрямую
+            self.check_structure = stats.timed('stage', 'structure', self.check_structure)
+            self.parse_record = stats.timed('stage', 'parse', self.parse_record)
+            self.echo = stats.timed('stage', 'print', self.echo)
+
+    def feed(self, line: str) -> Optional[CdrRecord]:
+        """
+        Проверяет очередную строку файла.
+
+        Args:
+            line (str): Строка файла (с символом перевода строки или без)
+
+        Returns:
+            Optional[CdrRecord]: Разобранная запись или None, если строка не содержит 5 полей
+        """
+        line = self.check_structure(line)
+        if line is None:
+            return None
+
+        record = self.parse_record(line)
+        for check in self._record_checks:
+            check(record)
+        return record
+
+    def parse_record(self, line: str) -> CdrRecord:
+        """Разбирает строку из 5 полей в запись (только поля, которые читают включенные правила)."""
+        parts = [part.strip() for part in line.split(',')]
+        self.line_text = line
+        self.line_parts = parts
+        return CdrRecord.from_parts(parts, self.line_no, self._parse_numbers, self._parse_times)
+
+    def echo(self, message: str) -> None:
+        """Печатает подробности ошибки в консоль (вызывается только при verbose=True)."""
+        print(message)
+
+    def _bind_rule(self, rule: CdrRule) -> Callable[[Optional[CdrRecord]], None]:
+        check = rule.bind(self)
+        if self.stats is None:
+            return check
+        return self.stats.timed('rule', rule.name, check)
+
+    def check_structure(self, line: str) -> Optional[str]:
+        """
+        Проверяет только структуру очередной строки: пустую строку и количество полей.
+
+        Поля при этом не разбираются, поэтому предварительный просмотр файла
+        этой проверкой намного дешевле полной проверки.
+
+        Args:
+            line (str): Строка файла (с символом перевода строки или без)
+
+        Returns:
+            Optional[str]: Строка без пробелов по краям или None, если строка не содержит 5 полей
+        """
+        self.line_count += 1
+        self.line_no += 1
+        i = self.line_no
+
         line = line.strip()
         if not line:
-            errors["record_format"].append(f"Строка {i}: Пустая строка")
-            continue
-            
-        parts = [part.strip() for part in line.split(',')]
-        
+            self.errors["record_format"].append(f"Строка {i}: Пустая строка")
+            self.add_issue(i, "record_format", "empty_line")
+            return None
+
         # Проверка количества полей в записи
-        if len(parts) != 5:
-            errors["record_format"].append(len(parts))
-            print( f"Строка {i}: Неправильное количество полей ({len(parts)} вместо 5)")
-            continue
-        
-        call_type, subscriber, contact, start_time, end_time = parts
+        field_count = line.count(',') + 1
+        if field_count != 5:
+            self.errors["record_format"].append(field_count)
+            self.add_issue(i, "record_format", "field_count", value=field_count)
+            if self.verbose:
+                self.echo(f"Строка {i}: Неправильное количество полей ({field_count} вместо 5)")
+            return None
+
+        return line
+
+    def add_issue(self, line: int, rule: str, code: str,
+                  field: Optional[str] = None, value: ErrorValue = None) -> None:
+        """Добавляет ошибку в список issues (описание в errors добавляется отдельно)."""
+        self.issues.append(CdrError(line, rule, code, field, value))
+        if self.max_errors is not None and len(self.issues) >= self.max_errors:
+            self.stopped = True
+        if self.fail_fast and (self.fail_rules is None or rule in self.fail_rules):
+            self.stopped = True
 
+    def finish(self, total_lines: Optional[int] = None) -> Dict[str, list]:
+        """
+        Завершает проверку и возвращает найденные ошибки.
+
+        Args:
+            total_lines (int, optional): Количество строк во всем файле
+                (по умолчанию - количество проверенных строк)
+
+        Returns:
+            Dict[str, list]: Словарь с непустыми категориями ошибок
+        """
+        if total_lines is None:
+            total_lines = self.line_count
+        self.total_lines = total_lines
+
+        # Правила файла целиком (после досрочной остановки количество строк неизвестно)
+        if not self.stopped:
+            for check in self._file_checks:
+                check(None)
+
+        # Удаляем пустые категории ошибок
+        return {k: v for k, v in self.errors.items() if v}
+
+    def check_record_count(self, record: Optional[CdrRecord]) -> None:
+        # Проверка количества записей
+        if self.total_lines != self.config.record_count:
+            self.errors["file_structure"].append(self.total_lines)
+            self.add_issue(0, "file_structure", "record_count", value=self.total_lines)
+
+    def check_operator_code(self, record: CdrRecord) -> None:
         # Проверка кода оператора для первого номера (subscriber)
-        if len(subscriber) >= 4:  # Минимум 4 цифры (7 + код оператора)
-            operator_code = subscriber[1:4]  # Вторая, третья и четвертая цифры
-            if operator_code != '900':
-                errors["operator_code"].append(
-                    f"Строка {i}: Неверный код оператора '{operator_code}' "
-                    f"в номере {subscriber}. Ожидается код '900'"
-                )
-        
+        i = record.line_no
+        subscriber = record.subscriber
+        expected = self.config.operator_code
+
+        if isinstance(subscriber, int):
+            # Корректный номер из 11 цифр
+            if subscriber // self._operator_divisor % self._operator_modulus == self._operator_number:
+                return
+            operator_code = str(subscriber)[1:1 + len(expected)]
+        elif len(subscriber) > len(expected):  # Минимум 7 и код оператора
+            operator_code = subscriber[1:1 + len(expected)]  # Цифры после первой
+            if operator_code == expected:
+                return
+        else:
+            return
+
+        self.errors["operator_code"].append(
+            f"Строка {i}: Неверный код оператора '{operator_code}' "
+            f"в номере {subscriber}. Ожидается код '{expected}'"
+        )
+        self.add_issue(i, "operator_code", "operator_code", "subscriber", operator_code)
+
+    def check_call_type(self, record: CdrRecord) -> None:
         # Проверка типа вызова
-        if call_type not in ('01', '02'):
-            errors["record_format"].append(
-                f"Строка {i}: Неподдерживаемый тип вызова '{call_type}' (допустимо: 01 или 02)"
+        if record.call_type not in self._call_types:
+            allowed = " или ".join(self.config.call_types)
+            self.errors["record_format"].append(
+                f"Строка {record.line_no}: Неподдерживаемый тип вызова '{record.call_type}' (допустимо: {allowed})"
             )
-        
+            self.add_issue(record.line_no, "record_format", "call_type", "call_type", record.call_type)
+
+    def check_phone_numbers(self, record: CdrRecord) -> None:
         # Проверка номеров телефонов
+        i = record.line_no
+        number_length = self.config.number_length
         phone_errors = []
-        for field, number in [('subscriber', subscriber), ('contact', contact)]:
+        for field, number in (("subscriber", record.subscriber), ("contact", record.contact)):
+            if isinstance(number, int):
+                # Номер из 11 цифр разобран при создании записи
+                if number_length == PHONE_NUMBER_LENGTH:
+                    continue
+                number = str(number)
             if not number:
                 phone_errors.append("Номер телефона отсутствует")
+                self.add_issue(i, "phone_numbers", "missing_number", field)
             else:
                 if not number.isdigit():
                     phone_errors.append("Номер содержит нецифровые символы")
-                if len(number) != 11:
+                    self.add_issue(i, "phone_numbers", "non_digit_number", field, number)
+                if len(number) != number_length:
                     phone_errors.append(len(number))
+                    self.add_issue(i, "phone_numbers", "number_length", field, len(number))
 
         if phone_errors:
-            errors["phone_numbers"].append(phone_errors)
-            print(f"Строка {i}: " + "; ".join(str(phone_errors)))
-        
+            self.errors["phone_numbers"].append(phone_errors)
+            if self.verbose:
+                self.echo(f"Строка {i}: " + "; ".join(map(str, phone_errors)))
+
+    def check_timestamps(self, record: CdrRecord) -> None:
         # Проверка временных меток
+        i = record.line_no
         time_errors = []
-        try:
-            start_dt = datetime.fromisoformat(start_time)
-        except ValueError:
-            time_errors.append(f"Некорректный формат времени начала '{start_time}'")
-        
-        try:
-            end_dt = datetime.fromisoformat(end_time)
-        except ValueError:
-            time_errors.append(f"Некорректный формат времени окончания '{end_time}'")
-        
-        if not time_errors and 'start_dt' in locals() and 'end_dt' in locals():
-            if end_dt < start_dt:
-                time_errors.append(f"Время окончания ({end_time}) раньше времени начала ({start_time})")
-            if (end_dt - start_dt).total_seconds() < 1:
+        if record.start is None:
+            time_errors.append(f"Некорректный формат времени начала '{record.start_time}'")
+            self.add_issue(i, "timestamps", "start_format", "start_time", record.start_time)
+        if record.end is None:
+            time_errors.append(f"Некорректный формат времени окончания '{record.end_time}'")
+            self.add_issue(i, "timestamps", "end_format", "end_time", record.end_time)
+
+        if not time_errors:
+            if record.end < record.start:
+                time_errors.append(
+                    f"Время окончания ({record.end_time}) раньше времени начала ({record.start_time})"
+                )
+                self.add_issue(i, "timestamps", "end_before_start", "end_time", record.end_time)
+            if record.end - record.start < 1:
                 time_errors.append("Длительность звонка менее 1 секунды")
-        
+                self.add_issue(i, "timestamps", "short_call", "end_time", record.end_time)
+
         if time_errors:
-            errors["timestamps"].append(f"Строка {i}: " + "; ".join(time_errors))
-        
+            self.errors["timestamps"].append(f"Строка {i}: " + "; ".join(time_errors))
+
+    def check_sql_injection(self, record: CdrRecord) -> None:
         # Проверка на SQL-инъекции
-        sql_keywords = ['select', 'insert', 'update', 'delete', 'drop', 'alter', 'create']
-        for part in parts:
-            if any(keyword in part.lower() for keyword in sql_keywords):
-                errors["security"].append(f"Строка {i}: Обнаружена возможная SQL-инъекция в поле '{part}'")
-                break
-    
-    # Дополнительные проверки логики звонков
-    if len(lines) >= 10:
-        # Проверка одновременных звонков
-        calls_by_subscriber = {}
-        for i, line in enumerate(lines[:10], 1):
-            parts = [part.strip() for part in line.split(',')]
-            if len(parts) != 5:
-                continue
-                
-            call_type, subscriber, _, start_time, end_time = parts
-            try:
-                start_dt = datetime.fromisoformat(start_time)
-                end_dt = datetime.fromisoformat(end_time)
-            except ValueError:
-                continue
-            
-            if subscriber not in calls_by_subscriber:
-                calls_by_subscriber[subscriber] = []
-            
-            # Проверка пересечения временных интервалов
-            for call in calls_by_subscriber[subscriber]:
-                other_start, other_end, other_line = call
-                if not (end_dt <= other_start or start_dt >= other_end):
-                    call_dir = "исходящих" if call_type == '01' else "входящих"
-                    errors["call_logic"].append(f"Конфликт {call_dir} вызовов")
-                    print(
-                        f"Строка {i}: Конфликт {call_dir} вызова с строкой {other_line} "
-                        f"для абонента {subscriber} (пересечение временных интервалов)"
-                    )
-            
-            calls_by_subscriber[subscriber].append((start_dt, end_dt, i))
+        parts = self.line_parts
+        part = self.sql_scanner.find(self.line_text, parts)
+        if part is not None:
+            self.errors["security"].append(
+                f"Строка {record.line_no}: Обнаружена возможная SQL-инъекция в поле '{part}'"
+            )
+            self.add_issue(record.line_no, "security", "sql_injection", FIELD_NAMES[parts.index(part)], part)
 
+    def check_simultaneous_calls(self, record: CdrRecord) -> None:
+        # Проверка одновременных звонков абонента по всему файлу
+        if record.start is None or record.end is None:
+            return
 
-    # Проверка хронологического порядка записей
-    prev_start_time = None
-    time_sequence_errors = []
-    
-    for i, line in enumerate(lines, 1):
-        line = line.strip()
-        if not line:
-            continue
-            
-        parts = [part.strip() for part in line.split(',')]
-        if len(parts) != 5:
-            continue
-        
-        _, _, _, start_time, _ = parts  # Нас интересует только время начала
-        
-        try:
-            current_start = datetime.fromisoformat(start_time)
-            
-            if prev_start_time is not None and current_start < prev_start_time:
-                time_sequence_errors.append(
-                    f"Строка {i}: Нарушение хронологического порядка. "
-                    f"Текущее время начала {start_time} раньше времени начала "
-                    f"предыдущей записи {prev_start_time.isoformat()}"
+        for other_line, _ in self.overlaps.add(record.subscriber, record.start, record.end, record.line_no):
+            self.report_call_conflict(record, other_line)
+
+    def report_call_conflict(self, record: CdrRecord, other_line: int) -> None:
+        """Добавляет ошибку пересечения звонка record со звонком из строки other_line."""
+        outgoing = record.call_type == '01'
+        call_dir = "исходящих" if outgoing else "входящих"
+        self.errors["call_logic"].append(f"Конфликт {call_dir} вызовов")
+        code = "outgoing_overlap" if outgoing else "incoming_overlap"
+        self.add_issue(record.line_no, "call_logic", code, "start_time", other_line)
+        if self.verbose:
+            self.echo(
+                f"Строка {record.line_no}: Конфликт {call_dir} вызова с строкой {other_line} "
+                f"для абонента {record.subscriber} (пересечение временных интервалов)"
+            )
+
+    def check_time_sequence(self, record: CdrRecord) -> None:
+        # Проверка хронологического порядка записей
+        if record.start is None:
+            return
+
+        prev = self.prev_timed
+        if prev is not None and record.start < prev.start:
+            self.errors["time_sequence"].append(
+                f"Строка {record.line_no}: Нарушение хронологического порядка. "
+                f"Текущее время начала {record.start_time} раньше времени начала "
+                f"предыдущей записи {normalize_timestamp(prev.start_time)}"
+            )
+            self.add_issue(record.line_no, "time_sequence", "time_order", "start_time", record.start_time)
+
+        # Обновляем предыдущую запись
+        # (только если время начала текущей записи валидно)
+        self.prev_timed = record
+
+    def check_midnight_crossing(self, record: CdrRecord) -> None:
+        # Проверка звонков, пересекающих полночь
+        start, end = record.start, record.end
+        if start is None or end is None:
+            return
+
+        start_day = day_number(start)
+        end_day = day_number(end)
+        if start_day >= end_day:
+            return
+
+        midnight = end_day * SECONDS_PER_DAY
+
+        # Проверяем, что это не разделенный звонок
+        if not (start == midnight or end == midnight):
+            self.errors["midnight_crossing"].append("Звонок пересекает полночь и не делится на 2 звонка")
+            self.add_issue(record.line_no, "midnight_crossing", "midnight_crossing", "end_time", record.end_time)
+            if self.verbose:
+                self.echo(
+                    f"Строка {record.line_no}: Звонок пересекает полночь "
+                    f"(с {record.start_time} по {record.end_time}) "
+                    f"и должен быть разделен на две записи: "
+                    f"1) до 23:59:59 {format_day(start_day)} и "
+                    f"2) с 00:00:00 {format_day(end_day)}"
                 )
-            
-            # Обновляем время начала предыдущей записи
-            # (только если текущая запись валидна)
-            prev_start_time = current_start
-                
-        except ValueError:
-            continue
+
+
+def check_file_presence(file_path: str) -> Optional[Dict[str, list]]:
+    """
+    Проверяет, что файл существует и не пуст.
+
+    Args:
+        file_path (str): Путь к CDR файлу
+
+    Returns:
+        Optional[Dict[str, list]]: Словарь ошибок, если файл не подлежит проверке, иначе None
+    """
+    code = _file_presence_code(file_path)
+    if code is None:
+        return None
+
+    errors = _new_errors()
+    errors["file_structure"].append(ERROR_CODES[code])
+    return errors
+
+
+def _file_presence_code(file_path: str) -> Optional[str]:
+    # Проверка существования и размера файла
+    if not os.path.exists(file_path):
+        return "file_missing"
+    if os.path.getsize(file_path) == 0:
+        return "file_empty"
+    return None
+
+
+def validate_cdr_file(file_path: str,
+                      sql_patterns: Iterable[str] = SQL_KEYWORDS,
+                      use_mmap: bool = False,
+                      max_errors: Optional[int] = None,
+                      verbose: bool = False,
+                      fail_fast: bool = False,
+                      fail_rules: Optional[Iterable[str]] = None,
+                      prescan: bool = False,
+                      rules: Optional[Iterable[str]] = None,
+                      disabled_rules: Iterable[str] = (),
+                      config: CdrRuleConfig = DEFAULT_CONFIG,
+                      stats: Optional[ValidationStats] = None) -> Dict[str, List[str]]:
+    """
+    Валидирует CDR файл и возвращает список найденных ошибок с описанием.
+
+    Файл читается построчно за один проход, поэтому размер файла
+    не влияет на расход памяти.
     
-    # Проверка звонков, пересекающих полночь
-    for i, line in enumerate(lines, 1):
-        line = line.strip()
-        if not line:
-            continue
-            
-        parts = [part.strip() for part in line.split(',')]
-        if len(parts) != 5:
-            continue
-        
-        call_type, subscriber, contact, start_time, end_time = parts
+    Args:
+        file_path (str): Путь к CDR файлу для валидации
+        sql_patterns (Iterable[str]): Шаблоны SQL-инъекций (например, SQL_EXTENDED_PATTERNS)
+        use_mmap (bool): Читать файл через отображение в память блоками (см. iter_mmap_lines)
+        max_errors (int, optional): Прекратить проверку после строки, на которой
+            набралось max_errors ошибок (количество записей при этом не проверяется)
+        verbose (bool): Печатать подробности ошибок в консоль
+        fail_fast (bool): Прекратить проверку после строки с первой ошибкой
+            (количество записей при этом не проверяется)
+        fail_rules (Iterable[str], optional): Категории ошибок, на которых останавливается
+            проверка при fail_fast (по умолчанию - любая ошибка)
+        prescan (bool): Сначала проверить только структуру файла (пустые строки,
+            количество полей и записей); если она нарушена, остальные правила не проверяются
+        rules (Iterable[str], optional): Имена включенных правил из tests.cdr.rules.RULES
+            (по умолчанию - все)
+        disabled_rules (Iterable[str]): Имена выключенных правил
+        config (CdrRuleConfig): Параметры правил (количество записей, типы вызова,
+            код оператора, длина номера)
+        stats (ValidationStats, optional): Профиль, в который добавляются время
+            и количество вызовов правил, этапов разбора и проходов по файлу
         
-        try:
-            start_dt = datetime.fromisoformat(start_time)
-            end_dt = datetime.fromisoformat(end_time)
-            
-            # Проверка, что звонок пересекает полночь
-            if start_dt.date() < end_dt.date():
-                midnight = datetime.combine(end_dt.date(), time.min)
-                
-                # Проверяем, что это не разделенный звонок
-                if not (start_dt == midnight or end_dt == midnight):
-                    errors["midnight_crossing"].append("Звонок пересекает полночь и не делится на 2 звонка")
-                    print(
-                        f"Строка {i}: Звонок пересекает полночь (с {start_time} по {end_time}) "
-                        f"и должен быть разделен на две записи: "
-                        f"1) до 23:59:59 {start_dt.date()} и "
-                        f"2) с 00:00:00 {end_dt.date()}"
-                    )
-                
-        except ValueError:
-            continue
+    Returns:
+        Dict[str, List[str]]: Словарь с категориями ошибок и их описаниями
+    """
+    errors = check_file_presence(file_path)
+    if errors is not None:
+        return errors
 
+    _, errors = _run_validator(file_path, sql_patterns, use_mmap, prescan,
+                               max_errors=max_errors, verbose=verbose,
+                               fail_fast=fail_fast, fail_rules=fail_rules,
+                               rules=rules, disabled_rules=disabled_rules, config=config, stats=stats)
+    return errors
 
-    if time_sequence_errors:
-        errors["time_sequence"] = time_sequence_errors
-    
-    # Удаляем пустые категории ошибок
-    return {k: v for k, v in errors.items() if v}
 
-def validate_all_cdr_files(directory: str) -> Dict[str, Dict[str, List[str]]]:
+def collect_cdr_errors(file_path: str,
+                       sql_patterns: Iterable[str] = SQL_KEYWORDS,
+                       use_mmap: bool = False,
+                       max_errors: Optional[int] = None,
+                       fail_fast: bool = False,
+                       fail_rules: Optional[Iterable[str]] = None,
+                       prescan: bool = False,
+                       rules: Optional[Iterable[str]] = None,
+                       disabled_rules: Iterable[str] = (),
+                       config: CdrRuleConfig = DEFAULT_CONFIG,
+                       stats: Optional[ValidationStats] = None) -> List[CdrError]:
+    """
+    Проверяет CDR файл и возвращает ошибки в машиночитаемом виде.
+
+    Args:
+        file_path (str): Путь к CDR файлу для валидации
+        sql_patterns (Iterable[str]): Шаблоны SQL-инъекций
+        use_mmap (bool): Читать файл через отображение в память блоками
+        max_errors (int, optional): Прекратить проверку после строки, на которой
+            набралось max_errors ошибок
+        fail_fast (bool): Прекратить проверку после строки с первой ошибкой
+        fail_rules (Iterable[str], optional): Категории ошибок, на которых останавливается
+            проверка при fail_fast (по умолчанию - любая ошибка)
+        prescan (bool): Сначала проверить только структуру файла
+        rules (Iterable[str], optional): Имена включенных правил (по умолчанию - все)
+        disabled_rules (Iterable[str]): Имена выключенных правил
+        config (CdrRuleConfig): Параметры правил
+        stats (ValidationStats, optional): Профиль проверки
+
+    Returns:
+        List[CdrError]: Ошибки в порядке обнаружения (ошибка количества записей - последней)
+    """
+    code = _file_presence_code(file_path)
+    if code is not None:
+        return [CdrError(0, "file_structure", code)]
+
+    validator, _ = _run_validator(file_path, sql_patterns, use_mmap, prescan,
+                                  max_errors=max_errors, fail_fast=fail_fast, fail_rules=fail_rules,
+                                  rules=rules, disabled_rules=disabled_rules, config=config, stats=stats)
+    return validator.issues
+
+
+def is_cdr_file_valid(file_path: str,
+                      sql_patterns: Iterable[str] = SQL_KEYWORDS,
+                      use_mmap: bool = False) -> bool:
+    """
+    Отвечает, можно ли передавать CDR файл дальше (например, в биллинг).
+
+    Сначала проверяется структура файла, затем остальные правила до первой ошибки,
+    поэтому отклоненный файл обычно не читается целиком.
+
+    Args:
+        file_path (str): Путь к CDR файлу
+        sql_patterns (Iterable[str]): Шаблоны SQL-инъекций
+        use_mmap (bool): Читать файл через отображение в память блоками
+
+    Returns:
+        bool: True, если ошибок нет
+    """
+    return not validate_cdr_file(file_path, sql_patterns, use_mmap, fail_fast=True, prescan=True)
+
+
+def _run_validator(file_path: str,
+                   sql_patterns: Iterable[str],
+                   use_mmap: bool,
+                   prescan: bool,
+                   **options) -> Tuple[CdrStreamValidator, Dict[str, list]]:
+    if prescan:
+        # Структурные правила не требуют разбора полей: нарушенная структура
+        # обнаруживается без разбора меток времени и поиска пересечений
+        validator = CdrStreamValidator(sql_patterns=sql_patterns, **options)
+        _feed_pass(validator, file_path, use_mmap, "prescan", structure_only=True)
+        errors = validator.finish()
+        if errors:
+            return validator, errors
+
+    validator = CdrStreamValidator(sql_patterns=sql_patterns, **options)
+    _feed_pass(validator, file_path, use_mmap, "validation")
+    return validator, validator.finish()
+
+
+def _feed_pass(validator: CdrStreamValidator, file_path: str, use_mmap: bool, name: str,
+               structure_only: bool = False) -> None:
+    if validator.stats is None:
+        _feed_file(validator, file_path, use_mmap, structure_only)
+        return
+    with validator.stats.measure('pass', name) as stat:
+        _feed_file(validator, file_path, use_mmap, structure_only)
+        stat.records += validator.line_count
+
+
+def _feed_file(validator: CdrStreamValidator, file_path: str, use_mmap: bool,
+               structure_only: bool = False) -> None:
+    feed = validator.check_structure if structure_only else validator.feed
+    if use_mmap:
+        for line in iter_mmap_lines(file_path):
+            feed(line)
+            if validator.stopped:
+                break
+    else:
+        with open(file_path, 'r') as f:
+            for line in f:
+                feed(line)
+                if validator.stopped:
+                    break
+
+class FileValidation(NamedTuple):
+    """Результат validate_cdr_file_safe: путь к файлу, ошибки и удалось ли прочитать файл."""
+    file_path: str
+    errors: Dict[str, list]
+    readable: bool
+
+
+def validate_cdr_file_safe(file_path: str) -> FileValidation:
+    """
+    Валидирует файл, не прерывая обработку остальных файлов из-за битого.
+
+    Исключение при чтении или разборе файла становится ошибкой file_structure;
+    такой результат отмечается readable=False и не сохраняется в кэш.
+    Функция выполняется в рабочих процессах (iter_validate_cdr_files,
+    CdrDirectoryWatcher), поэтому путь возвращается вместе с результатом.
+
+    Args:
+        file_path (str): Путь к CDR файлу
+
+    Returns:
+        FileValidation: Путь, ошибки и признак успешного чтения
+    """
+    try:
+        return FileValidation(file_path, validate_cdr_file(file_path), True)
+    except Exception as exc:
+        return FileValidation(file_path, {"file_structure": [f"Ошибка чтения файла: {exc}"]}, False)
+
+
+def iter_validate_cdr_files(file_paths: Iterable[str],
+                            workers: Optional[int] = None,
+                            chunksize: int = 16) -> Iterator[Tuple[str, Dict[str, list]]]:
+    """
+    Валидирует CDR файлы в пуле процессов и отдает результаты по мере готовности.
+
+    Задачи отправляются в пул порциями: одновременно в работе не больше
+    workers * chunksize файлов, поэтому список из десятков тысяч файлов
+    не создает десятки тысяч ожидающих задач. Медленный файл занимает
+    только один рабочий процесс и не задерживает результаты остальных.
+
+    Args:
+        file_paths (Iterable[str]): Пути к CDR файлам
+        workers (int, optional): Количество процессов (по умолчанию - число ядер)
+        chunksize (int): Количество задач в очереди на один процесс
+
+    Yields:
+        Tuple[str, Dict[str, list]]: Путь к файлу и результат его валидации
+    """
+    for file_path, errors, _ in _iter_validate_files_safe(file_paths, workers, chunksize):
+        yield file_path, errors
+
+
+def _iter_validate_files_safe(file_paths: Iterable[str],
+                              workers: Optional[int],
+                              chunksize: int) -> Iterator[FileValidation]:
+    """Как iter_validate_cdr_files, но с признаком успешного чтения файла (см. validate_cdr_file_safe)."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    paths = iter(file_paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for file_path in islice(paths, workers * chunksize):
+            pending.add(executor.submit(validate_cdr_file_safe, file_path))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Досылаем новую порцию задач взамен завершившихся
+            for file_path in islice(paths, len(done)):
+                pending.add(executor.submit(validate_cdr_file_safe, file_path))
+            for future in done:
+                yield future.result()
+
+
+def validate_all_cdr_files(directory: str,
+                           workers: Optional[int] = 1,
+                           chunksize: int = 16,
+                           cache: Optional[ResultCache] = None) -> Dict[str, Dict[str, List[str]]]:
     """
     Валидирует все CDR файлы в указанной директории
     
     Args:
         directory (str): Путь к директории с CDR файлами
+        workers (int, optional): Количество процессов; 1 - проверка в текущем процессе,
+            None - по числу ядер
+        chunksize (int): Количество задач в очереди на один процесс в параллельном режиме
+        cache (ResultCache, optional): Кэш результатов; неизмененные файлы не проверяются повторно
         
     Returns:
         Dict[str, Dict[str, List[str]]]: Результаты валидации для каждого файла
     """
+    filenames = [
+        entry.name for entry in os.scandir(directory)
+        if entry.name.endswith('.txt')
+    ]
+
     results = {}
-    for filename in os.listdir(directory):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(directory, filename)
-            results[filename] = validate_cdr_file(file_path)
-    return results
+    signatures = {}
+    if cache is not None:
+        for filename in filenames:
+            errors, signature = cache.lookup(os.path.join(directory, filename))
+            if errors is not None:
+                results[filename] = errors
+            elif signature is not None:
+                signatures[filename] = signature
+    pending = [filename for filename in filenames if filename not in results]
+
+    paths = [os.path.join(directory, filename) for filename in pending]
+    if workers == 1:
+        checked = map(validate_cdr_file_safe, paths)
+    else:
+        checked = _iter_validate_files_safe(paths, workers, chunksize) if paths else ()
+    # Результат ошибки чтения не сохраняется: файл проверяется заново в следующий раз
+    unreadable = set()
+    for file_path, errors, readable in checked:
+        filename = os.path.basename(file_path)
+        results[filename] = errors
+        if not readable:
+            unreadable.add(filename)
+
+    if cache is not None:
+        for filename, signature in signatures.items():
+            if filename not in unreadable:
+                cache.store(os.path.join(directory, filename), signature, results[filename])
+        cache.commit()
+
+    # Возвращаем результаты в порядке листинга директории, а не завершения
+    return {filename: results[filename] for filename in filenames}
 
 # Пример использования
 if __name__ == "__main__":
-    validation_results = validate_all_cdr_files("C:/Users/anna/Desktop/CDR")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Проверка всех CDR файлов директории")
+    parser.add_argument("directory", nargs="?", default=os.getcwd(),
+                        help="Директория с CDR файлами (по умолчанию - текущая)")
+    parser.add_argument("--workers", type=int, default=1, help="Количество процессов")
+    args = parser.parse_args()
+
+    validation_results = validate_all_cdr_files(args.directory, workers=args.workers)
     
     for filename, errors in validation_results.items():
         print(f"\nРезультаты проверки файла {filename}:")
@@ -0,0 +1,145 @@
+import heapq
+from bisect import bisect_right, insort
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Активный звонок в индексе: (время окончания, время начала, номер строки)
+ActiveCall = Tuple[Any, Any, int]
+
+
+class CallOverlapIndex:
+    """
+    Индекс пересечений звонков абонентов по алгоритму заметающей прямой.
+
+    Для каждого абонента хранится куча активных звонков, упорядоченная по времени
+    окончания. Линия заметания (watermark) - максимальное время начала среди уже
+    добавленных звонков. Звонок, закончившийся не позже линии заметания, не может
+    пересечься с последующими звонками в хронологическом порядке и переносится из
+    кучи в список завершенных звонков абонента, упорядоченный по времени окончания.
+    Запись в хронологическом порядке сравнивается только с активными звонками,
+    запись, нарушающая хронологию, - еще и с завершенными звонками, которые
+    заканчиваются позже ее начала (двоичный поиск). Для упорядоченного файла
+    поиск занимает O(n log n).
+
+    Завершенные звонки хранятся только за окно window до линии заметания:
+    запись вне хронологии сравнивается со звонками, закончившимися позже
+    watermark - window, а более ранние удаляются из индекса. Поэтому память
+    ограничена звонками, активными на линии заметания или закончившимися за
+    последние window единиц времени, и не зависит от размера файла. С
+    window=None хранятся все завершенные звонки: поиск точный, как при
+    попарном сравнении, но память растет как O(n).
+    """
+
+    def __init__(self, watermark: Optional[Any] = None, window: Optional[Any] = None):
+        self.watermark = watermark
+        self.window = window
+        self.active: Dict[str, List[ActiveCall]] = {}
+        self.finished: Dict[str, List[ActiveCall]] = {}
+        self._since_prune = 0
+
+    def advance(self, start: Any) -> None:
+        """Сдвигает линию заметания до времени начала очередного звонка."""
+        if self.watermark is None or start > self.watermark:
+            self.watermark = start
+
+    def conflicts(self, subscriber: str, start: Any, end: Any) -> List[Tuple[int, Any]]:
+        """
+        Находит звонки абонента, пересекающиеся с интервалом [start, end).
+
+        Returns:
+            List[Tuple[int, Any]]: Пары (номер строки, время окончания) в порядке номеров строк
+        """
+        found = []
+        calls = self.active.get(subscriber)
+        if calls:
+            self._prune_calls(subscriber, calls)
+            # После очистки все оставшиеся звонки заканчиваются позже линии заметания,
+            # то есть позже start, поэтому достаточно проверить начало звонка
+            found.extend((other_line, other_end) for other_end, other_start, other_line in calls if other_start < end)
+
+        finished = self.finished.get(subscriber)
+        if finished and self.watermark is not None and start < self.watermark:
+            # Запись вне хронологии: завершенные звонки окна, которые заканчиваются позже ее начала
+            horizon = self.horizon()
+            first = bisect_right(finished, start if horizon is None else max(start, horizon), key=itemgetter(0))
+            found.extend(
+                (other_line, other_end)
+                for other_end, other_start, other_line in finished[first:]
+                if other_start < end
+            )
+        found.sort()
+        return found
+
+    def insert(self, subscriber: str, start: Any, end: Any, line_no: int) -> None:
+        """Добавляет звонок в индекс."""
+        heapq.heappush(self.active.setdefault(subscriber, []), (end, start, line_no))
+        self._since_prune += 1
+        # Абоненты, которые больше не звонят, очищаются общим проходом;
+        # его стоимость распределяется по вставкам
+        if self._since_prune > len(self.active) + len(self.finished):
+            self.prune()
+
+    def add(self, subscriber: str, start: Any, end: Any, line_no: int) -> List[Tuple[int, Any]]:
+        """
+        Добавляет очередной звонок файла и возвращает пересечения с предыдущими.
+
+        Returns:
+            List[Tuple[int, Any]]: Пары (номер строки, время окончания) конфликтующих звонков
+        """
+        self.advance(start)
+        found = self.conflicts(subscriber, start, end)
+        self.insert(subscriber, start, end, line_no)
+        return found
+
+    def merge(self, active: Dict[str, List[ActiveCall]]) -> None:
+        """Добавляет активные звонки другого индекса (например, соседнего диапазона файла)."""
+        for subscriber, calls in active.items():
+            own = self.active.setdefault(subscriber, [])
+            own.extend(calls)
+            heapq.heapify(own)
+        self.prune()
+
+    def prune(self) -> None:
+        """
+        Переносит звонки, закончившиеся не позже линии заметания, в завершенные
+        у всех абонентов и удаляет завершенные звонки, вышедшие за окно.
+        """
+        for subscriber in list(self.active):
+            calls = self.active[subscriber]
+            self._prune_calls(subscriber, calls)
+            if not calls:
+                del self.active[subscriber]
+        horizon = self.horizon()
+        if horizon is not None:
+            for subscriber in list(self.finished):
+                finished = self.finished[subscriber]
+                del finished[:bisect_right(finished, horizon, key=itemgetter(0))]
+                if not finished:
+                    del self.finished[subscriber]
+        self._since_prune = 0
+
+    def horizon(self) -> Optional[Any]:
+        """Время, звонки, закончившиеся не позже которого, больше не проверяются (None - без окна)."""
+        if self.window is None or self.watermark is None:
+            return None
+        return self.watermark - self.window
+
+    def max_end(self) -> Optional[Any]:
+        """Возвращает самое позднее время окончания среди активных звонков."""
+        ends = [max(calls)[0] for calls in self.active.values() if calls]
+        return max(ends) if ends else None
+
+    def _prune_calls(self, subscriber: str, calls: List[ActiveCall]) -> None:
+        if self.watermark is None or not calls or calls[0][0] > self.watermark:
+            return
+        horizon = self.horizon()
+        finished = self.finished.setdefault(subscriber, [])
+        while calls and calls[0][0] <= self.watermark:
+            call = heapq.heappop(calls)
+            if horizon is None or call[0] > horizon:
+                # Звонки завершаются почти по порядку, поэтому вставка обычно идет в конец списка
+                insort(finished, call)
+        if horizon is not None and finished and finished[0][0] <= horizon:
+            del finished[:bisect_right(finished, horizon, key=itemgetter(0))]
+        if not finished:
+            del self.finished[subscriber]
@@ -0,0 +1,142 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Виды замеров: правило проверки, этап разбора строки и проход по файлу
+STAT_KINDS = ('rule', 'stage', 'pass')
+
+_PROMETHEUS_METRICS = (
+    ("seconds_total", "seconds", "Суммарное время в секундах"),
+    ("calls_total", "calls", "Количество вызовов"),
+    ("records_total", "records", "Количество обработанных записей (строк)"),
+)
+
+
+class TimingStat:
+    """Накопленное время, количество вызовов и обработанных записей одного замера."""
+
+    __slots__ = ('seconds', 'calls', 'records')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.records = 0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "seconds": self.seconds,
+            "calls": self.calls,
+            "records": self.records,
+            "records_per_second": self.records_per_second,
+        }
+
+
+class ValidationStats:
+    """
+    Профиль проверки CDR: время, количество вызовов и записей в секунду
+    по каждому правилу, этапу разбора строки и проходу по файлу.
+
+    Объект передается валидатору параметром stats; без него проверки
+    вызываются напрямую, и профилирование ничего не стоит. Замеры одного
+    объекта накапливаются по всем проверенным с ним файлам.
+    """
+
+    def __init__(self):
+        self.stats: Dict[Tuple[str, str], TimingStat] = {}
+
+    def get(self, kind: str, name: str) -> TimingStat:
+        """Возвращает замер (создает пустой, если его еще нет)."""
+        if kind not in STAT_KINDS:
+            raise ValueError(f"Неизвестный вид замера: {kind}")
+        stat = self.stats.get((kind, name))
+        if stat is None:
+            stat = self.stats[(kind, name)] = TimingStat()
+        return stat
+
+    def timed(self, kind: str, name: str, func: Callable) -> Callable:
+        """
+        Оборачивает функцию замером: каждый вызов считается одной записью.
+
+        Args:
+            kind (str): Вид замера из STAT_KINDS
+            name (str): Имя правила или этапа
+            func (Callable): Замеряемая функция
+
+        Returns:
+            Callable: Функция с теми же аргументами и результатом
+        """
+        stat = self.get(kind, name)
+        perf_counter = time.perf_counter
+
+        def wrapper(*args: Any) -> Any:
+            started = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                stat.seconds += perf_counter() - started
+                stat.calls += 1
+                stat.records += 1
+
+        return wrapper
+
+    @contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[TimingStat]:
+        """
+        Замеряет время блока кода как один вызов; количество записей блок
+        добавляет сам (stat.records += ...).
+        """
+        stat = self.get(kind, name)
+        started = time.perf_counter()
+        try:
+            yield stat
+        finally:
+            stat.seconds += time.perf_counter() - started
+            stat.calls += 1
+
+    def merge(self, other: 'ValidationStats') -> None:
+        """Добавляет замеры другого профиля (например, из рабочего процесса)."""
+        for (kind, name), stat in other.stats.items():
+            total = self.get(kind, name)
+            total.seconds += stat.seconds
+            total.calls += stat.calls
+            total.records += stat.records
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Возвращает замеры по видам и именам, в каждом виде - по убыванию времени."""
+        result: Dict[str, Dict[str, Dict[str, float]]] = {kind: {} for kind in STAT_KINDS}
+        for (kind, name), stat in sorted(self.stats.items(), key=lambda item: -item[1].seconds):
+            result[kind][name] = stat.to_dict()
+        return result
+
+    def to_json(self, indent: int = 2) -> str:
+        """Форматирует замеры как JSON."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = "cdr_validation") -> str:
+        """
+        Форматирует замеры в текстовом формате Prometheus: счетчики времени,
+        вызовов и записей с метками kind и name.
+
+        Args:
+            prefix (str): Префикс имен метрик
+
+        Returns:
+            str: Текст для отдачи по /metrics или textfile collector
+        """
+        lines: List[str] = []
+        for suffix, attribute, description in _PROMETHEUS_METRICS:
+            metric = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for (kind, name), stat in sorted(self.stats.items()):
+                lines.append(f'{metric}{{kind="{kind}",name="{_escape_label(name)}"}} {getattr(stat, attribute)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,111 @@
+import locale
+import mmap
+import os
+from itertools import chain
+from typing import Iterator, List, Optional
+
+MMAP_BLOCK_SIZE = 1024 * 1024
+
+
+def iter_mmap_lines(file_path: str,
+                    start: int = 0,
+                    end: Optional[int] = None,
+                    newline: Optional[str] = None,
+                    block_size: int = MMAP_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Читает строки файла через отображение в память.
+
+    Файл просматривается блоками байт, которые заканчиваются на переводе
+    строки; границы строк ищутся в отображении без чтения файла в буфер.
+    При newline=None блок заканчивается и на '\r', поэтому файл с переводами
+    строки '\r' тоже читается блоками размером около block_size. Блок из
+    одних ASCII символов (обычный CDR файл) декодируется кодеком ASCII, самым
+    быстрым в CPython; остальные декодируются в кодировке по умолчанию, как
+    при открытии файла в текстовом режиме. Блок декодируется целиком, поэтому
+    в памяти одновременно находится один блок.
+
+    Args:
+        file_path (str): Путь к файлу
+        start (int): Начало диапазона в байтах (начало строки)
+        end (int, optional): Конец диапазона в байтах (по умолчанию - конец файла)
+        newline (str, optional): Как в open(): None - переводами строки считаются
+            '\\n', '\\r\\n' и '\\r'; '\\n' - только '\\n' (как при чтении в двоичном режиме)
+        block_size (int): Желаемый размер блока в байтах
+
+    Yields:
+        str: Строки без символа перевода строки
+    """
+    if newline not in (None, '\n'):
+        raise ValueError(f"Неподдерживаемый режим перевода строки: {newline!r}")
+
+    # Строки блока перебираются без возврата в генератор на каждой строке
+    return chain.from_iterable(_iter_mmap_blocks(file_path, start, end, newline, block_size))
+
+
+def _iter_mmap_blocks(file_path: str,
+                      start: int,
+                      end: Optional[int],
+                      newline: Optional[str],
+                      block_size: int) -> Iterator[List[str]]:
+    encoding = locale.getpreferredencoding(False)
+    with open(file_path, 'rb') as f:
+        # Пустой файл нельзя отобразить в память
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if end is None or end > len(mapped):
+                end = len(mapped)
+            # madvise есть не на всех платформах (на Windows его нет)
+            advise = hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+            if advise:
+                # Чтение последовательное: ядро читает страницы заранее
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            released = start - start % mmap.PAGESIZE
+            position = start
+            while position < end:
+                block_end = end
+                if position + block_size < end:
+                    block_end = _block_end(mapped, position, position + block_size, end, newline)
+
+                block = mapped[position:block_end]
+                text = block.decode('ascii') if block.isascii() else block.decode(encoding)
+                if newline is None and '\r' in text:
+                    text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+                lines = text.split('\n')
+                # После завершающего перевода строки новой строки нет
+                if lines[-1] == '':
+                    lines.pop()
+                yield lines
+                position = block_end
+
+                if advise:
+                    # Строки блока уже скопированы в str: прочитанные страницы
+                    # выгружаются из памяти процесса (в кэше файлов они остаются)
+                    done = position - position % mmap.PAGESIZE
+                    if done > released:
+                        mapped.madvise(mmap.MADV_DONTNEED, released, done - released)
+                        released = done
+
+
+def _block_end(mapped: mmap.mmap, position: int, limit: int, end: int, newline: Optional[str]) -> int:
+    """
+    Возвращает конец блока, начинающегося с position: позицию после последнего
+    перевода строки до limit. Строка длиннее блока целиком попадает в блок,
+    увеличенный до ее конца.
+    """
+    found = mapped.rfind(b'\n', position, limit)
+    if found >= 0:
+        return found + 1
+    if newline is None:
+        # В блоке нет '\n': строки могут разделяться одиночными '\r'
+        found = mapped.rfind(b'\r', position, limit)
+        if found >= 0:
+            # '\r\n' на границе блока - один перевод строки
+            return found + 2 if mapped[found + 1:min(found + 2, end)] == b'\n' else found + 1
+    found = mapped.find(b'\n', limit, end)
+    if newline is None:
+        carriage = mapped.find(b'\r', limit, end if found < 0 else found)
+        if carriage >= 0:
+            return carriage + 2 if mapped[carriage + 1:min(carriage + 2, end)] == b'\n' else carriage + 1
+    return end if found < 0 else found + 1
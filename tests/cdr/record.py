@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+from tests.cdr.timestamps import (
+    Timestamp, format_timestamp, parse_fixed_timestamp, parse_timestamp, to_timestamp
+)
+
+PHONE_NUMBER_LENGTH = 11
+
+# Корректный номер хранится как int, любое другое значение поля - как исходная строка
+PhoneNumber = Union[int, str]
+
+
+class CdrRecord:
+    """
+    Запись CDR: тип вызова, номер абонента, номер собеседника, начало и окончание звонка.
+
+    Номера из 11 цифр хранятся как int, время - в секундах от начала эпохи.
+    Исходный текст поля сохраняется только тогда, когда его нельзя восстановить
+    по значению (некорректный номер, метка времени в другом формате), поэтому
+    to_line() возвращает строку, из которой запись была разобрана.
+    """
+
+    __slots__ = ('call_type', 'subscriber', 'contact', 'start', 'end', 'line_no', '_start_time', '_end_time')
+
+    def __init__(self,
+                 call_type: str,
+                 subscriber: PhoneNumber,
+                 contact: PhoneNumber,
+                 start: Optional[Timestamp],
+                 end: Optional[Timestamp],
+                 line_no: int = 0,
+                 start_time: Optional[str] = None,
+                 end_time: Optional[str] = None):
+        self.call_type = call_type
+        self.subscriber = subscriber
+        self.contact = contact
+        # Время начала и окончания в секундах от начала эпохи (None, если метка некорректна)
+        self.start = start
+        self.end = end
+        self.line_no = line_no
+        self._start_time = start_time
+        self._end_time = end_time
+
+    @classmethod
+    def from_parts(cls, parts: List[str], line_no: int = 0,
+                   parse_numbers: bool = True, parse_times: bool = True) -> 'CdrRecord':
+        """
+        Создает запись из пяти очищенных полей строки.
+
+        Args:
+            parts (List[str]): Тип вызова, номера и метки времени
+            line_no (int): Номер строки в файле
+            parse_numbers (bool): Разбирать номера (иначе номера хранятся исходными строками)
+            parse_times (bool): Разбирать метки времени (иначе start и end равны None,
+                а метки хранятся исходным текстом)
+
+        Returns:
+            CdrRecord: Запись
+        """
+        call_type, subscriber, contact, start_time, end_time = parts
+        if parse_times:
+            start, start_text = _parse_field_time(start_time)
+            end, end_text = _parse_field_time(end_time)
+        else:
+            start, start_text, end, end_text = None, start_time, None, end_time
+        if parse_numbers:
+            subscriber, contact = parse_phone_number(subscriber), parse_phone_number(contact)
+        return cls(call_type, subscriber, contact, start, end, line_no, start_text, end_text)
+
+    @classmethod
+    def from_line(cls, line: str, line_no: int = 0) -> 'CdrRecord':
+        """
+        Разбирает строку CDR файла.
+
+        Raises:
+            ValueError: В строке не 5 полей
+        """
+        parts = [part.strip() for part in line.strip().split(',')]
+        if len(parts) != 5:
+            raise ValueError(f"Неправильное количество полей ({len(parts)} вместо 5)")
+        return cls.from_parts(parts, line_no)
+
+    @classmethod
+    def from_datetimes(cls, call_type: str, subscriber: PhoneNumber, contact: PhoneNumber,
+                       start: datetime, end: datetime) -> 'CdrRecord':
+        """Создает запись звонка по времени начала и окончания (datetime без часового пояса)."""
+        return cls(
+            call_type, parse_phone_number(str(subscriber)), parse_phone_number(str(contact)),
+            to_timestamp(start), to_timestamp(end)
+        )
+
+    @property
+    def start_time(self) -> str:
+        """Время начала в том виде, в котором оно записывается в файл."""
+        if self._start_time is not None:
+            return self._start_time
+        return format_timestamp(self.start)
+
+    @property
+    def end_time(self) -> str:
+        """Время окончания в том виде, в котором оно записывается в файл."""
+        if self._end_time is not None:
+            return self._end_time
+        return format_timestamp(self.end)
+
+    def to_parts(self) -> List[str]:
+        """Возвращает пять полей записи в виде строк."""
+        return [self.call_type, str(self.subscriber), str(self.contact), self.start_time, self.end_time]
+
+    def to_line(self, separator: str = ',') -> str:
+        """Формирует строку CDR файла (без перевода строки)."""
+        return separator.join(self.to_parts())
+
+    def with_field(self, index: int, value: str) -> 'CdrRecord':
+        """Возвращает копию записи, в которой поле с номером index заменено текстом value."""
+        parts = self.to_parts()
+        parts[index] = value
+        return CdrRecord.from_parts(parts, self.line_no)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CdrRecord):
+            return NotImplemented
+        return self.line_no == other.line_no and self.to_parts() == other.to_parts()
+
+    def __repr__(self) -> str:
+        return f"CdrRecord(line_no={self.line_no}, {self.to_line(', ')!r})"
+
+
+def parse_phone_number(value: str) -> PhoneNumber:
+    """Возвращает номер как int, если он состоит ровно из 11 цифр без ведущего нуля, иначе исходную строку."""
+    if len(value) == PHONE_NUMBER_LENGTH and value.isascii() and value.isdigit() and value[0] != '0':
+        return int(value)
+    return value
+
+
+def _parse_field_time(value: str) -> Tuple[Optional[Timestamp], Optional[str]]:
+    # Метка фиксированного формата восстанавливается по числу, остальные хранят исходный текст
+    seconds = parse_fixed_timestamp(value)
+    if seconds is not None:
+        return seconds, None
+    try:
+        return parse_timestamp(value), value
+    except ValueError:
+        return None, value
@@ -0,0 +1,131 @@
+import json
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, TextIO, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для выгрузки в столбцы
+    np = None
+
+# Категории ошибок в порядке их вывода (ключи словаря ошибок validate_cdr_file)
+ERROR_RULES = (
+    "file_structure", "record_format", "phone_numbers", "timestamps", "call_logic",
+    "security", "time_sequence", "midnight_crossing", "operator_code",
+)
+
+# Поля записи CDR в порядке следования в строке
+FIELD_NAMES = ('call_type', 'subscriber', 'contact', 'start_time', 'end_time')
+
+# Коды ошибок и их описание (с параметрами правил - CdrRuleConfig.error_codes())
+ERROR_CODES: Dict[str, str] = {
+    "file_missing": "Файл не существует",
+    "file_empty": "Файл пустой",
+    "record_count": "Количество записей в файле не равно CdrRuleConfig.record_count (value - количество строк)",
+    "empty_line": "Пустая строка",
+    "field_count": "Неправильное количество полей (value - количество полей)",
+    "call_type": "Неподдерживаемый тип вызова",
+    "missing_number": "Номер телефона отсутствует",
+    "non_digit_number": "Номер содержит нецифровые символы",
+    "number_length": "Длина номера не равна CdrRuleConfig.number_length (value - длина)",
+    "operator_code": "Неверный код оператора (value - код)",
+    "start_format": "Некорректный формат времени начала",
+    "end_format": "Некорректный формат времени окончания",
+    "end_before_start": "Время окончания раньше времени начала",
+    "short_call": "Длительность звонка менее 1 секунды",
+    "sql_injection": "Возможная SQL-инъекция",
+    "outgoing_overlap": "Пересечение исходящего вызова с другим звонком абонента (value - строка)",
+    "incoming_overlap": "Пересечение входящего вызова с другим звонком абонента (value - строка)",
+    "time_order": "Нарушение хронологического порядка",
+    "midnight_crossing": "Звонок пересекает полночь и не разделен на два",
+}
+
+ErrorValue = Union[int, str, None]
+
+
+class CdrError(NamedTuple):
+    """
+    Ошибка проверки CDR файла в машиночитаемом виде.
+
+    line - номер строки (0 для ошибок файла целиком), rule - категория,
+    code - код из ERROR_CODES, field - поле записи из FIELD_NAMES,
+    value - значение, к которому относится ошибка.
+    """
+    line: int
+    rule: str
+    code: str
+    field: Optional[str] = None
+    value: ErrorValue = None
+
+
+def write_errors_jsonl(reports: Mapping[str, Iterable[CdrError]], output: TextIO) -> int:
+    """
+    Выгружает ошибки в формате JSON Lines: по одной строке на ошибку.
+
+    Args:
+        reports (Mapping[str, Iterable[CdrError]]): Ошибки по именам файлов
+        output (TextIO): Поток для записи
+
+    Returns:
+        int: Количество записанных ошибок
+    """
+    count = 0
+    for file_name, errors in reports.items():
+        for error in errors:
+            output.write(json.dumps({"file": file_name, **error._asdict()}, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def write_errors_npz(reports: Mapping[str, Iterable[CdrError]], path: str) -> int:
+    """
+    Выгружает ошибки по столбцам в архив NumPy (.npz) для пакетного анализа.
+
+    Для каждой ошибки сохраняются столбцы file_id, line, rule_id, code_id,
+    field_id и value: имена файлов, категории, коды и поля хранятся номерами
+    в словарях files, rules, codes и fields (поле с номером 0 - поля нет),
+    значения - строками (пустая строка - значения нет).
+
+    Args:
+        reports (Mapping[str, Iterable[CdrError]]): Ошибки по именам файлов
+        path (str): Путь к архиву
+
+    Returns:
+        int: Количество записанных ошибок
+    """
+    if np is None:
+        raise ImportError("Для выгрузки ошибок по столбцам требуется пакет numpy")
+
+    files = list(reports)
+    rules = ERROR_RULES
+    codes = list(ERROR_CODES)
+    fields = ('',) + FIELD_NAMES
+    if max(len(rules), len(codes), len(fields)) > np.iinfo(np.int16).max:
+        raise ValueError("Слишком много категорий, кодов или полей ошибок для выгрузки по столбцам")
+    rule_ids = {name: i for i, name in enumerate(rules)}
+    code_ids = {name: i for i, name in enumerate(codes)}
+    field_ids = {name: i for i, name in enumerate(fields)}
+
+    columns: Dict[str, List] = {name: [] for name in ("file", "line", "rule", "code", "field", "value")}
+    for file_id, file_name in enumerate(files):
+        for error in reports[file_name]:
+            columns["file"].append(file_id)
+            columns["line"].append(error.line)
+            columns["rule"].append(rule_ids[error.rule])
+            columns["code"].append(code_ids[error.code])
+            columns["field"].append(field_ids[error.field or ''])
+            columns["value"].append('' if error.value is None else str(error.value))
+
+    np.savez_compressed(
+        path,
+        files=np.array(files, dtype=str),
+        rules=np.array(rules, dtype=str),
+        codes=np.array(codes, dtype=str),
+        fields=np.array(fields, dtype=str),
+        file_id=np.array(columns["file"], dtype=np.int32),
+        line=np.array(columns["line"], dtype=np.int64),
+        rule_id=np.array(columns["rule"], dtype=np.int16),
+        # Коды добавляют и правила из реестра, поэтому их может быть больше 127
+        code_id=np.array(columns["code"], dtype=np.int16),
+        field_id=np.array(columns["field"], dtype=np.int16),
+        value=np.array(columns["value"], dtype=str),
+    )
+    return len(columns["line"])
@@ -0,0 +1,159 @@
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from tests.cdr.report import ERROR_CODES, ERROR_RULES
+
+# Поля записи, которые может запросить правило: разобранные поля CdrRecord
+# и 'text' - строка и ее поля в исходном виде
+RULE_FIELDS = ('call_type', 'subscriber', 'contact', 'start', 'end', 'text')
+NUMBER_FIELDS = frozenset(('subscriber', 'contact'))
+TIME_FIELDS = frozenset(('start', 'end'))
+
+# Область правила: отдельная запись, последовательность записей или файл целиком
+RULE_SCOPES = ('record', 'stream', 'file')
+
+# Проверка записи: имя метода валидатора или функция (validator, record)
+RuleCheck = Union[str, Callable[[Any, Any], None]]
+
+
+class CdrRule(NamedTuple):
+    """
+    Правило проверки CDR.
+
+    fields - поля записи, которые правило читает (по ним валидатор решает,
+    что разбирать), scope - область правила, codes - коды ошибок, которые
+    правило добавило в ERROR_CODES. Проверка check вызывается для каждой
+    записи с 5 полями; правило файла вызывается один раз в конце проверки
+    с record=None.
+    """
+    name: str
+    category: str
+    fields: FrozenSet[str]
+    scope: str
+    check: RuleCheck
+    codes: Tuple[str, ...] = ()
+
+    def bind(self, validator: Any) -> Callable:
+        """Возвращает проверку, привязанную к валидатору (метод подкласса имеет приоритет)."""
+        if isinstance(self.check, str):
+            return getattr(validator, self.check)
+        check = self.check
+        return lambda record: check(validator, record)
+
+
+class CdrRuleConfig(NamedTuple):
+    """
+    Параметры правил: формат файла и номеров конкретного оператора.
+
+    late_call_window - окно в секундах до линии заметания, в пределах которого
+    запись вне хронологии проверяется на пересечение с уже завершенными звонками
+    (None - с любыми, без ограничения памяти; см. CallOverlapIndex).
+    """
+    record_count: int = 10
+    call_types: Tuple[str, ...] = ('01', '02')
+    operator_code: str = '900'
+    number_length: int = 11
+    late_call_window: Optional[int] = 3600
+
+    def error_codes(self) -> Dict[str, str]:
+        """Коды ошибок и их описание с параметрами правил этой конфигурации."""
+        return {
+            **ERROR_CODES,
+            "record_count": f"Количество записей в файле не равно {self.record_count} (value - количество строк)",
+            "number_length": f"Длина номера не равна {self.number_length} (value - длина)",
+        }
+
+
+DEFAULT_CONFIG = CdrRuleConfig()
+
+# Зарегистрированные правила в порядке проверки
+RULES: Dict[str, CdrRule] = {}
+
+
+def register_rule(name: str,
+                  category: str,
+                  fields: Iterable[str] = (),
+                  scope: str = 'record',
+                  codes: Optional[Dict[str, str]] = None) -> Callable[[RuleCheck], RuleCheck]:
+    """
+    Регистрирует правило проверки (используется как декоратор функции
+    check(validator, record)).
+
+    Ошибку правило добавляет так же, как встроенные: описание в
+    validator.errors[category] и структурированную ошибку через
+    validator.add_issue(); параметры правил доступны в validator.config.
+
+    Args:
+        name (str): Имя правила
+        category (str): Категория ошибок из ERROR_RULES
+        fields (Iterable[str]): Поля записи из RULE_FIELDS, которые читает правило
+        scope (str): 'record', 'stream' (зависит от предыдущих записей) или 'file'
+        codes (Dict[str, str], optional): Новые коды ошибок правила и их описание
+            (удаляются из ERROR_CODES вместе с правилом)
+
+    Returns:
+        Callable[[RuleCheck], RuleCheck]: Декоратор
+    """
+    fields = frozenset(fields)
+    if name in RULES:
+        raise ValueError(f"Правило '{name}' уже зарегистрировано")
+    if category not in ERROR_RULES:
+        raise ValueError(f"Неизвестная категория ошибок: {category}")
+    if scope not in RULE_SCOPES:
+        raise ValueError(f"Неизвестная область правила: {scope}")
+    if not fields <= set(RULE_FIELDS):
+        raise ValueError(f"Неизвестные поля записи: {', '.join(sorted(fields - set(RULE_FIELDS)))}")
+    codes = dict(codes or {})
+    if not codes.keys().isdisjoint(ERROR_CODES):
+        raise ValueError(f"Коды ошибок уже существуют: {', '.join(sorted(codes.keys() & ERROR_CODES.keys()))}")
+
+    def decorator(check: RuleCheck) -> RuleCheck:
+        RULES[name] = CdrRule(name, category, fields, scope, check, tuple(codes))
+        ERROR_CODES.update(codes)
+        return check
+
+    return decorator
+
+
+def unregister_rule(name: str) -> None:
+    """Удаляет правило из реестра вместе с кодами ошибок, которые оно добавило."""
+    rule = RULES.pop(name)
+    for code in rule.codes:
+        ERROR_CODES.pop(code, None)
+
+
+def resolve_rules(names: Optional[Iterable[str]] = None,
+                  disabled: Iterable[str] = ()) -> List[CdrRule]:
+    """
+    Выбирает включенные правила в порядке регистрации.
+
+    Args:
+        names (Iterable[str], optional): Имена включенных правил (по умолчанию - все)
+        disabled (Iterable[str]): Имена выключенных правил
+
+    Returns:
+        List[CdrRule]: Правила в порядке проверки
+    """
+    enabled = set(RULES) if names is None else set(names)
+    disabled = set(disabled)
+    unknown = (enabled | disabled) - set(RULES)
+    if unknown:
+        raise ValueError(f"Неизвестные правила: {', '.join(sorted(unknown))}")
+    return [rule for name, rule in RULES.items() if name in enabled and name not in disabled]
+
+
+def required_fields(rules: Iterable[CdrRule]) -> FrozenSet[str]:
+    """Возвращает поля записи, которые читает хотя бы одно из правил."""
+    return frozenset().union(*(rule.fields for rule in rules))
+
+
+# Встроенные правила: проверки - методы CdrStreamValidator
+register_rule("operator_code", "operator_code", ("subscriber",))("check_operator_code")
+register_rule("call_type", "record_format", ("call_type",))("check_call_type")
+register_rule("phone_numbers", "phone_numbers", ("subscriber", "contact"))("check_phone_numbers")
+register_rule("timestamps", "timestamps", ("start", "end"))("check_timestamps")
+register_rule("sql_injection", "security", ("text",))("check_sql_injection")
+register_rule("call_overlap", "call_logic", ("call_type", "subscriber", "start", "end"),
+              scope="stream")("check_simultaneous_calls")
+register_rule("time_sequence", "time_sequence", ("start",), scope="stream")("check_time_sequence")
+register_rule("midnight_crossing", "midnight_crossing", ("start", "end"))("check_midnight_crossing")
+register_rule("record_count", "file_structure", scope="file")("check_record_count")
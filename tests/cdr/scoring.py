@@ -0,0 +1,214 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from tests.cdr.helpers import collect_cdr_errors
+from tests.cdr.profiling import ValidationStats
+from tests.cdr.report import ERROR_RULES
+from tests.cdr.rules import RULES
+from tests.cdr.sql_injection import SQL_EXTENDED_PATTERNS, SQL_KEYWORDS
+from tests.generators.negative_cdr_generator import labels_path, read_labels
+
+
+class CategoryScore:
+    """
+    Счетчики обнаружения ошибок одной категории.
+
+    Найденная валидатором ошибка совпадает с внесенной, если у них одинаковые
+    строка и категория. Ошибка в строке без внесенных ошибок - ложное
+    срабатывание; ошибка другой категории в строке с внесенной ошибкой -
+    побочное срабатывание (например, SQL-инъекция в поле типа вызова
+    нарушает и формат записи) и на точность не влияет.
+    """
+
+    __slots__ = ('true_positives', 'false_positives', 'false_negatives', 'side_effects', 'seconds', 'records')
+
+    def __init__(self):
+        self.true_positives = 0
+        self.false_positives = 0
+        self.false_negatives = 0
+        self.side_effects = 0
+        self.seconds = 0.0
+        self.records = 0
+
+    @property
+    def precision(self) -> float:
+        found = self.true_positives + self.false_positives
+        return self.true_positives / found if found else 1.0
+
+    @property
+    def recall(self) -> float:
+        expected = self.true_positives + self.false_negatives
+        return self.true_positives / expected if expected else 1.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def add(self, other: 'CategoryScore') -> None:
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "true_positives": self.true_positives,
+            "false_positives": self.false_positives,
+            "false_negatives": self.false_negatives,
+            "side_effects": self.side_effects,
+            "precision": self.precision,
+            "recall": self.recall,
+            "records_per_second": self.records_per_second,
+        }
+
+
+class DetectionScore:
+    """Точность, полнота и скорость проверки по категориям ошибок для набора файлов."""
+
+    def __init__(self):
+        self.categories: Dict[str, CategoryScore] = {category: CategoryScore() for category in ERROR_RULES}
+        self.files = 0
+        self.records = 0
+        self.seconds = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def merge(self, other: 'DetectionScore') -> None:
+        """Добавляет результаты другого набора файлов (например, из рабочего процесса)."""
+        for category, score in other.categories.items():
+            self.categories.setdefault(category, CategoryScore()).add(score)
+        self.files += other.files
+        self.records += other.records
+        self.seconds += other.seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "records": self.records,
+            "records_per_second": self.records_per_second,
+            "categories": {category: score.to_dict() for category, score in self.categories.items()},
+        }
+
+    def format_table(self) -> str:
+        """Форматирует результаты таблицей по категориям."""
+        lines = [
+            f"{'категория':>18} {'TP':>8} {'FP':>8} {'FN':>8} {'побочные':>9} "
+            f"{'точность':>9} {'полнота':>8} {'записей/с':>12}"
+        ]
+        for category, score in self.categories.items():
+            lines.append(
+                f"{category:>18} {score.true_positives:>8} {score.false_positives:>8} "
+                f"{score.false_negatives:>8} {score.side_effects:>9} {score.precision:>9.3f} "
+                f"{score.recall:>8.3f} {score.records_per_second:>12.0f}"
+            )
+        lines.append(f"Файлов: {self.files}, записей: {self.records}, записей/с: {self.records_per_second:.0f}")
+        return '\n'.join(lines)
+
+
+def score_file(file_path: str, **options: Any) -> DetectionScore:
+    """
+    Сравнивает ошибки, найденные валидатором, с внесенными ошибками файла.
+
+    Внесенные ошибки читаются из labels_path(file_path); файл без него
+    считается корректным.
+
+    Args:
+        file_path (str): Путь к CDR файлу
+        **options: Параметры collect_cdr_errors (rules, disabled_rules, config и т.д.)
+
+    Returns:
+        DetectionScore: Результат для одного файла
+    """
+    path = labels_path(file_path)
+    expected = {(label.line, label.category) for label in read_labels(path)} if os.path.exists(path) else set()
+
+    stats = ValidationStats()
+    started = time.perf_counter()
+    found = {(error.line, error.rule) for error in collect_cdr_errors(file_path, stats=stats, **options)}
+
+    score = DetectionScore()
+    score.files = 1
+    score.seconds = time.perf_counter() - started
+    score.records = stats.get("pass", "validation").records
+    _count_matches(score, expected, found)
+
+    # Скорость категории - по времени ее правил
+    for (kind, name), stat in stats.stats.items():
+        if kind == "rule" and name in RULES:
+            category = score.categories[RULES[name].category]
+            category.seconds += stat.seconds
+            category.records += stat.records
+    return score
+
+
+def score_files(file_paths: Iterable[str],
+                workers: Optional[int] = None,
+                chunksize: int = 16,
+                **options: Any) -> DetectionScore:
+    """
+    Оценивает обнаружение ошибок по набору файлов в пуле процессов.
+
+    Args:
+        file_paths (Iterable[str]): Пути к CDR файлам
+        workers (int, optional): Количество процессов; 1 - в текущем процессе, None - по числу ядер
+        chunksize (int): Количество файлов в одной задаче пула процессов
+        **options: Параметры collect_cdr_errors
+
+    Returns:
+        DetectionScore: Суммарный результат
+    """
+    total = DetectionScore()
+    started = time.perf_counter()
+    score = partial(score_file, **options)
+    if workers == 1:
+        for file_path in file_paths:
+            total.merge(score(file_path))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(score, file_paths, chunksize=chunksize):
+                total.merge(result)
+    # Скорость набора - по общему времени, а не по сумме времени процессов
+    total.seconds = time.perf_counter() - started
+    return total
+
+
+def score_directory(directory: str, workers: Optional[int] = None, **options: Any) -> DetectionScore:
+    """Оценивает обнаружение ошибок по всем CDR файлам директории (см. score_files)."""
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.txt'))
+    return score_files(paths, workers, **options)
+
+
+def _count_matches(score: DetectionScore, expected: Set[Tuple[int, str]], found: Set[Tuple[int, str]]) -> None:
+    labeled_lines = {line for line, _ in expected}
+    for line, category in found:
+        counts = score.categories.setdefault(category, CategoryScore())
+        if (line, category) in expected:
+            counts.true_positives += 1
+        elif line in labeled_lines:
+            counts.side_effects += 1
+        else:
+            counts.false_positives += 1
+    for line, category in expected - found:
+        score.categories.setdefault(category, CategoryScore()).false_negatives += 1
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Точность и полнота проверки CDR по размеченному корпусу")
+    parser.add_argument("directory", help="Директория с CDR файлами и файлами *.labels.jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="Количество процессов")
+    parser.add_argument("--disable", nargs="*", default=(), help="Выключенные правила")
+    parser.add_argument("--extended-sql", action="store_true",
+                        help="Искать SQL-инъекции по расширенному списку шаблонов")
+    args = parser.parse_args(argv)
+
+    sql_patterns = SQL_EXTENDED_PATTERNS if args.extended_sql else SQL_KEYWORDS
+    score = score_directory(args.directory, args.workers, disabled_rules=args.disable, sql_patterns=sql_patterns)
+    print(score.format_table())
+
+
+if __name__ == "__main__":
+    main()
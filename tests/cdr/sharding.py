@@ -0,0 +1,435 @@
+import locale
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from tests.cdr.helpers import CdrRecord, CdrStreamValidator, check_file_presence
+from tests.cdr.overlaps import ActiveCall, CallOverlapIndex
+from tests.cdr.reader import iter_mmap_lines
+from tests.cdr.rules import DEFAULT_CONFIG, CdrRuleConfig, resolve_rules
+from tests.cdr.sql_injection import SQL_KEYWORDS
+from tests.cdr.timestamps import Timestamp
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+READ_BLOCK_SIZE = 1024 * 1024
+# Размер блока строк, для которого запоминается наименьшее время начала
+CHECKPOINT_LINES = 4096
+# Межзаписные правила и правила файла, которые объединяются на границах диапазонов
+MERGED_RULES = frozenset(("call_overlap", "time_sequence", "record_count"))
+
+
+class CallConflict(NamedTuple):
+    """
+    Пересечение звонков внутри диапазона, найденное без учета предыдущих диапазонов.
+
+    watermark - линия заметания диапазона на момент записи: по ней при
+    объединении отбрасываются пересечения со звонками, вышедшими за окно
+    late_call_window линии заметания всего файла.
+    """
+    record: CdrRecord
+    other_line: int
+    other_end: Timestamp
+    watermark: Timestamp
+
+
+class ShardResult(NamedTuple):
+    """Результат проверки одного диапазона байт файла."""
+    file_path: str
+    start: int
+    end: int
+    first_line: int
+    errors: Dict[str, list]
+    line_count: int
+    # Первая запись с корректным временем начала: ее порядок проверяется относительно предыдущего диапазона
+    first_timed: Optional[CdrRecord]
+    # Последняя запись диапазона с корректным временем начала
+    last_timed: Optional[CdrRecord]
+    # Пересечения внутри диапазона, звонки, активные на его конце, и завершенные
+    # звонки в окне late_call_window до линии заметания
+    call_conflicts: List[CallConflict]
+    watermark: Optional[Timestamp]
+    active_calls: Dict[str, List[ActiveCall]]
+    finished_calls: Dict[str, List[ActiveCall]]
+    # Наименьшее время начала звонков в каждом блоке из CHECKPOINT_LINES строк
+    block_min_starts: List[Optional[Timestamp]]
+
+
+class CarriedCalls(NamedTuple):
+    """
+    Звонки предыдущих диапазонов, с которыми могут пересечься звонки диапазона.
+
+    watermark - линия заметания предыдущих диапазонов, window - окно
+    late_call_window, last_line - последняя строка диапазона, которую нужно проверить.
+    """
+    calls: Dict[str, List[ActiveCall]]
+    watermark: Timestamp
+    window: Optional[int]
+    last_line: int
+
+
+class ShardValidator(CdrStreamValidator):
+    """
+    Валидатор диапазона: пересечения звонков не попадают в отчет сразу,
+    а сохраняются, чтобы при объединении расположить их по номерам строк
+    вместе с пересечениями со звонками предыдущих диапазонов.
+    """
+
+    def __init__(self, first_line: int = 1, **options: Any):
+        super().__init__(first_line, **options)
+        self.call_conflicts: List[CallConflict] = []
+
+    def check_simultaneous_calls(self, record: CdrRecord) -> None:
+        if record.start is None or record.end is None:
+            return
+
+        for other_line, other_end in self.overlaps.add(
+                record.subscriber, record.start, record.end, record.line_no):
+            self.call_conflicts.append(CallConflict(record, other_line, other_end, self.overlaps.watermark))
+
+
+def split_into_ranges(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    Делит файл на диапазоны байт, которые заканчиваются на границе строки.
+
+    Args:
+        file_path (str): Путь к CDR файлу
+        chunk_size (int): Желаемый размер диапазона в байтах
+
+    Returns:
+        List[Tuple[int, int]]: Список пар (начало, конец) в байтах
+    """
+    file_size = os.path.getsize(file_path)
+    ranges = []
+    start = 0
+    with open(file_path, 'rb') as f:
+        while start < file_size:
+            f.seek(min(start + chunk_size, file_size) - 1)
+            # Дочитываем строку, в которую попала граница диапазона
+            f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def count_lines(file_path: str, start: int, end: int) -> int:
+    """Считает строки, начинающиеся в диапазоне байт [start, end)."""
+    count = 0
+    last_byte = b''
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            count += block.count(b'\n')
+            last_byte = block[-1:]
+            remaining -= len(block)
+    # Последняя строка файла может быть без перевода строки
+    if last_byte and last_byte != b'\n':
+        count += 1
+    return count
+
+
+def iter_range_lines(file_path: str, start: int, end: int) -> Iterator[str]:
+    """Читает строки, начинающиеся в диапазоне байт [start, end)."""
+    encoding = locale.getpreferredencoding(False)
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        for raw_line in f:
+            yield raw_line.decode(encoding)
+            remaining -= len(raw_line)
+            if remaining <= 0:
+                break
+
+
+def validate_range(file_path: str, start: int, end: int, first_line: int,
+                   use_mmap: bool = False, **options: Any) -> ShardResult:
+    """
+    Проверяет записи диапазона байт независимо от остальной части файла.
+
+    Args:
+        file_path (str): Путь к CDR файлу
+        start (int): Начало диапазона в байтах
+        end (int): Конец диапазона в байтах
+        first_line (int): Номер первой строки диапазона в файле
+        use_mmap (bool): Читать диапазон через отображение файла в память
+        **options: Параметры CdrStreamValidator (sql_patterns, rules, disabled_rules, config)
+
+    Returns:
+        ShardResult: Ошибки диапазона и состояние на его границах
+    """
+    validator = ShardValidator(first_line=first_line, **options)
+    first_timed = None
+    block_min_starts: List[Optional[Timestamp]] = []
+
+    if use_mmap:
+        lines = iter_mmap_lines(file_path, start, end, newline='\n')
+    else:
+        lines = iter_range_lines(file_path, start, end)
+
+    for line in lines:
+        record = validator.feed(line)
+        if (validator.line_count - 1) % CHECKPOINT_LINES == 0:
+            block_min_starts.append(None)
+        if record is not None and record.start is not None:
+            if first_timed is None:
+                first_timed = record
+            if block_min_starts[-1] is None or record.start < block_min_starts[-1]:
+                block_min_starts[-1] = record.start
+
+    validator.overlaps.prune()
+    return ShardResult(
+        file_path=file_path,
+        start=start,
+        end=end,
+        first_line=first_line,
+        errors=validator.errors,
+        line_count=validator.line_count,
+        first_timed=first_timed,
+        last_timed=validator.prev_timed,
+        call_conflicts=validator.call_conflicts,
+        watermark=validator.overlaps.watermark,
+        active_calls=validator.overlaps.active,
+        finished_calls=validator.overlaps.finished,
+        block_min_starts=block_min_starts,
+    )
+
+
+def carry_calls(shards: List[ShardResult],
+                window: Optional[int] = DEFAULT_CONFIG.late_call_window) -> List[Optional[CarriedCalls]]:
+    """
+    Определяет для каждого диапазона звонки предыдущих диапазонов, с которыми
+    могут пересечься его звонки, и сколько строк диапазона для этого нужно прочитать.
+
+    Последовательная проверка сравнивает запись со звонками, которые заканчиваются
+    позже ее начала и позже линии заметания минус window. Поэтому из предыдущих
+    диапазонов переносятся активные на границе и завершенные звонки, закончившиеся
+    позже начала самого раннего звонка диапазона и позже их линии заметания минус
+    window, а читать нужно только блоки строк до последнего, в котором есть звонок,
+    начинающийся раньше самого позднего окончания перенесенных звонков. С окном
+    перенесенных звонков ограниченное число; с window=None переносятся все подходящие
+    завершенные звонки.
+
+    Args:
+        shards (List[ShardResult]): Результаты диапазонов в порядке следования в файле
+        window (int, optional): Окно late_call_window в секундах
+
+    Returns:
+        List[Optional[CarriedCalls]]: Перенесенные звонки по диапазонам (None - проверять не нужно)
+    """
+    carry: Dict[str, List[ActiveCall]] = {}
+    watermark = None
+    carried: List[Optional[CarriedCalls]] = []
+    for shard in shards:
+        if watermark is not None and window is not None:
+            # Звонки, вышедшие за окно, не проверяются ни с одной последующей записью
+            horizon = watermark - window
+            carry = {subscriber: kept for subscriber, calls in carry.items()
+                     if (kept := [call for call in calls if call[0] > horizon])}
+
+        starts = [value for value in shard.block_min_starts if value is not None]
+        calls = {}
+        if starts:
+            earliest = min(starts)
+            calls = {subscriber: kept for subscriber, own in carry.items()
+                     if (kept := [call for call in own if call[0] > earliest])}
+        if calls:
+            max_end = max(call[0] for own in calls.values() for call in own)
+            blocks = max(i + 1 for i, value in enumerate(shard.block_min_starts)
+                         if value is not None and value < max_end)
+            last_line = shard.first_line + min(blocks * CHECKPOINT_LINES, shard.line_count) - 1
+            carried.append(CarriedCalls(calls, watermark, window, last_line))
+        else:
+            carried.append(None)
+
+        for own in (shard.active_calls, shard.finished_calls):
+            for subscriber, shard_calls in own.items():
+                carry.setdefault(subscriber, []).extend(shard_calls)
+        if shard.watermark is not None and (watermark is None or shard.watermark > watermark):
+            watermark = shard.watermark
+    return carried
+
+
+def find_carried_conflicts(file_path: str, start: int, end: int, first_line: int,
+                           carried: Optional[CarriedCalls]) -> List[Tuple[CdrRecord, int]]:
+    """
+    Находит пересечения звонков начала диапазона со звонками предыдущих диапазонов.
+
+    Читаются только строки до carried.last_line (см. carry_calls), поэтому
+    проверка диапазонов выполняется в рабочих процессах параллельно. Линия
+    заметания считается от линии предыдущих диапазонов, как при
+    последовательной проверке.
+
+    Args:
+        file_path (str): Путь к CDR файлу
+        start (int): Начало диапазона в байтах
+        end (int): Конец диапазона в байтах
+        first_line (int): Номер первой строки диапазона в файле
+        carried (CarriedCalls, optional): Звонки предыдущих диапазонов
+
+    Returns:
+        List[Tuple[CdrRecord, int]]: Пары (запись, номер строки звонка предыдущего диапазона)
+    """
+    if carried is None:
+        return []
+
+    found = []
+    watermark = carried.watermark
+    for line_no, line in enumerate(iter_range_lines(file_path, start, end), first_line):
+        if line_no > carried.last_line:
+            break
+        parts = [part.strip() for part in line.strip().split(',')]
+        if len(parts) != 5:
+            continue
+        record = CdrRecord.from_parts(parts, line_no)
+        if record.start is None or record.end is None:
+            continue
+        if record.start > watermark:
+            watermark = record.start
+        lower = record.start if carried.window is None else max(record.start, watermark - carried.window)
+        for other_end, other_start, other_line in carried.calls.get(record.subscriber, ()):
+            if other_start < record.end and other_end > lower:
+                found.append((record, other_line))
+    return found
+
+
+def merge_shards(shards: List[ShardResult],
+                 carried_conflicts: List[List[Tuple[CdrRecord, int]]],
+                 rules: Optional[Iterable[str]] = None,
+                 disabled_rules: Iterable[str] = (),
+                 config: CdrRuleConfig = DEFAULT_CONFIG) -> Dict[str, list]:
+    """
+    Объединяет результаты диапазонов в отчет, совпадающий с последовательной проверкой.
+
+    Межзаписные правила разрешаются на границах диапазонов: первая запись
+    диапазона сравнивается по времени с последней записью предыдущих, к
+    пересечениям внутри диапазона добавляются пересечения со звонками
+    предыдущих диапазонов (см. find_carried_conflicts), а пересечения внутри
+    диапазона со звонками, вышедшими за окно late_call_window линии заметания
+    всего файла, отбрасываются. Проверка полуночи не зависит от соседних
+    записей и в объединении не нуждается.
+
+    Args:
+        shards (List[ShardResult]): Результаты диапазонов в порядке следования в файле
+        carried_conflicts (List[List[Tuple[CdrRecord, int]]]): Пересечения со звонками
+            предыдущих диапазонов для каждого диапазона
+        rules (Iterable[str], optional): Имена включенных правил
+        disabled_rules (Iterable[str]): Имена выключенных правил
+        config (CdrRuleConfig): Параметры правил
+
+    Returns:
+        Dict[str, list]: Словарь с непустыми категориями ошибок
+    """
+    merged = CdrStreamValidator(rules=rules, disabled_rules=disabled_rules, config=config)
+    check_order = any(rule.name == "time_sequence" for rule in merged.rules)
+    window = config.late_call_window
+    watermark = None
+
+    for shard, carried in zip(shards, carried_conflicts):
+        if check_order and shard.first_timed is not None:
+            merged.check_time_sequence(shard.first_timed)
+        if shard.last_timed is not None:
+            merged.prev_timed = shard.last_timed
+
+        for category, values in shard.errors.items():
+            merged.errors[category].extend(values)
+
+        conflicts = list(carried)
+        conflicts.extend(
+            (conflict.record, conflict.other_line) for conflict in shard.call_conflicts
+            if window is None or watermark is None
+            or conflict.other_end > max(watermark, conflict.watermark) - window
+        )
+        conflicts.sort(key=lambda conflict: (conflict[0].line_no, conflict[1]))
+        for record, other_line in conflicts:
+            merged.report_call_conflict(record, other_line)
+
+        if shard.watermark is not None and (watermark is None or shard.watermark > watermark):
+            watermark = shard.watermark
+
+    return merged.finish(total_lines=sum(shard.line_count for shard in shards))
+
+
+def validate_cdr_file_sharded(file_path: str,
+                              workers: Optional[int] = None,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE,
+                              use_mmap: bool = False,
+                              sql_patterns: Iterable[str] = SQL_KEYWORDS,
+                              rules: Optional[Iterable[str]] = None,
+                              disabled_rules: Iterable[str] = (),
+                              config: CdrRuleConfig = DEFAULT_CONFIG) -> Dict[str, List[str]]:
+    """
+    Валидирует один большой CDR файл параллельно по диапазонам байт.
+
+    Сначала параллельно подсчитываются строки каждого диапазона, чтобы
+    знать сквозную нумерацию строк, затем диапазоны проверяются в рабочих
+    процессах, после чего начало каждого диапазона проверяется на пересечения
+    со звонками предыдущих (тоже параллельно, см. carry_calls), и результаты
+    объединяются функцией merge_shards.
+
+    Args:
+        file_path (str): Путь к CDR файлу для валидации
+        workers (int, optional): Количество процессов; 1 - проверка в текущем процессе,
+            None - по числу ядер
+        chunk_size (int): Размер диапазона в байтах
+        use_mmap (bool): Читать диапазоны через отображение файла в память
+        sql_patterns (Iterable[str]): Шаблоны SQL-инъекций
+        rules (Iterable[str], optional): Имена включенных правил (по умолчанию - все)
+        disabled_rules (Iterable[str]): Имена выключенных правил
+        config (CdrRuleConfig): Параметры правил
+
+    Returns:
+        Dict[str, List[str]]: Словарь с категориями ошибок и их описаниями
+
+    Raises:
+        ValueError: Если включено правило последовательности или файла, которое
+            нельзя объединить по диапазонам
+    """
+    rules = None if rules is None else tuple(rules)
+    disabled_rules = tuple(disabled_rules)
+    enabled = resolve_rules(rules, disabled_rules)
+    unsupported = [rule.name for rule in enabled if rule.scope != 'record' and rule.name not in MERGED_RULES]
+    if unsupported:
+        raise ValueError(f"Правила нельзя проверить по диапазонам: {', '.join(unsupported)}")
+
+    errors = check_file_presence(file_path)
+    if errors is not None:
+        return errors
+
+    ranges = split_into_ranges(file_path, chunk_size)
+    paths = [file_path] * len(ranges)
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    modes = [use_mmap] * len(ranges)
+    validate = partial(validate_range, sql_patterns=tuple(sql_patterns), rules=rules,
+                       disabled_rules=disabled_rules, config=config)
+    check_overlaps = any(rule.name == "call_overlap" for rule in enabled)
+
+    executor = None if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    run = map if executor is None else executor.map
+    try:
+        first_lines = _first_line_numbers(run(count_lines, paths, starts, ends))
+        shards = list(run(validate, paths, starts, ends, first_lines, modes))
+        if check_overlaps:
+            carried = carry_calls(shards, config.late_call_window)
+        else:
+            carried = [None] * len(shards)
+        carried_conflicts = list(run(find_carried_conflicts, paths, starts, ends, first_lines, carried))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return merge_shards(shards, carried_conflicts, rules, disabled_rules, config)
+
+
+def _first_line_numbers(line_counts: Iterable[int]) -> List[int]:
+    first_lines = []
+    next_line = 1
+    for line_count in line_counts:
+        first_lines.append(next_line)
+        next_line += line_count
+    return first_lines
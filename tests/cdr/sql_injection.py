@@ -0,0 +1,45 @@
+import re
+from typing import Iterable, List, Optional
+
+SQL_KEYWORDS = ('select', 'insert', 'update', 'delete', 'drop', 'alter', 'create')
+# Ключевые слова и фрагменты инъекций, которые порождает генератор негативных файлов
+SQL_EXTENDED_PATTERNS = SQL_KEYWORDS + ('--', ';', "' or '1'='1")
+
+
+class SqlInjectionScanner:
+    """
+    Поиск признаков SQL-инъекции одним скомпилированным регулярным выражением.
+
+    Строка без совпадений (подавляющее большинство строк) приводится к
+    нижнему регистру и просматривается один раз целиком. Для строки с
+    совпадением поля проверяются по отдельности, чтобы вернуть первое
+    подозрительное поле, как при проверке part.lower() каждого поля.
+    """
+
+    def __init__(self, patterns: Iterable[str] = SQL_KEYWORDS):
+        self.patterns = tuple(pattern.lower() for pattern in patterns)
+        if not self.patterns:
+            raise ValueError("Список шаблонов SQL-инъекций пуст")
+
+        self._regex = re.compile('|'.join(map(re.escape, dict.fromkeys(self.patterns))))
+
+    def find(self, line: str, parts: List[str]) -> Optional[str]:
+        """
+        Находит первое поле записи, содержащее один из шаблонов.
+
+        Args:
+            line (str): Строка записи, из которой получены поля
+            parts (List[str]): Поля записи без пробелов по краям
+
+        Returns:
+            Optional[str]: Подозрительное поле или None
+        """
+        # Каждое поле - подстрока строки, поэтому строка без совпадений
+        # не содержит подозрительных полей
+        if self._regex.search(line.lower()) is None:
+            return None
+
+        for part in parts:
+            if self._regex.search(part.lower()):
+                return part
+        return None
@@ -1,7 +1,34 @@
+import asyncio
+import io
+import json
 import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fractions import Fraction
+
 import allure
 import pytest
-from tests.cdr.helpers import validate_cdr_file
+from tests.benchmarks.suite import compare_with_baseline, load_baseline, percentile, save_baseline, summarize
+from tests.cdr.cache import ResultCache, ruleset_key
+from tests.cdr.columnar import validate_cdr_file_columnar
+from tests.cdr.helpers import CdrStreamValidator, collect_cdr_errors, is_cdr_file_valid, validate_all_cdr_files, validate_cdr_file, validate_cdr_file_safe
+from tests.cdr.overlaps import CallOverlapIndex
+from tests.cdr.profiling import ValidationStats
+from tests.cdr.reader import iter_mmap_lines
+from tests.cdr.record import CdrRecord
+from tests.cdr.report import ERROR_CODES, ERROR_RULES, CdrError, write_errors_jsonl, write_errors_npz
+from tests.cdr.rules import CdrRuleConfig, register_rule, unregister_rule
+from tests.cdr.scoring import score_directory
+from tests.cdr import helpers, reader, sharding
+from tests.cdr.sharding import validate_cdr_file_sharded
+from tests.cdr.sql_injection import SQL_EXTENDED_PATTERNS, SQL_KEYWORDS
+from tests.cdr.timestamps import parse_timestamp
+from tests.cdr.watcher import CdrDirectoryWatcher
+from tests.generators.corpus import generate_corpus, load_manifest, rebuild_corpus, verify_corpus
+from tests.generators.negative_cdr_generator import generate_error_cdr_file, generate_timestamp, generate_valid_record, labels_path, plan_errors, read_labels
+from tests.generators.positive_cdr_generator import generate_cdr_file, generate_multiple_cdr_files
+from tests.generators.vectorized_cdr_generator import generate_cdr_file_streaming, generate_cdr_file_vectorized
 
 @pytest.fixture
 def test_files_dir():
@@ -114,6 +141,21 @@ def test_sql_injection(test_files_dir):
     errors = validate_cdr_file(os.path.join(test_files_dir, 'CDR_negative_injection.txt'))
     assert "SQL-инъекция" in errors["security"][0]
 
+@allure.story("Негативный сценарий")
+@allure.title("Расширенный список шаблонов SQL-инъекций")
+@allure.severity(allure.severity_level.CRITICAL)
+def test_sql_injection_extended_patterns(test_files_dir, tmp_path):
+    """Test that injection fragments without SQL keywords are found only with the extended pattern list"""
+    with open(os.path.join(test_files_dir, 'CDR_positive.txt')) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    lines[2] = lines[2].replace('79000000003', "' OR '1'='1", 1)
+    file_path = tmp_path / "CDR_injection_or.txt"
+    file_path.write_text('\n'.join(lines))
+
+    assert "security" not in validate_cdr_file(str(file_path))
+    errors = validate_cdr_file(str(file_path), sql_patterns=SQL_EXTENDED_PATTERNS)
+    assert errors["security"] == ["Строка 3: Обнаружена возможная SQL-инъекция в поле '' OR '1'='1'"]
+
 @allure.story("Негативный сценарий")
 @allure.title("Звонок пересекает полночь и не делится на 2 звонка")
 @allure.severity(allure.severity_level.CRITICAL)
@@ -128,4 +170,814 @@ def test_midnight_crossing(test_files_dir):
 def test_wrong_operator_code(test_files_dir):
     """Test file with wrong operator code (not 900)"""
     errors = validate_cdr_file(os.path.join(test_files_dir, 'СDR_negative_otherOperator.txt'))
-    assert "Неверный код оператора" in errors["operator_code"][0]
\ No newline at end of file
+    assert "Неверный код оператора" in errors["operator_code"][0]
+
+@allure.story("Параллельная валидация")
+@allure.title("Результаты пула процессов совпадают с последовательной проверкой")
+@allure.severity(allure.severity_level.NORMAL)
+def test_parallel_validation_matches_serial(test_files_dir):
+    """Test that process-pool validation returns the same results as serial validation"""
+    serial = validate_all_cdr_files(test_files_dir)
+    parallel = validate_all_cdr_files(test_files_dir, workers=2, chunksize=2)
+    assert parallel == serial
+
+@allure.story("Шардированная валидация")
+@allure.title("Проверка по диапазонам байт совпадает с последовательной проверкой")
+@allure.severity(allure.severity_level.NORMAL)
+@pytest.mark.parametrize("chunk_size", [1, 64, 200, 1024 * 1024])
+def test_sharded_validation_matches_serial(test_files_dir, chunk_size):
+    """Test that sharded validation of each fixture file matches serial validation"""
+    for filename in sorted(os.listdir(test_files_dir)):
+        file_path = os.path.join(test_files_dir, filename)
+        expected = validate_cdr_file(file_path)
+        assert validate_cdr_file_sharded(file_path, workers=1, chunk_size=chunk_size) == expected, filename
+
+@allure.story("Шардированная валидация")
+@allure.title("Межзаписные ошибки на границах диапазонов")
+@allure.severity(allure.severity_level.NORMAL)
+def test_sharded_validation_cross_boundary_errors(test_files_dir, tmp_path):
+    """Test that time order and overlap errors spanning shard boundaries are merged like a serial run"""
+    lines = []
+    for name in ('CDR_negative_2OutgoingCallsSimultaneously.txt', 'CDR_negative_without_timeOrder.txt',
+                 'CDR_negative_without_2Records.txt', 'CDR_positive.txt'):
+        with open(os.path.join(test_files_dir, name)) as f:
+            lines.extend(line.strip() for line in f if line.strip())
+    file_path = tmp_path / "CDR_merged.txt"
+    file_path.write_text('\n'.join(lines))
+
+    expected = validate_cdr_file(str(file_path))
+    assert expected["time_sequence"] and expected["call_logic"]
+    for chunk_size in (50, 333, 1000):
+        assert validate_cdr_file_sharded(str(file_path), workers=2, chunk_size=chunk_size) == expected
+
+@allure.story("Шардированная валидация")
+@allure.title("Пересечения со звонками предыдущих диапазонов")
+@allure.severity(allure.severity_level.NORMAL)
+def test_sharded_validation_carried_calls(tmp_path, monkeypatch):
+    """Test that calls carried across shards are checked on a bounded shard head, including late records"""
+    monkeypatch.setattr(sharding, "CHECKPOINT_LINES", 2)
+    lines = [f"02,7900000{i + 100:04d}, 79900000001, 2025-06-02T{i // 60:02d}:{i % 60:02d}:00, "
+             f"2025-06-02T{i // 60:02d}:{i % 60:02d}:30" for i in range(120)]
+    lines[0] = "01,79000000001, 79900000001, 2025-06-02T00:00:00, 2025-06-02T00:30:00"
+    lines[20] = "02,79000000001, 79900000002, 2025-06-02T00:20:00, 2025-06-02T00:21:00"
+    file_path = tmp_path / "CDR_carried.txt"
+    file_path.write_text('\n'.join(lines))
+    path = str(file_path)
+
+    ranges = sharding.split_into_ranges(path, 500)
+    first_lines = sharding._first_line_numbers(sharding.count_lines(path, start, end) for start, end in ranges)
+    shards = [sharding.validate_range(path, start, end, first_line)
+              for (start, end), first_line in zip(ranges, first_lines)]
+    carried = sharding.carry_calls(shards)
+    # Звонок до 00:30 проверяется только в начале диапазонов, где звонки начинаются раньше его окончания
+    assert any(head is not None and head.last_line < shard.first_line + shard.line_count - 1
+               for head, shard in zip(carried, shards))
+    assert carried[-1] is None
+
+    # Звонок с окончанием в 2099 году переносится во все последующие диапазоны
+    lines[1] = "01,79000000009, 79900000009, 2025-06-02T00:01:00, 2099-01-01T00:00:00"
+    lines[100] = "01,79000000009, 79900000003, 2025-06-02T01:40:00, 2025-06-02T01:40:30"
+    file_path.write_text('\n'.join(lines))
+    expected = validate_cdr_file(path)
+    assert len(expected["call_logic"]) == 2
+    for chunk_size in (200, 500, 1024 * 1024):
+        assert validate_cdr_file_sharded(path, workers=2, chunk_size=chunk_size) == expected
+
+    # Звонок вне хронологии пересекается с завершенным звонком первого диапазона
+    lines.append("02,79000000001, 79900000004, 2025-06-02T00:10:00, 2025-06-02T00:11:00")
+    file_path.write_text('\n'.join(lines))
+    expected = validate_cdr_file(path)
+    assert len(expected["call_logic"]) == 2
+    for chunk_size in (200, 500):
+        assert validate_cdr_file_sharded(path, workers=1, chunk_size=chunk_size) == expected
+    exact = CdrRuleConfig(late_call_window=None)
+    expected = validate_cdr_file(path, config=exact)
+    assert len(expected["call_logic"]) == 3
+    for chunk_size in (200, 500):
+        assert validate_cdr_file_sharded(path, workers=1, chunk_size=chunk_size, config=exact) == expected
+
+@allure.story("Шардированная валидация")
+@allure.title("Параметры проверки по диапазонам совпадают с последовательной проверкой")
+@allure.severity(allure.severity_level.NORMAL)
+def test_sharded_validation_options(test_files_dir):
+    """Test that sharded validation honours sql patterns, rules and config, and rejects unmergeable rules"""
+    options = {
+        "sql_patterns": SQL_EXTENDED_PATTERNS,
+        "disabled_rules": ["time_sequence"],
+        "config": CdrRuleConfig(record_count=12),
+    }
+    for filename in sorted(os.listdir(test_files_dir)):
+        file_path = os.path.join(test_files_dir, filename)
+        expected = validate_cdr_file(file_path, **options)
+        assert validate_cdr_file_sharded(file_path, workers=1, chunk_size=200, **options) == expected, filename
+        assert validate_cdr_file_sharded(file_path, workers=1, chunk_size=200, rules=["call_overlap"]) == \
+            validate_cdr_file(file_path, rules=["call_overlap"]), filename
+
+    register_rule("repeated_contact", "call_logic", ("contact",), scope="stream")(lambda validator, record: None)
+    try:
+        with pytest.raises(ValueError, match="repeated_contact"):
+            validate_cdr_file_sharded(os.path.join(test_files_dir, 'CDR_positive.txt'), workers=1)
+        validate_cdr_file_sharded(os.path.join(test_files_dir, 'CDR_positive.txt'), workers=1,
+                                  disabled_rules=["repeated_contact"])
+    finally:
+        unregister_rule("repeated_contact")
+
+@allure.story("Пакетная валидация")
+@allure.title("Пакетная проверка столбцами совпадает с потоковой")
+@allure.severity(allure.severity_level.NORMAL)
+def test_columnar_validation_matches_serial(test_files_dir, monkeypatch):
+    """Test that columnar validation of each fixture file matches streaming validation"""
+    pytest.importorskip("numpy")
+    for filename in sorted(os.listdir(test_files_dir)):
+        file_path = os.path.join(test_files_dir, filename)
+        assert validate_cdr_file_columnar(file_path) == validate_cdr_file(file_path), filename
+
+    # Параметры и набор правил учитываются так же, как в потоковой проверке
+    options = [
+        {"config": CdrRuleConfig(operator_code='921', call_types=('01', '02', '03'), record_count=12)},
+        {"config": CdrRuleConfig(number_length=12)},
+        {"config": CdrRuleConfig(operator_code='9')},
+        {"disabled_rules": ["timestamps", "call_overlap"]},
+        {"rules": ["operator_code", "midnight_crossing"]},
+    ]
+    for filename in sorted(os.listdir(test_files_dir)):
+        file_path = os.path.join(test_files_dir, filename)
+        for kwargs in options:
+            assert validate_cdr_file_columnar(file_path, **kwargs) == validate_cdr_file(file_path, **kwargs), filename
+
+    # Подробности выводятся через echo потокового валидатора
+    messages = []
+    monkeypatch.setattr(CdrStreamValidator, "echo", lambda self, message: messages.append(message))
+    for filename in sorted(os.listdir(test_files_dir)):
+        file_path = os.path.join(test_files_dir, filename)
+        validate_cdr_file(file_path, verbose=True)
+        expected = sorted(messages)
+        messages.clear()
+        validate_cdr_file_columnar(file_path, verbose=True)
+        assert sorted(messages) == expected, filename
+        messages.clear()
+
+@allure.story("Пакетная валидация")
+@allure.title("Пакетная проверка строк нестандартного формата")
+@allure.severity(allure.severity_level.NORMAL)
+def test_columnar_validation_irregular_lines(test_files_dir, tmp_path):
+    """Test that lines outside the fixed layout are checked like in streaming validation"""
+    pytest.importorskip("numpy")
+    lines = []
+    for name in ('CDR_negative_2IncomingCallsSimultaneously.txt', 'CDR_negative_injection.txt',
+                 'CDR_negative_without_comma.txt', 'CDR_negative_03.txt'):
+        with open(os.path.join(test_files_dir, name)) as f:
+            lines.extend(line.strip() for line in f if line.strip())
+    lines += [
+        "01,\t79000000001 ,79900000001,2025-06-03T00:00:00.500000, 2025-06-03T00:00:01",
+        "02, 79000000001, 79900000001, 2025-06-02 23:59:00, 2025-06-03T00:01:00",
+        "",
+        "01, 7900000000x, 79900000001, 2025-06-03T01:00:00, 2025-06-03T01:00:00",
+    ]
+    file_path = tmp_path / "CDR_irregular.txt"
+    file_path.write_bytes('\r\n'.join(lines).encode())
+
+    expected = validate_cdr_file(str(file_path))
+    assert expected["call_logic"] and expected["midnight_crossing"] and expected["security"]
+    assert validate_cdr_file_columnar(str(file_path)) == expected
+
+@allure.story("Негативный сценарий")
+@allure.title("Пересечение звонков после 10-й строки файла")
+@allure.severity(allure.severity_level.NORMAL)
+def test_simultaneous_calls_after_line_10(test_files_dir, tmp_path):
+    """Test that overlapping calls are detected anywhere in the file, not only in the first 10 lines"""
+    with open(os.path.join(test_files_dir, 'CDR_positive.txt')) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    lines.append("02,79000000099, 79900000001, 2025-06-02T23:00:00, 2025-06-02T23:05:00")
+    lines.append("01,79000000099, 79900000002, 2025-06-02T23:01:00, 2025-06-02T23:02:00")
+    file_path = tmp_path / "CDR_overlap_12.txt"
+    file_path.write_text('\n'.join(lines))
+
+    errors = validate_cdr_file(str(file_path))
+    assert errors["call_logic"] == ["Конфликт исходящих вызовов"]
+
+@allure.story("Негативный сценарий")
+@allure.title("Пересечение записи вне хронологии с уже завершенным звонком")
+@allure.severity(allure.severity_level.NORMAL)
+def test_out_of_order_overlap_with_finished_call(tmp_path):
+    """Test that an out-of-order record is checked against calls already pruned by the sweep line"""
+    lines = [
+        "01,79000000001, 79900000001, 2025-06-02T10:00:00, 2025-06-02T10:05:00",
+        "01,79000000002, 79900000002, 2025-06-02T10:10:00, 2025-06-02T10:11:00",
+        "01,79000000001, 79900000003, 2025-06-02T10:20:00, 2025-06-02T10:21:00",
+        "02,79000000001, 79900000004, 2025-06-02T10:02:00, 2025-06-02T10:03:00",
+    ]
+    file_path = tmp_path / "CDR_late_overlap.txt"
+    file_path.write_text('\n'.join(lines))
+
+    overlaps = [error for error in collect_cdr_errors(str(file_path)) if error.rule == "call_logic"]
+    assert overlaps == [CdrError(4, "call_logic", "incoming_overlap", "start_time", 1)]
+    assert validate_cdr_file_columnar(str(file_path)) == validate_cdr_file(str(file_path))
+
+    # Звонки, закончившиеся раньше окна late_call_window до линии заметания, не хранятся
+    lines += [
+        "01,79000000001, 79900000005, 2025-06-02T12:00:00, 2025-06-02T12:01:00",
+        "02,79000000001, 79900000006, 2025-06-02T10:04:00, 2025-06-02T10:04:30",
+    ]
+    file_path.write_text('\n'.join(lines))
+    overlaps = [error.line for error in collect_cdr_errors(str(file_path)) if error.rule == "call_logic"]
+    assert overlaps == [4]
+    assert validate_cdr_file_columnar(str(file_path)) == validate_cdr_file(str(file_path))
+    exact = CdrRuleConfig(late_call_window=None)
+    overlaps = [error.line for error in collect_cdr_errors(str(file_path), config=exact) if error.rule == "call_logic"]
+    assert overlaps == [4, 6]
+
+    index = CallOverlapIndex(window=60)
+    for i in range(10_000):
+        index.add(str(i % 100), i * 10, i * 10 + 5, i)
+    # Хранятся звонки окна и до одного ожидающего очистки звонка на абонента, а не все 10000
+    assert sum(map(len, index.finished.values())) + sum(map(len, index.active.values())) <= 2 * 100
+
+@allure.story("Негативный сценарий")
+@allure.title("Некорректная метка времени начала звонка")
+@allure.severity(allure.severity_level.NORMAL)
+def test_malformed_timestamp(test_files_dir, tmp_path):
+    """Test that a malformed timestamp keeps the original error message"""
+    with open(os.path.join(test_files_dir, 'CDR_positive.txt')) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    lines[0] = "01,79000000001, 79900000001, 2025-13-01T25:61:61, 2025-06-02T00:00:30"
+    file_path = tmp_path / "CDR_malformed_time.txt"
+    file_path.write_text('\n'.join(lines))
+
+    errors = validate_cdr_file(str(file_path))
+    assert errors["timestamps"] == ["Строка 1: Некорректный формат времени начала '2025-13-01T25:61:61'"]
+
+@allure.story("Метки времени")
+@allure.title("Разбор меток времени в секунды эпохи")
+@allure.severity(allure.severity_level.NORMAL)
+def test_parse_timestamp_matches_datetime():
+    """Test that epoch seconds match datetime arithmetic for fixed and other ISO layouts"""
+    epoch = datetime(1970, 1, 1)
+    for value in ('2025-06-02T00:00:00', '2024-02-29T23:59:59', '1999-12-31T12:30:05'):
+        assert parse_timestamp(value) == (datetime.fromisoformat(value) - epoch).total_seconds()
+    assert parse_timestamp('2025-06-02T00:00:00.500000') - parse_timestamp('2025-06-02T00:00:00') == Fraction(1, 2)
+    assert parse_timestamp('2025-06-02T03:00:00+03:00') == parse_timestamp('2025-06-02T00:00:00')
+    for value in ('2025-13-01T25:61:61', '2025-02-30T00:00:00', '2025-06-02T24:00:00', ''):
+        with pytest.raises(ValueError):
+            parse_timestamp(value)
+
+@allure.story("Модель записи")
+@allure.title("Запись CDR восстанавливает исходную строку")
+@allure.severity(allure.severity_level.NORMAL)
+def test_cdr_record_round_trip():
+    """Test that CdrRecord keeps numbers as int and restores the parsed line"""
+    line = "01,79000000001,79900000001,2025-06-01T23:59:55,2025-06-02T00:00:00"
+    record = CdrRecord.from_line(line, 3)
+    assert record.subscriber == 79000000001 and record.contact == 79900000001
+    assert record.end - record.start == 5
+    assert record.to_line() == line
+
+    for odd_line in ("03,7900ABC0001,,2025-06-01T23:59:55.250000,2025-13-01T25:61:61",
+                     "01,079000000001,79900000001,2025-06-02T03:00:00+03:00,2025-06-02T00:00:01"):
+        assert CdrRecord.from_line(odd_line).to_line() == odd_line
+
+    moment = datetime(2025, 6, 1, 23, 59, 59, 999999)
+    record = CdrRecord.from_datetimes('02', '79000000001', '79900000001', moment, moment)
+    assert record.start_time == moment.isoformat()
+    assert record.with_field(1, "12345").subscriber == "12345"
+    with pytest.raises(ValueError):
+        CdrRecord.from_line("01,79000000001,79900000001")
+
+@allure.story("Кэш результатов")
+@allure.title("Повторная проверка директории берет неизмененные файлы из кэша")
+@allure.severity(allure.severity_level.NORMAL)
+def test_result_cache_skips_unchanged_files(test_files_dir, tmp_path, monkeypatch):
+    """Test that cached results match a fresh run and are invalidated by content and rule-set changes"""
+    directory = tmp_path / "cdr"
+    directory.mkdir()
+    for name in ('CDR_positive.txt', 'CDR_negative_03.txt'):
+        with open(os.path.join(test_files_dir, name)) as f:
+            (directory / name).write_text(f.read())
+    expected = validate_all_cdr_files(str(directory))
+    db_path = str(tmp_path / "cache.sqlite")
+
+    with ResultCache(db_path) as cache:
+        assert validate_all_cdr_files(str(directory), cache=cache) == expected
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    # Перезапись файла тем же содержимым обновляет mtime, но не требует проверки
+    positive = directory / 'CDR_positive.txt'
+    positive.write_text(positive.read_text())
+    with ResultCache(db_path) as cache:
+        assert validate_all_cdr_files(str(directory), cache=cache) == expected
+        assert (cache.hits, cache.misses) == (2, 0)
+
+    positive.write_text(positive.read_text().replace('01,', '03,', 1))
+    with ResultCache(db_path) as cache:
+        errors = validate_all_cdr_files(str(directory), cache=cache)
+        assert errors['CDR_positive.txt'] == validate_cdr_file(str(positive))
+        assert errors['CDR_positive.txt'] != expected['CDR_positive.txt']
+        assert cache.misses == 1
+
+    with ResultCache(db_path, ruleset="next") as cache:
+        assert len(cache) == 0
+
+    with ResultCache(db_path, ruleset="next", max_bytes=1) as cache:
+        validate_all_cdr_files(str(directory), cache=cache)
+        assert len(cache) == 0
+
+    # Ключ набора правил зависит от включенных правил и их параметров
+    assert ruleset_key() != ruleset_key(disabled_rules=["sql_injection"])
+    assert ruleset_key() != ruleset_key(config=CdrRuleConfig(record_count=12))
+    with ResultCache(db_path) as cache:
+        assert len(cache) == 0
+
+    # Файл, который не удалось прочитать, не попадает в кэш
+    def fail_positive(file_path, *args, **kwargs):
+        if file_path.endswith('CDR_positive.txt'):
+            raise OSError("диск недоступен")
+        return validate_cdr_file(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(helpers, "validate_cdr_file", fail_positive)
+    with ResultCache(db_path) as cache:
+        errors = validate_all_cdr_files(str(directory), cache=cache)
+        assert errors['CDR_positive.txt'] == {"file_structure": ["Ошибка чтения файла: диск недоступен"]}
+        assert len(cache) == 1
+    assert validate_cdr_file_safe(str(positive)) == (str(positive), errors['CDR_positive.txt'], False)
+    monkeypatch.undo()
+    with ResultCache(db_path) as cache:
+        assert validate_all_cdr_files(str(directory), cache=cache)['CDR_positive.txt'] == validate_cdr_file(str(positive))
+        assert (cache.hits, cache.misses) == (1, 1)
+        # Файл, удаленный после stat, не прерывает поиск в кэше
+        monkeypatch.setattr("tests.cdr.cache.file_digest", lambda path: open(path + ".missing", 'rb'))
+        assert cache.lookup(str(positive)) == (None, None)
+
+@allure.story("Чтение файла")
+@allure.title("Чтение через отображение в память совпадает с текстовым режимом")
+@allure.severity(allure.severity_level.NORMAL)
+def test_mmap_reader_matches_text_mode(test_files_dir, tmp_path):
+    """Test that the mmap reader splits lines like text mode and gives the same validation result"""
+    file_path = tmp_path / "CDR_newlines.txt"
+    file_path.write_bytes(b"01,a\r\n\r\n02,b\rx\n" + "файл\n".encode() * 3 + b"03,c")
+    with open(file_path) as f:
+        expected = [line.rstrip('\n') for line in f]
+    for block_size in (1, 5, 1024):
+        assert list(iter_mmap_lines(str(file_path), block_size=block_size)) == expected
+    assert list(iter_mmap_lines(str(file_path), start=6, newline='\n', block_size=4)) == [
+        "\r", "02,b\rx", "файл", "файл", "файл", "03,c"
+    ]
+
+    # Файл с переводами строки '\r' читается блоками около block_size
+    file_path.write_bytes(b"01,a\r" * 1000 + b"02,b\r\n03,c\r")
+    with open(file_path) as f:
+        expected = [line.rstrip('\n') for line in f]
+    for block_size in (3, 7, 64):
+        assert list(iter_mmap_lines(str(file_path), block_size=block_size)) == expected
+        blocks = list(reader._iter_mmap_blocks(str(file_path), 0, None, None, block_size))
+        assert max(len(block) for block in blocks) <= block_size
+
+    for name in ('CDR_positive.txt', 'CDR_negative_03.txt', 'CDR_negative_without_comma.txt'):
+        path = os.path.join(test_files_dir, name)
+        expected = validate_cdr_file(path)
+        assert validate_cdr_file(path, use_mmap=True) == expected
+        assert validate_cdr_file_sharded(path, workers=1, chunk_size=128, use_mmap=True) == expected
+
+@allure.story("Наблюдение за директорией")
+@allure.title("Новый файл проверяется сразу после записи")
+@allure.severity(allure.severity_level.NORMAL)
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_directory_watcher_validates_new_files(test_files_dir, tmp_path, use_inotify):
+    """Test that the watcher reports existing and newly written files once each"""
+    with open(os.path.join(test_files_dir, 'CDR_positive.txt')) as f:
+        content = f.read()
+    (tmp_path / "existing.txt").write_text(content)
+    results = []
+
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            watcher = CdrDirectoryWatcher(str(tmp_path), lambda path, errors: results.append((path, errors)),
+                                          poll_interval=0.05, use_inotify=use_inotify, executor=executor)
+            task = asyncio.create_task(watcher.run())
+            while len(results) < 1:
+                await asyncio.sleep(0.01)
+            (tmp_path / "new.txt").write_text(content.replace('01,', '03,', 1))
+            (tmp_path / "ignored.csv").write_text(content)
+            while len(results) < 2:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.2)
+            watcher.stop()
+            await asyncio.wait_for(task, 5)
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert [os.path.basename(path) for path, _ in results] == ["existing.txt", "new.txt"]
+    assert results[0][1] == {}
+    assert results[1][1] == validate_cdr_file(str(tmp_path / "new.txt"))
+
+@allure.story("Наблюдение за директорией")
+@allure.title("Удаленные файлы и ошибки проверки")
+@allure.severity(allure.severity_level.NORMAL)
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_directory_watcher_forgets_deleted_files_and_propagates_errors(test_files_dir, tmp_path, use_inotify):
+    """Test that deleted files are no longer tracked and that a failing sink stops the watcher"""
+    with open(os.path.join(test_files_dir, 'CDR_positive.txt')) as f:
+        content = f.read()
+    for i in range(3):
+        (tmp_path / f"CDR_{i}.txt").write_text(content)
+    results = []
+
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            watcher = CdrDirectoryWatcher(str(tmp_path), lambda path, errors: results.append(path),
+                                          poll_interval=0.05, use_inotify=use_inotify, executor=executor)
+            task = asyncio.create_task(watcher.run())
+            while len(results) < 3:
+                await asyncio.sleep(0.01)
+            os.remove(tmp_path / "CDR_0.txt")
+            os.rename(tmp_path / "CDR_1.txt", tmp_path / "CDR_1.bak")
+            while len(watcher._seen) > 1:
+                await asyncio.sleep(0.01)
+            watcher.stop()
+            await asyncio.wait_for(task, 5)
+
+        def failing_sink(path, errors):
+            raise OSError("disk full")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Очередь из одного файла заполняется, пока приемник не упал
+            watcher = CdrDirectoryWatcher(str(tmp_path), failing_sink, max_pending=1,
+                                          poll_interval=0.05, use_inotify=use_inotify, executor=executor)
+            for i in range(3, 6):
+                (tmp_path / f"CDR_{i}.txt").write_text(content)
+            with pytest.raises(OSError, match="disk full"):
+                await asyncio.wait_for(watcher.run(), 5)
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert sorted(os.path.basename(path) for path in results) == ["CDR_0.txt", "CDR_1.txt", "CDR_2.txt"]
+
+@allure.story("Отчет об ошибках")
+@allure.title("Машиночитаемые ошибки, ограничение их количества и выгрузка")
+@allure.severity(allure.severity_level.NORMAL)
+def test_structured_errors_and_export(tmp_path, capsys):
+    """Test error codes, early stop after max_errors, quiet console and JSONL/npz export"""
+    file_path = tmp_path / "CDR_structured.txt"
+    file_path.write_text('\n'.join([
+        "01,79000000001,79900000001,2025-06-01T10:00:00,2025-06-01T10:01:00",
+        "03,7900000000A,,2025-06-01T10:00:10,2025-06-01T10:00:10",
+        "01,79210000001,79900000001",
+        "02,79000000001,79900000001,2025-06-01T10:00:30,2025-06-01T10:05:00",
+    ]))
+
+    errors = collect_cdr_errors(str(file_path))
+    assert errors == [
+        CdrError(2, "record_format", "call_type", "call_type", "03"),
+        CdrError(2, "phone_numbers", "non_digit_number", "subscriber", "7900000000A"),
+        CdrError(2, "phone_numbers", "missing_number", "contact"),
+        CdrError(2, "timestamps", "short_call", "end_time", "2025-06-01T10:00:10"),
+        CdrError(3, "record_format", "field_count", value=3),
+        CdrError(4, "call_logic", "incoming_overlap", "start_time", 1),
+        CdrError(0, "file_structure", "record_count", value=4),
+    ]
+    assert collect_cdr_errors(str(file_path), max_errors=2) == errors[:4]
+    assert collect_cdr_errors(str(tmp_path / "missing.txt")) == [CdrError(0, "file_structure", "file_missing")]
+
+    capped = validate_cdr_file(str(file_path), max_errors=2)
+    assert "call_logic" not in capped and "file_structure" not in capped
+    assert capsys.readouterr().out == ""
+    validate_cdr_file(str(file_path), verbose=True)
+    assert "Строка 3: Неправильное количество полей (3 вместо 5)" in capsys.readouterr().out
+
+    output = io.StringIO()
+    assert write_errors_jsonl({"CDR_structured.txt": errors}, output) == len(errors)
+    first = json.loads(output.getvalue().splitlines()[0])
+    assert first == {"file": "CDR_structured.txt", "line": 2, "rule": "record_format",
+                     "code": "call_type", "field": "call_type", "value": "03"}
+
+    np = pytest.importorskip("numpy")
+    npz_path = str(tmp_path / "errors.npz")
+    assert write_errors_npz({"CDR_structured.txt": errors}, npz_path) == len(errors)
+    with np.load(npz_path) as columns:
+        assert columns["line"].tolist() == [error.line for error in errors]
+        assert [columns["codes"][code] for code in columns["code_id"]] == [error.code for error in errors]
+
+    # Номера кодов больше 127 не переполняются
+    register_rule("many_codes", "call_logic", codes={f"code_{i}": "Код правила" for i in range(130)})(
+        lambda validator, record: None)
+    try:
+        errors = [CdrError(1, "call_logic", "code_129", "contact")]
+        write_errors_npz({"CDR_structured.txt": errors}, npz_path)
+        with np.load(npz_path) as columns:
+            assert [columns["codes"][code] for code in columns["code_id"]] == ["code_129"]
+    finally:
+        unregister_rule("many_codes")
+
+@allure.story("Отчет об ошибках")
+@allure.title("Остановка на первой ошибке и предварительная проверка структуры")
+@allure.severity(allure.severity_level.NORMAL)
+def test_fail_fast_and_structure_prescan(test_files_dir, tmp_path):
+    """Test stopping at the first error (of chosen categories) and the structural prescan"""
+    file_path = tmp_path / "CDR_fail_fast.txt"
+    file_path.write_text('\n'.join([
+        "01,79000000001,79900000001,2025-06-01T10:00:00,2025-06-01T10:01:00",
+        "03,79000000002,79900000001,2025-06-01T10:00:10,2025-06-01T10:00:20",
+        "01,79210000001,79900000001",
+        "02,79000000001,79900000001,2025-06-01T10:00:30,2025-06-01T10:05:00",
+    ]))
+    path = str(file_path)
+
+    assert collect_cdr_errors(path, fail_fast=True) == [
+        CdrError(2, "record_format", "call_type", "call_type", "03"),
+    ]
+    assert [error.code for error in collect_cdr_errors(path, fail_fast=True, fail_rules=["call_logic"])] == [
+        "call_type", "field_count", "incoming_overlap",
+    ]
+    assert collect_cdr_errors(path, prescan=True) == [
+        CdrError(3, "record_format", "field_count", value=3),
+        CdrError(0, "file_structure", "record_count", value=4),
+    ]
+    assert validate_cdr_file(path, prescan=True) == {"record_format": [3], "file_structure": [4]}
+    with pytest.raises(ValueError):
+        validate_cdr_file(path, fail_fast=True, fail_rules=["billing"])
+
+    assert not is_cdr_file_valid(path)
+    assert is_cdr_file_valid(os.path.join(test_files_dir, "CDR_positive.txt"))
+
+@allure.story("Правила проверки")
+@allure.title("Правила включаются, настраиваются и добавляются без изменения валидатора")
+@allure.severity(allure.severity_level.NORMAL)
+def test_configurable_rules(tmp_path):
+    """Test rule selection, rule parameters and a custom registered rule"""
+    file_path = tmp_path / "CDR_rules.txt"
+    file_path.write_text('\n'.join([
+        "01,79210000001,79210000002,2025-06-01T10:00:00,2025-06-01T10:01:00",
+        "03,79210000002,79210000002,2025-06-01T10:02:00,2025-06-01T10:03:00",
+    ]))
+    path = str(file_path)
+
+    assert [error.code for error in collect_cdr_errors(path)] == [
+        "operator_code", "operator_code", "call_type", "record_count",
+    ]
+    assert [error.code for error in collect_cdr_errors(path, disabled_rules=["operator_code", "record_count"])] == [
+        "call_type",
+    ]
+    assert collect_cdr_errors(path, rules=["timestamps", "midnight_crossing"]) == []
+
+    config = CdrRuleConfig(record_count=2, call_types=("01", "02", "03"), operator_code="921")
+    assert validate_cdr_file(path, config=config) == {}
+    with pytest.raises(ValueError):
+        validate_cdr_file(path, rules=["operator"])
+
+    @register_rule("self_call", "call_logic", ("subscriber", "contact"), codes={"self_call": "Звонок самому себе"})
+    def check_self_call(validator, record):
+        if record.subscriber == record.contact:
+            validator.errors["call_logic"].append(f"Строка {record.line_no}: Звонок самому себе")
+            validator.add_issue(record.line_no, "call_logic", "self_call", "contact", record.contact)
+
+    try:
+        assert validate_cdr_file(path, config=config) == {"call_logic": ["Строка 2: Звонок самому себе"]}
+        assert validate_cdr_file(path, config=config, disabled_rules=["self_call"]) == {}
+        with pytest.raises(ValueError):
+            register_rule("self_call_copy", "call_logic", codes={"self_call": "Звонок самому себе"})
+    finally:
+        unregister_rule("self_call")
+    assert "self_call" not in ERROR_CODES and "self_call" not in config.error_codes()
+    assert config.error_codes()["record_count"] == "Количество записей в файле не равно 2 (value - количество строк)"
+
+@allure.story("Профилирование")
+@allure.title("Профиль проверки содержит время и вызовы каждого правила и прохода")
+@allure.severity(allure.severity_level.NORMAL)
+def test_validation_stats(test_files_dir, capsys):
+    """Test per-rule and per-pass statistics and their JSON/Prometheus output"""
+    file_path = os.path.join(test_files_dir, "CDR_positive.txt")
+    stats = ValidationStats()
+    assert validate_cdr_file(file_path, stats=stats) == validate_cdr_file(file_path) == {}
+    validate_cdr_file(os.path.join(test_files_dir, "CDR_negative_without_comma.txt"), stats=stats, verbose=True)
+    capsys.readouterr()
+
+    profile = stats.to_dict()
+    assert profile["pass"]["validation"]["calls"] == 2
+    assert profile["rule"]["timestamps"]["calls"] == profile["stage"]["parse"]["calls"]
+    assert profile["rule"]["record_count"]["calls"] == 2
+    assert profile["stage"]["print"]["calls"] >= 1
+    assert all(entry["seconds"] >= 0 for entries in profile.values() for entry in entries.values())
+    assert json.loads(stats.to_json()) == profile
+
+    metrics = stats.to_prometheus()
+    assert "# TYPE cdr_validation_calls_total counter" in metrics
+    assert 'cdr_validation_calls_total{kind="pass",name="validation"} 2' in metrics
+
+@allure.story("Бенчмарки")
+@allure.title("Ухудшение относительно базовой линии считается регрессией")
+@allure.severity(allure.severity_level.NORMAL)
+def test_benchmark_baseline_regressions(tmp_path):
+    """Test percentiles, saving a baseline and detecting throughput, latency and memory regressions"""
+    assert percentile([0.004, 0.001, 0.003, 0.002], 50) == 0.002
+    assert percentile([0.004, 0.001, 0.003, 0.002], 95) == 0.004
+
+    baseline_path = str(tmp_path / "baseline.json")
+    base = summarize("validate_file", 1000, 1000, [0.010, 0.012, 0.011])
+    base["peak_memory_mb"] = 10.0
+    save_baseline(baseline_path, [base])
+    baseline = load_baseline(baseline_path)
+    assert compare_with_baseline([base], baseline) == []
+
+    slower = summarize("validate_file", 1000, 1000, [0.020, 0.024, 0.022])
+    slower["peak_memory_mb"] = 10.0
+    regressions = compare_with_baseline([slower], baseline)
+    assert len(regressions) == 2 and all(r.startswith("validate_file/1000") for r in regressions)
+
+    heavier = dict(base, peak_memory_mb=100.0)
+    assert len(compare_with_baseline([heavier], baseline)) == 1
+    # Сценарий без базовой линии не сравнивается
+    assert compare_with_baseline([dict(slower, size=10)], baseline) == []
+
+@allure.story("Генераторы")
+@allure.title("Пакетный генератор пишет те же записи, что и позитивный генератор")
+@allure.severity(allure.severity_level.NORMAL)
+def test_vectorized_generator_output(tmp_path):
+    """Test the vectorized generator: chunked output, record format and distribution bounds"""
+    pytest.importorskip("numpy")
+    base_time = datetime(2025, 6, 1, 12, 0, 0)
+    path = generate_cdr_file_vectorized(str(tmp_path / "vectorized.txt"), base_time, 2000, seed=7)
+    chunked = generate_cdr_file_vectorized(str(tmp_path / "chunked.txt"), base_time, 2000, seed=7, chunk_records=333)
+    with open(path) as f, open(chunked) as g:
+        text = f.read()
+        assert text == g.read()
+
+    lines = text.split('\n')
+    records = [CdrRecord.from_line(line) for line in lines]
+    assert len(records) == 2000 and not text.endswith('\n')
+    assert [record.to_line() for record in records] == lines
+    assert [record.start for record in records] == sorted(record.start for record in records)
+
+    midnight = parse_timestamp("2025-06-02T00:00:00")
+    split, calls = [], []
+    for record in records:
+        crosses = midnight - 60 <= record.start and record.end <= midnight + 60
+        (split if crosses else calls).append(record)
+    assert split and calls
+    assert all(1 <= record.end - record.start <= 300 for record in calls)
+    assert all(str(record.subscriber).startswith("7900") for record in calls)
+    assert all(record.call_type in ("01", "02") for record in records)
+
+@allure.story("Генераторы")
+@allure.title("Потоковый генератор пишет записи по возрастанию времени без общей сортировки")
+@allure.severity(allure.severity_level.NORMAL)
+def test_streaming_generator_output(tmp_path):
+    """Test the streaming generator: ordered output, reproducibility and split call pairs"""
+    pytest.importorskip("numpy")
+    base_time = datetime(2025, 6, 1, 12, 0, 0)
+    path = generate_cdr_file_streaming(str(tmp_path / "stream.txt"), base_time, 3000, seed=3, chunk_records=97)
+    same = generate_cdr_file_streaming(str(tmp_path / "same.txt"), base_time, 3000, seed=3, chunk_records=97)
+    with open(path) as f, open(same) as g:
+        text = f.read()
+        assert text == g.read()
+
+    lines = text.split('\n')
+    records = [CdrRecord.from_line(line) for line in lines]
+    assert len(records) == 3000 and not text.endswith('\n')
+    assert [record.to_line() for record in records] == lines
+    assert [record.start for record in records] == sorted(record.start for record in records)
+
+    midnight = parse_timestamp("2025-06-02T00:00:00")
+    first_parts = [record for record in records if midnight - 60 <= record.start < midnight]
+    second_parts = [record for record in records if record.start == midnight]
+    assert first_parts and len(first_parts) == len(second_parts)
+    for first, second in zip(first_parts, second_parts):
+        assert (first.call_type, first.subscriber, first.contact) == \
+            (second.call_type, second.subscriber, second.contact)
+        assert first.end < midnight and 5 <= second.end - midnight <= 60
+
+    calls = records[:len(records) - 2 * len(first_parts)]
+    assert all(1 <= record.end - record.start <= 300 for record in calls)
+    assert all(str(record.subscriber).startswith("7900") for record in calls)
+
+@allure.story("Генераторы")
+@allure.title("Параллельная генерация файлов не зависит от количества процессов")
+@allure.severity(allure.severity_level.NORMAL)
+def test_parallel_multiple_files_generation(tmp_path):
+    """Test that derived per-file seeds make parallel generation reproducible for any worker count"""
+    start_time = datetime(2025, 6, 1, 23, 0, 0)
+    serial = generate_multiple_cdr_files(str(tmp_path / "serial"), 6, start_time, seed=11)
+    parallel = generate_multiple_cdr_files(str(tmp_path / "parallel"), 6, start_time, seed=11, workers=2, chunksize=1)
+
+    assert [os.path.basename(path) for path in serial] == [os.path.basename(path) for path in parallel]
+    assert os.path.basename(serial[-1]) == "cdr_2025-06-02_00-15-00.txt"
+    for serial_path, parallel_path in zip(serial, parallel):
+        with open(serial_path) as f, open(parallel_path) as g:
+            assert f.read() == g.read()
+
+    other = generate_multiple_cdr_files(str(tmp_path / "other"), 6, start_time, seed=12)
+    with open(serial[0]) as f, open(other[0]) as g:
+        assert f.read() != g.read()
+
+    # Без seed общий seed берется из модуля random
+    random.seed(3)
+    first = generate_multiple_cdr_files(str(tmp_path / "first"), 2, start_time)
+    random.seed(3)
+    second = generate_multiple_cdr_files(str(tmp_path / "second"), 2, start_time)
+    with open(first[1]) as f, open(second[1]) as g:
+        assert f.read() == g.read()
+
+@allure.story("Генераторы")
+@allure.title("Корпус с seed пересоздается по манифесту без хранения файлов")
+@allure.severity(allure.severity_level.NORMAL)
+def test_seeded_corpus_manifest(tmp_path):
+    """Test seeded generators with an injected clock and rebuilding a corpus from its manifest"""
+    now = datetime(2025, 6, 1, 9, 0, 0)
+    first = generate_cdr_file(str(tmp_path / "a.txt"), num_records=50, seed=5, clock=lambda: now)
+    second = generate_cdr_file(str(tmp_path / "b.txt"), num_records=50, seed=5, clock=lambda: now)
+    error_first = generate_error_cdr_file(str(tmp_path / "c.txt"), {"timestamps": 2}, seed=5, clock=lambda: now)
+    error_second = generate_error_cdr_file(str(tmp_path / "d.txt"), {"timestamps": 2}, seed=5, clock=lambda: now)
+    with open(first) as a, open(second) as b, open(error_first) as c, open(error_second) as d:
+        text = a.read()
+        assert text == b.read() and c.read() == d.read()
+    assert "2025-06-01T09:" in text
+
+    # Без seed используется генератор модуля random
+    random.seed(5)
+    first = generate_cdr_file(str(tmp_path / "e.txt"), num_records=50, clock=lambda: now)
+    random.seed(5)
+    second = generate_cdr_file(str(tmp_path / "f.txt"), num_records=50, clock=lambda: now)
+    with open(first) as a, open(second) as b:
+        assert a.read() == b.read()
+
+    corpus = str(tmp_path / "corpus")
+    manifest = generate_corpus(corpus, 12, seed=42, start_time=datetime(2025, 6, 1), negative_share=0.25)
+    assert len(manifest.files) == 12
+    assert load_manifest(os.path.join(corpus, "manifest.json")) == manifest
+    assert verify_corpus(corpus) == []
+
+    # Файлы, уже лежавшие в директории, в манифест не попадают
+    os.makedirs(tmp_path / "rebuilt")
+    (tmp_path / "rebuilt" / "stale.txt").write_text("stale")
+    rebuilt = rebuild_corpus(manifest, str(tmp_path / "rebuilt"), workers=2)
+    assert rebuilt.checksum == manifest.checksum
+    assert verify_corpus(str(tmp_path / "rebuilt")) == ["stale.txt"]
+
+    changed = sorted(manifest.files)[0]
+    with open(os.path.join(corpus, changed), 'a') as f:
+        f.write("\n")
+    assert verify_corpus(corpus) == [changed]
+
+@allure.story("Генераторы")
+@allure.title("Ошибки вносятся за один проход по заранее составленному плану")
+@allure.severity(allure.severity_level.NORMAL)
+def test_planned_error_injection(tmp_path):
+    """Test the error planner: distinct targets, sorted output and detection of every injected category"""
+    base_time = datetime(2025, 6, 1, 12, 0, 0)
+    config = {"timestamps": 20, "security": 10, "call_logic": 15, "time_sequence": 25, "midnight_crossing": 3}
+    plan = plan_errors(config, 5000, base_time, random.Random(1))
+    assert sum(count for _, count in plan.counts) == 5000
+    assert sum(len(changes) for changes in plan.changes.values()) == 48
+    assert len(plan.swaps) == 25 and not plan.swaps & set(plan.changes)
+
+    path = generate_error_cdr_file(str(tmp_path / "errors.txt"), config, base_time, 5000, seed=1)
+    with open(path) as f:
+        lines = f.read().split('\n')
+    assert len(lines) == 5000 + 15
+
+    errors = validate_cdr_file(path, verbose=False, disabled_rules=["phone_numbers", "operator_code", "record_count"])
+    assert len(errors["time_sequence"]) == 25
+    assert len(errors["midnight_crossing"]) == 3
+    assert len(errors["call_logic"]) == 15
+    assert {"timestamps", "security"} <= {category for category, messages in errors.items() if messages}
+    # Номера абонентов случайные, а не идут подряд
+    subscribers = [line.split(',')[1] for line in lines if line.count(',') == 4]
+    assert all(subscriber.startswith("7900") for subscriber in subscribers if subscriber.isdigit())
+    assert len({int(subscriber[-7:]) % 1000 for subscriber in subscribers if subscriber.isdigit()}) > 900
+
+    # Прежние вспомогательные функции сохранены
+    start_time, end_time = generate_timestamp(base_time, random.Random(2))
+    assert 1 <= (end_time - start_time).total_seconds() <= 300
+    record = generate_valid_record(base_time, random.Random(2))
+    assert str(record.subscriber).startswith("7900") and 1 <= record.end - record.start <= 300
+
+    # Усечение файла выполняется до выбора записей, и остальные ошибки не теряются
+    truncated = plan_errors({"file_structure": 1, "timestamps": 2}, 10, base_time, random.Random(3))
+    assert truncated.file_changes[0].kind == "truncate"
+    assert sum(count for _, count in truncated.counts) == truncated.file_changes[0].value
+    assert sum(len(changes) for changes in truncated.changes.values()) == 2
+
+@allure.story("Генераторы")
+@allure.title("Размеченный корпус: точность и полнота валидатора по категориям")
+@allure.severity(allure.severity_level.NORMAL)
+def test_labeled_corpus_scoring(tmp_path):
+    """Test ground-truth labels of the negative generator and the parallel precision/recall scorer"""
+    base_time = datetime(2025, 6, 1, 12, 0, 0)
+    path = generate_error_cdr_file(str(tmp_path / "cdr_call.txt"), {"call_logic": 1, "time_sequence": 1},
+                                   base_time, seed=4, labels=True)
+    labels = read_labels(labels_path(path))
+    assert labels_path(path).endswith("cdr_call.labels.jsonl")
+    assert {label.category for label in labels} == {"call_logic", "time_sequence", "file_structure"}
+    found = {(error.line, error.rule) for error in collect_cdr_errors(path)}
+    assert {(label.line, label.category) for label in labels} <= found
+
+    for index, category in enumerate(ERROR_RULES * 3):
+        generate_error_cdr_file(str(tmp_path / f"cdr_{index:03d}.txt"), {category: 1}, base_time,
+                                seed=index, labels=True)
+
+    score = score_directory(str(tmp_path), workers=2, sql_patterns=SQL_EXTENDED_PATTERNS)
+    assert score.files == len(ERROR_RULES) * 3 + 1
+    for category, counts in score.categories.items():
+        assert counts.false_positives == 0, category
+        assert counts.recall == 1.0, category
+    assert score.records_per_second > 0
+
+    # По базовому списку шаблонов часть SQL-инъекций не обнаруживается
+    basic = score_directory(str(tmp_path), workers=1, sql_patterns=SQL_KEYWORDS)
+    assert basic.categories["security"].recall <= score.categories["security"].recall
@@ -0,0 +1,133 @@
+from datetime import date, datetime, timedelta
+from fractions import Fraction
+from typing import Dict, Optional, Union
+
+SECONDS_PER_DAY = 86400
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MAX_CACHED_HOURS = 100_000
+
+# Проверенные префиксы 'YYYY-MM-DDTHH' меток фиксированного формата -> секунды эпохи
+# начала часа. Записи файла идут по времени, поэтому соседние метки почти всегда
+# попадают в уже проверенный час.
+_HOUR_SECONDS: Dict[str, int] = {}
+# Все допустимые окончания ':MM:SS' -> секунды от начала часа
+_SECONDS_IN_HOUR: Dict[str, int] = {
+    f":{minute:02d}:{second:02d}": minute * 60 + second
+    for minute in range(60)
+    for second in range(60)
+}
+
+Timestamp = Union[int, Fraction]
+
+
+def parse_timestamp(value: str) -> Timestamp:
+    """
+    Преобразует метку времени CDR в секунды от начала эпохи.
+
+    Метка формата YYYY-MM-DDTHH:MM:SS складывается из секунд начала часа
+    (проверенный префикс берется из кэша) и секунд внутри часа. Остальные
+    варианты ISO 8601 разбираются datetime.fromisoformat: метка с долями секунды
+    возвращается как точная дробь, метка с часовым поясом приводится к UTC.
+
+    Args:
+        value (str): Метка времени
+
+    Returns:
+        Timestamp: Секунды от начала эпохи
+
+    Raises:
+        ValueError: Метка не является корректной датой и временем ISO 8601
+    """
+    seconds = parse_fixed_timestamp(value)
+    if seconds is not None:
+        return seconds
+    return _parse_isoformat(value)
+
+
+def parse_fixed_timestamp(value: str) -> Optional[int]:
+    """
+    Разбирает метку ровно в формате YYYY-MM-DDTHH:MM:SS.
+
+    Args:
+        value (str): Метка времени
+
+    Returns:
+        Optional[int]: Секунды от начала эпохи или None, если метка в другом формате
+            или не является корректной датой и временем
+    """
+    try:
+        return _HOUR_SECONDS[value[:13]] + _SECONDS_IN_HOUR[value[13:]]
+    except KeyError:
+        pass
+
+    hour = _parse_hour(value[:13])
+    seconds = _SECONDS_IN_HOUR.get(value[13:])
+    if hour is not None and seconds is not None:
+        return hour + seconds
+    return None
+
+
+def to_timestamp(value: datetime) -> Timestamp:
+    """Переводит datetime без часового пояса в секунды от начала эпохи (с долями секунды, если они есть)."""
+    seconds = ((value.toordinal() - EPOCH_ORDINAL) * SECONDS_PER_DAY
+               + value.hour * 3600 + value.minute * 60 + value.second)
+    if value.microsecond:
+        return seconds + Fraction(value.microsecond, 1_000_000)
+    return seconds
+
+
+def format_timestamp(timestamp: Timestamp) -> str:
+    """Форматирует секунды от начала эпохи как datetime.isoformat(): YYYY-MM-DDTHH:MM:SS[.ffffff]."""
+    seconds = int(timestamp // 1)
+    microseconds = int((timestamp - seconds) * 1_000_000)
+    return (EPOCH + timedelta(seconds=seconds, microseconds=microseconds)).isoformat()
+
+
+def day_number(timestamp: Timestamp) -> int:
+    """Возвращает номер дня от начала эпохи, в который попадает метка."""
+    return int(timestamp // SECONDS_PER_DAY)
+
+
+def format_day(day: int) -> str:
+    """Форматирует номер дня от начала эпохи как YYYY-MM-DD."""
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+
+def normalize_timestamp(value: str) -> str:
+    """Возвращает метку в виде datetime.isoformat(), как она выводится в сообщениях об ошибках."""
+    return datetime.fromisoformat(value).isoformat()
+
+
+def _parse_hour(value: str) -> Optional[int]:
+    # Проверка префикса 'YYYY-MM-DDTHH' по фиксированным позициям
+    if len(value) != 13 or value[4] != '-' or value[7] != '-' or value[10] != 'T':
+        return None
+    digits = value[:4] + value[5:7] + value[8:10] + value[11:]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    hour = int(value[11:])
+    if hour > 23:
+        return None
+    try:
+        day = date(int(value[:4]), int(value[5:7]), int(value[8:10]))
+    except ValueError:
+        return None
+
+    if len(_HOUR_SECONDS) >= MAX_CACHED_HOURS:
+        _HOUR_SECONDS.clear()
+    seconds = (day.toordinal() - EPOCH_ORDINAL) * SECONDS_PER_DAY + hour * 3600
+    _HOUR_SECONDS[value] = seconds
+    return seconds
+
+
+def _parse_isoformat(value: str) -> Timestamp:
+    parsed = datetime.fromisoformat(value)
+    seconds = ((parsed.toordinal() - EPOCH_ORDINAL) * SECONDS_PER_DAY
+               + parsed.hour * 3600 + parsed.minute * 60 + parsed.second)
+    offset = parsed.utcoffset()
+    if offset:
+        seconds -= offset // timedelta(seconds=1)
+    if parsed.microsecond:
+        return seconds + Fraction(parsed.microsecond, 1_000_000)
+    return seconds
@@ -0,0 +1,345 @@
+import argparse
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, TextIO, Tuple
+
+from tests.cdr.helpers import validate_cdr_file_safe
+
+CDR_SUFFIX = '.txt'
+DEFAULT_POLL_INTERVAL = 0.2
+
+# Константы inotify из <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT = struct.Struct('iIII')
+_INOTIFY_READ_SIZE = 64 * 1024
+
+# Результат проверки передается в приемник вместе с путем к файлу
+ResultSink = Callable[[str, Dict[str, list]], None]
+FileSignature = Tuple[int, int]
+
+
+class JsonLinesSink:
+    """
+    Приемник результатов: по одной строке JSON на проверенный файл.
+
+    Строка записывается на диск сразу, чтобы результат был виден
+    читателю файла без задержки.
+    """
+
+    def __init__(self, output: TextIO):
+        self.output = output
+
+    def __call__(self, file_path: str, errors: Dict[str, list]) -> None:
+        record = {
+            "file": file_path,
+            "valid": not errors,
+            "errors": errors,
+            "checked_at": time.time(),
+        }
+        self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.output.flush()
+
+
+class _Inotify:
+    """Наблюдение за директорией через inotify (Linux), вызовы libc через ctypes."""
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        # На платформах без inotify функций в libc нет: AttributeError означает,
+        # что нужно перейти на опрос директории
+        init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self.fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM
+        if add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch: {directory}")
+
+    def read(self) -> Tuple[List[str], List[str], bool]:
+        """
+        Читает накопившиеся события.
+
+        Returns:
+            Tuple[List[str], List[str], bool]: Имена записанных или перемещенных в директорию файлов,
+                имена удаленных или перемещенных из нее файлов и признак переполнения очереди событий ядра
+        """
+        names = []
+        removed = []
+        overflow = False
+        while True:
+            try:
+                buffer = os.read(self.fd, _INOTIFY_READ_SIZE)
+            except BlockingIOError:
+                return names, removed, overflow
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = _INOTIFY_EVENT.unpack_from(buffer, offset)
+                offset += _INOTIFY_EVENT.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif not name or mask & IN_IGNORED:
+                    continue
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    removed.append(os.fsdecode(name))
+                else:
+                    names.append(os.fsdecode(name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class CdrDirectoryWatcher:
+    """
+    Сервис потоковой проверки CDR файлов, поступающих в директорию.
+
+    Файл ставится в очередь, как только запись в него завершена: по событию
+    inotify о закрытии файла после записи или о перемещении в директорию,
+    а при опросе - когда размер и время изменения не меняются между двумя
+    опросами. Очередь ограничена: пока проверка не успевает за поступлением
+    файлов, новые события не читаются и копятся в ядре (при переполнении
+    директория просматривается заново), поэтому поток файлов не увеличивает
+    расход памяти. Ошибка пула проверки или приемника результатов останавливает
+    наблюдение и передается из run().
+    """
+
+    def __init__(self,
+                 directory: str,
+                 sink: ResultSink,
+                 workers: int = 1,
+                 max_pending: Optional[int] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 use_inotify: bool = True,
+                 process_existing: bool = True,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            directory (str): Наблюдаемая директория
+            sink (ResultSink): Приемник результатов проверки
+            workers (int): Количество одновременно проверяемых файлов
+            max_pending (int, optional): Размер очереди файлов, ожидающих проверки
+                (по умолчанию - 4 файла на процесс)
+            poll_interval (float): Интервал опроса директории в секундах, если inotify недоступен
+            use_inotify (bool): Использовать inotify, если он доступен
+            process_existing (bool): Проверить файлы, которые уже лежат в директории
+            executor (Executor, optional): Пул для проверки (по умолчанию - пул из workers процессов)
+        """
+        if workers < 1:
+            raise ValueError("Количество процессов должно быть положительным")
+
+        self.directory = directory
+        self.sink = sink
+        self.workers = workers
+        self.max_pending = max_pending or workers * 4
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.process_existing = process_existing
+        self.executor = executor
+        self.mode: Optional[str] = None
+        self.processed_count = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._stopping: Optional[asyncio.Event] = None
+        # Состояние (размер, mtime) файлов на момент постановки в очередь
+        self._seen: Dict[str, FileSignature] = {}
+        # Состояние файлов при последнем просмотре директории
+        self._listing: Dict[str, FileSignature] = {}
+        # Файлы в очереди или на проверке и те из них, что изменились за это время
+        self._pending: Set[str] = set()
+        self._dirty: Set[str] = set()
+
+    async def run(self) -> None:
+        """Наблюдает за директорией до вызова stop()."""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._stopping = asyncio.Event()
+
+        own_executor = self.executor is None
+        executor = ProcessPoolExecutor(max_workers=self.workers) if own_executor else self.executor
+        inotify = self._open_inotify()
+        self.mode = "inotify" if inotify is not None else "polling"
+
+        tasks = [asyncio.create_task(self._validate_files(executor)) for _ in range(self.workers)]
+        try:
+            watch = asyncio.create_task(self._watch(inotify))
+            stop = asyncio.create_task(self._stopping.wait())
+            await asyncio.wait([watch, stop, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            watch.cancel()
+            stop.cancel()
+            # Ошибка наблюдения (например, удаленная директория) или проверки
+            # (сломанный пул процессов, ошибка приемника) не теряется
+            for task in [watch, *tasks]:
+                if task.done() and not task.cancelled():
+                    task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if inotify is not None:
+                inotify.close()
+            if own_executor:
+                executor.shutdown(cancel_futures=True)
+
+    def stop(self) -> None:
+        """Останавливает наблюдение; файлы в очереди не проверяются."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def _open_inotify(self) -> Optional[_Inotify]:
+        if not self.use_inotify or not sys.platform.startswith('linux'):
+            return None
+        try:
+            return _Inotify(self.directory)
+        except (AttributeError, OSError):
+            return None
+
+    async def _watch(self, inotify: Optional[_Inotify]) -> None:
+        # Уже лежащие файлы ставятся в очередь в той же задаче, что и новые:
+        # если проверка остановилась с ошибкой, ожидание места в очереди отменяется
+        if self.process_existing:
+            await self._rescan(require_stable=False)
+        else:
+            self._listing = self._scan()
+            self._seen.update(self._listing)
+        if inotify is not None:
+            await self._watch_inotify(inotify)
+        else:
+            await self._watch_polling()
+
+    async def _watch_inotify(self, inotify: _Inotify) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            readable = loop.create_future()
+            loop.add_reader(inotify.fd, lambda: readable.done() or readable.set_result(None))
+            try:
+                await readable
+            finally:
+                loop.remove_reader(inotify.fd)
+
+            names, removed, overflow = inotify.read()
+            for name in removed:
+                # Удаленные файлы больше не отслеживаются
+                self._forget(os.path.join(self.directory, name))
+            for name in names:
+                if name.endswith(CDR_SUFFIX):
+                    await self._enqueue(os.path.join(self.directory, name))
+            if overflow:
+                # Часть событий потеряна: сверяем директорию с уже проверенными файлами
+                await self._rescan(require_stable=False)
+
+    async def _watch_polling(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await self._rescan(require_stable=True)
+
+    def _scan(self) -> Dict[str, FileSignature]:
+        listing = {}
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CDR_SUFFIX) and entry.is_file():
+                stat = entry.stat()
+                listing[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return listing
+
+    async def _rescan(self, require_stable: bool) -> None:
+        # Файл, размер и mtime которого совпали с прошлым опросом, считается записанным полностью
+        listing = self._scan()
+        previous, self._listing = self._listing, listing
+        for path, signature in listing.items():
+            if not require_stable or previous.get(path) == signature:
+                await self._enqueue(path, signature)
+
+        # Удаленные файлы больше не отслеживаются
+        for path in self._seen.keys() - listing.keys():
+            self._forget(path)
+
+    def _forget(self, path: str) -> None:
+        self._seen.pop(path, None)
+        self._listing.pop(path, None)
+
+    async def _enqueue(self, path: str, signature: Optional[FileSignature] = None) -> None:
+        if path in self._pending:
+            self._dirty.add(path)
+            return
+        if signature is None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return
+            signature = (stat.st_size, stat.st_mtime_ns)
+        if self._seen.get(path) == signature:
+            # Содержимое уже проверено
+            return
+
+        self._seen[path] = signature
+        self._pending.add(path)
+        # Ожидание свободного места в очереди останавливает чтение новых событий
+        await self._queue.put(path)
+
+    async def _validate_files(self, executor: Executor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            path = await self._queue.get()
+            try:
+                result = await loop.run_in_executor(executor, validate_cdr_file_safe, path)
+                self.sink(path, result.errors)
+                self.processed_count += 1
+            finally:
+                self._pending.discard(path)
+                self._queue.task_done()
+
+            if path in self._dirty:
+                # Файл перезаписан во время проверки: проверяем новое содержимое
+                self._dirty.discard(path)
+                await self._enqueue(path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Потоковая проверка CDR файлов, поступающих в директорию")
+    parser.add_argument("directory", help="Наблюдаемая директория")
+    parser.add_argument("--output", help="Файл JSON Lines для результатов (по умолчанию - stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-pending", type=int, help="Размер очереди файлов, ожидающих проверки")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    parser.add_argument("--polling", action="store_true", help="Опрашивать директорию вместо inotify")
+    parser.add_argument("--skip-existing", action="store_true", help="Не проверять файлы, уже лежащие в директории")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    watcher = CdrDirectoryWatcher(
+        args.directory,
+        JsonLinesSink(output),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        poll_interval=args.poll_interval,
+        use_inotify=not args.polling,
+        process_existing=not args.skip_existing,
+    )
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import pytest
 from datetime import datetime, timedelta
 import requests
 
+from tests.cdr.record import CdrRecord
 from tests.e2e.constants import BASE_URL, TEST_SUBSCRIBER_NAME, TEST_SUBSCRIBER_PASSWORD, TEST_SUBSCRIBER_PHONE, TEST_TARIFF_ID
 
 @pytest.fixture
@@ -72,7 +73,7 @@ def make_call(subscriber_id, call_type, contact_number, duration_minutes, auth_t
     cdr_filename = f"files/CDR_{TEST_SUBSCRIBER_PHONE}_{timestamp}.txt"
     
     # Создаем содержимое файла в нужном формате
-    cdr_content = f"{call_type},{TEST_SUBSCRIBER_PHONE},{contact_number},{start_time.isoformat()},{end_time.isoformat()}"
+    cdr_content = CdrRecord.from_datetimes(call_type, TEST_SUBSCRIBER_PHONE, contact_number, start_time, end_time).to_line()
     
     # Записываем файл
     with open(cdr_filename, 'w') as f:
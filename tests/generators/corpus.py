@@ -0,0 +1,202 @@
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from tests.cdr.report import ERROR_RULES
+from tests.generators.negative_cdr_generator import LABELS_SUFFIX, generate_error_cdr_file, labels_path
+from tests.generators.positive_cdr_generator import derive_seed, generate_multiple_cdr_files, make_rng
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class CorpusManifest(NamedTuple):
+    """
+    Описание корпуса CDR файлов, по которому его можно пересоздать.
+
+    seed и parameters - аргументы generate_corpus, files - контрольные
+    суммы SHA-256 файлов по именам, checksum - общая контрольная сумма корпуса.
+    """
+    seed: int
+    parameters: Dict[str, Any]
+    files: Dict[str, str]
+    checksum: str
+
+
+def generate_corpus(output_dir: str,
+                    num_files: int,
+                    seed: int,
+                    start_time: datetime,
+                    negative_share: float = 0.0,
+                    workers: Optional[int] = 1,
+                    labels: bool = False) -> CorpusManifest:
+    """
+    Генерирует воспроизводимый корпус CDR файлов и сохраняет его манифест.
+
+    Корректные файлы создаются generate_multiple_cdr_files, файлы с ошибками
+    (доля negative_share) - generate_error_cdr_file с одной случайной
+    категорией ошибок. Каждый файл генерируется с seed, производным от
+    общего, поэтому корпус определяется только параметрами манифеста.
+    С labels=True рядом с файлами с ошибками сохраняются списки внесенных
+    ошибок (*.labels.jsonl) для оценки валидатора (tests.cdr.scoring).
+    В манифест попадают только файлы, созданные этим вызовом: файлы, уже
+    лежавшие в директории, на контрольную сумму корпуса не влияют.
+
+    Args:
+        output_dir (str): Директория корпуса
+        num_files (int): Общее количество файлов
+        seed (int): Общий seed
+        start_time (datetime): Время начала первого файла
+        negative_share (float): Доля файлов с ошибками
+        workers (int, optional): Количество процессов для корректных файлов
+        labels (bool): Сохранить списки внесенных ошибок
+
+    Returns:
+        CorpusManifest: Манифест корпуса (сохранен в output_dir/manifest.json)
+    """
+    num_negative = int(num_files * negative_share)
+    num_positive = num_files - num_negative
+
+    generated = generate_multiple_cdr_files(output_dir, num_positive, start_time, seed=seed, workers=workers)
+    for index in range(num_negative):
+        rng = make_rng(derive_seed(seed, num_positive + index))
+        path = os.path.join(output_dir, f"cdr_negative_{index:07d}.txt")
+        generate_error_cdr_file(path, {rng.choice(ERROR_RULES): 1}, base_time=start_time, rng=rng, labels=labels)
+        generated.append(path)
+        if labels:
+            generated.append(labels_path(path))
+
+    parameters = {
+        "num_files": num_files,
+        "start_time": start_time.isoformat(),
+        "negative_share": negative_share,
+        "labels": labels,
+    }
+    files = _file_checksums(output_dir, (os.path.basename(path) for path in generated))
+    manifest = CorpusManifest(seed, parameters, files, _corpus_checksum(files))
+    save_manifest(manifest, os.path.join(output_dir, MANIFEST_NAME))
+    return manifest
+
+
+def rebuild_corpus(manifest: CorpusManifest, output_dir: str, workers: Optional[int] = 1) -> CorpusManifest:
+    """
+    Пересоздает корпус по манифесту и проверяет, что он совпал с исходным.
+
+    Args:
+        manifest (CorpusManifest): Манифест исходного корпуса
+        output_dir (str): Директория для нового корпуса
+        workers (int, optional): Количество процессов
+
+    Returns:
+        CorpusManifest: Манифест нового корпуса
+    """
+    parameters = manifest.parameters
+    rebuilt = generate_corpus(
+        output_dir,
+        parameters["num_files"],
+        manifest.seed,
+        datetime.fromisoformat(parameters["start_time"]),
+        parameters["negative_share"],
+        workers,
+        parameters.get("labels", False),
+    )
+    if rebuilt.checksum != manifest.checksum:
+        differing = _differing_files(manifest.files, rebuilt.files)
+        raise ValueError(f"Корпус не совпал с манифестом: {', '.join(differing[:10])}")
+    return rebuilt
+
+
+def verify_corpus(output_dir: str, manifest: Optional[CorpusManifest] = None) -> List[str]:
+    """
+    Сверяет файлы корпуса с манифестом.
+
+    Args:
+        output_dir (str): Директория корпуса
+        manifest (CorpusManifest, optional): Манифест (по умолчанию - output_dir/manifest.json)
+
+    Returns:
+        List[str]: Имена отсутствующих, лишних и измененных файлов
+    """
+    if manifest is None:
+        manifest = load_manifest(os.path.join(output_dir, MANIFEST_NAME))
+    return _differing_files(manifest.files, _file_checksums(output_dir))
+
+
+def save_manifest(manifest: CorpusManifest, path: str) -> None:
+    """Сохраняет манифест в JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, **manifest._asdict()}, f, ensure_ascii=False, indent=2)
+
+
+def load_manifest(path: str) -> CorpusManifest:
+    """Загружает манифест из JSON."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Неподдерживаемая версия манифеста: {data.get('version')}")
+    return CorpusManifest(data["seed"], data["parameters"], data["files"], data["checksum"])
+
+
+def _file_checksums(directory: str, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    # Без names - все файлы корпуса в директории (для поиска лишних файлов)
+    if names is None:
+        names = (name for name in os.listdir(directory) if name.endswith(('.txt', LABELS_SUFFIX)))
+    checksums = {}
+    for name in sorted(names):
+        with open(os.path.join(directory, name), 'rb') as f:
+            checksums[name] = hashlib.sha256(f.read()).hexdigest()
+    return checksums
+
+
+def _corpus_checksum(files: Dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(f"{name} {files[name]}\n".encode())
+    return digest.hexdigest()
+
+
+def _differing_files(expected: Dict[str, str], actual: Dict[str, str]) -> List[str]:
+    return sorted(name for name in set(expected) | set(actual) if expected.get(name) != actual.get(name))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Воспроизводимые корпуса CDR файлов")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Сгенерировать корпус и манифест")
+    build.add_argument("directory")
+    build.add_argument("--files", type=int, default=1000)
+    build.add_argument("--seed", type=int, default=0)
+    build.add_argument("--start", type=datetime.fromisoformat, default=datetime(2025, 6, 1))
+    build.add_argument("--negative-share", type=float, default=0.0)
+    build.add_argument("--workers", type=int, default=1)
+    build.add_argument("--labels", action="store_true", help="Сохранить списки внесенных ошибок")
+
+    rebuild = subparsers.add_parser("rebuild", help="Пересоздать корпус по манифесту")
+    rebuild.add_argument("manifest")
+    rebuild.add_argument("directory")
+    rebuild.add_argument("--workers", type=int, default=1)
+
+    verify = subparsers.add_parser("verify", help="Сверить корпус с манифестом")
+    verify.add_argument("directory")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        manifest = generate_corpus(args.directory, args.files, args.seed, args.start,
+                                   args.negative_share, args.workers, args.labels)
+        print(f"Корпус {args.directory}: {len(manifest.files)} файлов, checksum {manifest.checksum}")
+    elif args.command == "rebuild":
+        manifest = rebuild_corpus(load_manifest(args.manifest), args.directory, args.workers)
+        print(f"Корпус {args.directory} пересоздан, checksum {manifest.checksum}")
+    else:
+        differing = verify_corpus(args.directory)
+        if differing:
+            raise SystemExit(f"Файлы не совпадают с манифестом: {', '.join(differing)}")
+        print("Корпус совпадает с манифестом")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,207 +1,426 @@
+import heapq
+import json
 import os
+from bisect import bisect_right
+from collections import Counter
 from datetime import datetime, timedelta
+from fractions import Fraction
+from itertools import accumulate, islice
 import random
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
 
-from tests.cdr_generators.positive_cdr_generator import generate_phone_number
+from tests.cdr.record import CdrRecord
+from tests.cdr.report import ERROR_RULES, FIELD_NAMES
+from tests.cdr.timestamps import SECONDS_PER_DAY, Timestamp, format_timestamp, to_timestamp
+from tests.generators.positive_cdr_generator import Clock, generate_phone_number, make_rng
 
-def generate_error_cdr_file(output_path: str, 
+# Поля строки: тип вызова, номер абонента, номер собеседника, начало и окончание
+# (строка с неправильным количеством полей - список короче пяти)
+Fields = List[str]
+
+CALL_TYPES = ['01', '02']
+MAX_START_OFFSET = 3600
+MIN_DURATION = 1
+MAX_DURATION = 300
+MIDNIGHT_CALL_START = 300   # за сколько секунд до конца дня начинается звонок через полночь
+MIDNIGHT_CALL_END = 60      # через сколько секунд после полуночи он заканчивается
+INVALID_START_TIME = "2025-13-01T25:61:61"  # явно неверная дата
+SQL_INJECTIONS = ["'; DROP TABLE calls; --", "' OR '1'='1", "1; SELECT * FROM users"]
+WRITE_CHUNK_LINES = 65536
+LABELS_SUFFIX = ".labels.jsonl"
+# Количество вариантов последних цифр номера (после 7 и кода оператора)
+SUBSCRIBER_DIGITS = 10 ** 7
+
+# Ошибки, которые изменяют поля одной записи
+FIELD_ERRORS = ("record_format", "phone_numbers", "timestamps", "security", "operator_code")
+
+
+class Mutation(NamedTuple):
+    """
+    Запланированное изменение: категория ошибки (ключ словаря ошибок
+    валидатора), вид изменения, номер поля и новое значение или параметр.
+    """
+    category: str
+    kind: str
+    field: Optional[int] = None
+    value: Union[int, str, None] = None
+
+
+class ErrorPlan(NamedTuple):
+    """
+    План внесения ошибок в файл.
+
+    counts - пары (секунда смещения от base_time, количество записей) по
+    возрастанию смещения: записи выводятся по времени без сортировки,
+    changes - изменения записей по их номерам, swaps - номера записей,
+    которые выводятся перед предыдущей строкой, file_changes - изменения
+    количества записей.
+    """
+    counts: List[Tuple[int, int]]
+    changes: Dict[int, List[Mutation]]
+    swaps: FrozenSet[int]
+    file_changes: List[Mutation]
+
+
+class ErrorLabel(NamedTuple):
+    """
+    Внесенная ошибка: номер строки (0 - ошибка файла целиком), категория
+    (ключ словаря ошибок валидатора), вид изменения, поле записи из
+    FIELD_NAMES и новое значение или параметр изменения.
+    """
+    line: int
+    category: str
+    mutation: str
+    field: Optional[str] = None
+    value: Union[int, str, None] = None
+
+
+def generate_error_cdr_file(output_path: str,
                           error_config: Dict[str, int],
                           base_time: Optional[datetime] = None,
-                          num_records: int = 10) -> str:
+                          num_records: int = 10,
+                          seed: Optional[int] = None,
+                          rng: Optional[random.Random] = None,
+                          clock: Clock = datetime.now,
+                          labels: bool = False) -> str:
     """
     Генерирует CDR-файл с заданными ошибками.
-    
+
+    Все изменения планируются заранее (plan_errors), а записи создаются по
+    возрастанию времени начала и изменяются по плану в момент вывода, поэтому
+    время генерации линейно по количеству записей и ошибок.
+    С одинаковыми seed, base_time и конфигурацией ошибок файл получается одинаковым.
+    Исходные записи не содержат ошибок, поэтому с labels=True рядом с файлом
+    сохраняется полный список внесенных ошибок (см. labels_path).
+
     Args:
         output_path (str): Путь для сохранения файла
         error_config (Dict[str, int]): Конфигурация ошибок (тип: количество)
-        base_time (datetime, optional): Базовое время для генерации записей
+        base_time (datetime, optional): Базовое время для генерации записей (по умолчанию - clock())
         num_records (int): Количество записей в файле
-        
+        seed (int, optional): Начальное значение генератора случайных чисел
+        rng (random.Random, optional): Генератор случайных чисел (вместо seed)
+        clock (Clock): Источник текущего времени
+        labels (bool): Сохранить внесенные ошибки в файл labels_path(output_path)
+
     Returns:
         str: Путь к созданному файлу
     """
+    rng = make_rng(seed, rng)
     if base_time is None:
-        base_time = datetime.now()
-    
-    # Генерируем сначала валидные записи
-    records = []
-    for _ in range(num_records):
-        call_type = random.choice(['01', '02'])
-        subscriber = f"79{random.randint(0, 9)}{''.join(random.choices('0123456789', k=7))}"
-        contact = f"79{random.randint(0, 9)}{''.join(random.choices('0123456789', k=7))}"
-        start_time, end_time = generate_timestamp(base_time)
-        records.append((call_type, subscriber, contact, start_time.isoformat(), end_time.isoformat()))
-    
-    # Вносим ошибки согласно конфигу
-    for error_type, count in error_config.items():
-        for _ in range(count):
-            if error_type == "file_structure":
-                # Слишком много или мало записей
-                if random.choice([True, False]):
-                    records = records[:random.randint(1, 5)]  # слишком мало
-                else:
-                    records.extend([generate_valid_record(base_time) for _ in range(random.randint(11, 15))])  # слишком много
-            
-            elif error_type == "record_format":
-                # Неправильное количество полей или тип вызова
-                idx = random.randint(0, len(records)-1)
-                if random.choice([True, False]):
-                    # Неправильный тип вызова
-                    records[idx] = (random.choice(['03', 'AB', '']), *records[idx][1:])
-                else:
-                    # Неправильное количество полей
-                    records[idx] = records[idx][:random.choice([2, 3, 4])]
-            
-            elif error_type == "phone_numbers":
-                # Неправильные номера телефонов
-                idx = random.randint(0, len(records)-1)
-                field = random.choice(['subscriber', 'contact'])
-                if field == 'subscriber':
-                    # Первый номер с ошибкой
-                    records[idx] = (
-                        records[idx][0],
-                        generate_invalid_phone(),
-                        records[idx][2],
-                        *records[idx][3:]
-                    )
-                else:
-                    # Второй номер с ошибкой
-                    records[idx] = (
-                        records[idx][0],
-                        records[idx][1],
-                        generate_invalid_phone(),
-                        *records[idx][3:]
-                    )
-            
-            elif error_type == "timestamps":
-                # Неправильные временные метки
-                idx = random.randint(0, len(records)-1)
-                if random.choice([True, False]):
-                    # Время окончания раньше времени начала
-                    start = datetime.fromisoformat(records[idx][3])
-                    end = start - timedelta(seconds=random.randint(1, 60))
-                    records[idx] = (
-                        *records[idx][:3],
-                        start.isoformat(),
-                        end.isoformat()
-                    )
-                else:
-                    # Некорректный формат времени
-                    records[idx] = (
-                        *records[idx][:3],
-                        "2025-13-01T25:61:61",  # явно неверная дата
-                        records[idx][4]
-                    )
-            
-            elif error_type == "call_logic":
-                # Конфликтующие звонки
-                idx = random.randint(0, len(records)-1)
-                sub = records[idx][1]
-                start = datetime.fromisoformat(records[idx][3])
-                end = datetime.fromisoformat(records[idx][4])
-                
-                # Создаем конфликтующий звонок
-                conflict_record = (
-                    random.choice(['01', '02']),
-                    sub,
-                    generate_phone_number(),
-                    (start + timedelta(seconds=1)).isoformat(),
-                    (end - timedelta(seconds=1)).isoformat()
-                )
-                records.insert(random.randint(0, len(records)), conflict_record)
-            
-            elif error_type == "security":
-                # Возможные SQL-инъекции
-                idx = random.randint(0, len(records)-1)
-                field = random.choice([0, 1, 2, 3, 4])
-                sql_injection = random.choice([
-                    "'; DROP TABLE calls; --",
-                    "' OR '1'='1",
-                    "1; SELECT * FROM users"
-                ])
-                records[idx] = tuple(
-                    sql_injection if i == field else val 
-                    for i, val in enumerate(records[idx])
-                )
-            
-            elif error_type == "time_sequence":
-                # Нарушение хронологического порядка
-                if len(records) > 1:
-                    idx = random.randint(1, len(records)-1)
-                    records[idx], records[idx-1] = records[idx-1], records[idx]
-            
-            elif error_type == "midnight_crossing":
-                # Звонок через полночь без разделения
-                idx = random.randint(0, len(records)-1)
-                start = datetime.combine(base_time.date(), datetime.max.time()) - timedelta(minutes=5)
-                end = datetime.combine(base_time.date() + timedelta(days=1), datetime.min.time()) + timedelta(minutes=1)
-                records[idx] = (
-                    records[idx][0],
-                    records[idx][1],
-                    records[idx][2],
-                    start.isoformat(),
-                    end.isoformat()
-                )
-            
-            elif error_type == "operator_code":
-                # Неправильный код оператора
-                idx = random.randint(0, len(records)-1)
-                field = random.choice([1, 2])  # 1 - subscriber, 2 - contact
-                if field == 1:
-                    # Для subscriber всегда должен быть 900, но мы делаем ошибку
-                    records[idx] = (
-                        records[idx][0],
-                        f"7{random.choice(['921', '999', '123'])}{''.join(random.choices('0123456789', k=7))}",
-                        records[idx][2],
-                        *records[idx][3:]
-                    )
-                else:
-                    # Для contact делаем невалидный код оператора
-                    records[idx] = (
-                        records[idx][0],
-                        records[idx][1],
-                        f"7{random.choice(['000', '999', 'ABC'])}{''.join(random.choices('0123456789', k=7))}",
-                        *records[idx][3:]
-                    )
-    
-    # Сортируем записи по времени (если не было ошибки time_sequence)
-    if "time_sequence" not in error_config or error_config["time_sequence"] == 0:
-        records.sort(key=lambda x: x[3])
-    
+        base_time = clock()
+
+    plan = plan_errors(error_config, num_records, base_time, rng)
+    error_labels = [_label(0, mutation) for mutation in plan.file_changes]
+
+    num_lines = 0
+
+    def lines() -> Iterator[str]:
+        nonlocal num_lines
+        for num_lines, (fields, mutations) in enumerate(iter_error_records(plan, base_time, rng), 1):
+            if labels:
+                error_labels.extend(_label(num_lines, mutation) for mutation in mutations)
+            yield ','.join(fields)
+
     # Сохраняем файл
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
     with open(output_path, 'w') as f:
-        f.write('\n'.join([','.join(map(str, record)) for record in records]))
-    
+        write_lines(f, lines())
+    if labels:
+        if num_lines != num_records and not plan.file_changes:
+            # Конфликтующие звонки добавляют строки: количество записей тоже нарушено
+            error_labels.insert(0, ErrorLabel(0, "file_structure", "record_count", value=num_lines))
+        write_labels(error_labels, labels_path(output_path))
+
     return output_path
 
+def plan_errors(error_config: Dict[str, int],
+                num_records: int,
+                base_time: datetime,
+                rng: random.Random) -> ErrorPlan:
+    """
+    Выбирает заранее количество записей, их время начала, записи для каждой
+    ошибки и параметры изменений.
+
+    Ошибки структуры файла меняют количество записей до выбора остальных
+    записей, поэтому остальные ошибки не теряются при усечении файла; разные
+    ошибки по возможности попадают в разные записи. Нарушений порядка
+    вносится не больше, чем различных секунд начала записей.
+
+    Args:
+        error_config (Dict[str, int]): Конфигурация ошибок (тип: количество)
+        num_records (int): Количество записей в файле до внесения ошибок
+        base_time (datetime): Базовое время
+        rng (random.Random): Генератор случайных чисел
+
+    Returns:
+        ErrorPlan: План
+    """
+    unknown = set(error_config) - set(ERROR_RULES)
+    if unknown:
+        raise ValueError(f"Неизвестные категории ошибок: {', '.join(sorted(unknown))}")
+
+    # Слишком много или мало записей
+    file_changes = []
+    for _ in range(error_config.get("file_structure", 0)):
+        if rng.choice([True, False]):
+            num_records = min(num_records, rng.randint(1, 5))
+            file_changes.append(Mutation("file_structure", "truncate", value=num_records))
+        else:
+            extra = rng.randint(11, 15)
+            num_records += extra
+            file_changes.append(Mutation("file_structure", "extend", value=extra))
+
+    # Время начала записей: подсчет записей на каждую секунду смещения
+    # (различных секунд не больше MAX_START_OFFSET + 1, их сортировка не зависит от размера файла)
+    seconds = Counter(rng.randint(0, MAX_START_OFFSET) for _ in range(num_records))
+    counts = sorted(seconds.items())
+    offsets = [offset for offset, _ in counts]
+    cumulative = list(accumulate(count for _, count in counts))
+
+    def records_until(offset: Timestamp) -> int:
+        # Количество записей, начинающихся не позже offset
+        found = bisect_right(offsets, offset)
+        return cumulative[found - 1] if found else 0
+
+    changes: Dict[int, List[Mutation]] = {}
+    if not num_records:
+        return ErrorPlan(counts, changes, frozenset(), file_changes)
+
+    # Звонки через полночь заменяют время записей, ближайших к концу дня, и порядок не нарушается
+    midnight = error_config.get("midnight_crossing", 0)
+    midnight_targets = set()
+    if midnight:
+        start = _midnight_call_start(to_timestamp(base_time)) - to_timestamp(base_time)
+        first = max(0, records_until(start) - midnight)
+        midnight_targets = set(range(first, min(first + midnight, num_records)))
+        for index in midnight_targets:
+            changes[index] = [Mutation("midnight_crossing", "midnight")]
+
+    kinds = [category for category in FIELD_ERRORS + ("call_logic",) for _ in range(error_config.get(category, 0))]
+    # Записи выбираются среди остальных: номера после звонков через полночь (они идут подряд) сдвигаются
+    skipped = len(midnight_targets) if len(midnight_targets) < num_records else 0
+    first_skipped = min(midnight_targets) if skipped else num_records
+    candidates = range(num_records - skipped)
+    if len(kinds) <= len(candidates):
+        targets = rng.sample(candidates, len(kinds))
+    else:
+        targets = [rng.choice(candidates) for _ in kinds]
+    targets = [index + skipped if index >= first_skipped else index for index in targets]
+
+    for category, index in zip(kinds, targets):
+        if category == "call_logic":
+            # Конфликтующий звонок начинается через секунду после выбранного: его место в порядке времени
+            offset = offsets[bisect_right(cumulative, index)]
+            mutation = Mutation(category, "conflict", value=records_until(offset + 1))
+        else:
+            mutation = _plan_field_error(category, rng)
+        changes.setdefault(index, []).append(mutation)
+
+    # Нарушение хронологического порядка: запись меняется местами с предыдущей строкой.
+    # Переставляются первые записи своей секунды - предыдущая строка начинается раньше,
+    # поэтому перестановка действительно нарушает порядок
+    swaps = error_config.get("time_sequence", 0)
+    boundaries = [index for index in cumulative[:-1] if index not in changes] or range(1, num_records)
+    positions = rng.sample(boundaries, min(swaps, len(boundaries)))
+
+    return ErrorPlan(counts, changes, frozenset(positions), file_changes)
+
+def iter_error_records(plan: ErrorPlan, base_time: datetime,
+                       rng: random.Random) -> Iterator[Tuple[Fields, List[Mutation]]]:
+    """
+    Создает записи по возрастанию времени начала и вносит в них ошибки по плану.
+
+    Args:
+        plan (ErrorPlan): План ошибок
+        base_time (datetime): Базовое время
+        rng (random.Random): Генератор случайных чисел
+
+    Yields:
+        Tuple[Fields, List[Mutation]]: Поля очередной строки файла и внесенные в нее ошибки
+    """
+    return _swap_adjacent(_iter_planned_records(plan, base_time, rng), plan.swaps)
+
+def write_lines(f: TextIO, lines: Iterable[str], chunk_lines: int = WRITE_CHUNK_LINES) -> None:
+    """Записывает строки через перевод строки порциями (без перевода строки в конце файла)."""
+    lines = iter(lines)
+    separator = ''
+    while True:
+        chunk = list(islice(lines, chunk_lines))
+        if not chunk:
+            return
+        f.write(separator + '\n'.join(chunk))
+        separator = '\n'
+
+def labels_path(output_path: str) -> str:
+    """Возвращает путь к файлу внесенных ошибок: cdr.txt -> cdr.labels.jsonl."""
+    root, _ = os.path.splitext(output_path)
+    return root + LABELS_SUFFIX
+
+def write_labels(error_labels: Iterable[ErrorLabel], path: str) -> None:
+    """Сохраняет внесенные ошибки в формате JSON Lines."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for label in error_labels:
+            f.write(json.dumps(label._asdict(), ensure_ascii=False) + '\n')
+
+def read_labels(path: str) -> List[ErrorLabel]:
+    """Загружает внесенные ошибки из файла JSON Lines."""
+    with open(path, encoding='utf-8') as f:
+        return [ErrorLabel(**json.loads(line)) for line in f if line.strip()]
+
 # Вспомогательные функции
-def generate_valid_record(base_time: datetime) -> Tuple[str, str, str, str, str]:
+def generate_valid_record(base_time: datetime, rng: Optional[random.Random] = None) -> CdrRecord:
     """Генерирует одну валидную запись CDR."""
-    call_type = random.choice(['01', '02'])
-    subscriber = f"7900{''.join(random.choices('0123456789', k=7))}"
-    contact = f"79{random.choice(['00', '21', '99'])}{''.join(random.choices('0123456789', k=7))}"
-    start_time, end_time = generate_timestamp(base_time)
-    return (call_type, subscriber, contact, start_time.isoformat(), end_time.isoformat())
+    rng = make_rng(rng=rng)
+    call_type = rng.choice(CALL_TYPES)
+    subscriber = f"7900{rng.randrange(SUBSCRIBER_DIGITS):07d}"
+    contact = f"79{rng.choice(['00', '21', '99'])}{rng.randrange(SUBSCRIBER_DIGITS):07d}"
+    start_time, end_time = generate_timestamp(base_time, rng)
+    return CdrRecord.from_datetimes(call_type, subscriber, contact, start_time, end_time)
+
+def generate_timestamp(base_time: datetime, rng: Optional[random.Random] = None) -> Tuple[datetime, datetime]:
+    """Генерирует валидные временные метки."""
+    rng = make_rng(rng=rng)
+    start_time = base_time + timedelta(seconds=rng.randint(0, MAX_START_OFFSET))
+    end_time = start_time + timedelta(seconds=rng.randint(MIN_DURATION, MAX_DURATION))
+    return start_time, end_time
 
-def generate_invalid_phone() -> str:
+def generate_invalid_phone(rng: Optional[random.Random] = None) -> str:
     """Генерирует невалидный номер телефона."""
+    rng = make_rng(rng=rng)
     errors = [
-        ''.join(random.choices('0123456789', k=random.randint(8, 12))),  # неправильная длина
-        '7' + ''.join(random.choices('0123456789ABCDEF', k=10)),  # содержит буквы
+        ''.join(rng.choices('0123456789', k=rng.choice([8, 9, 10, 12]))),  # неправильная длина
+        '7' + ''.join(rng.choices('0123456789ABCDEF', k=10)),  # содержит буквы
         '',  # пустой номер
         '123'  # слишком короткий
     ]
-    return random.choice(errors)
+    return rng.choice(errors)
 
-def generate_timestamp(base_time: datetime) -> Tuple[datetime, datetime]:
-    """Генерирует валидные временные метки."""
-    start_offset = random.randint(0, 3600)
-    start_time = base_time + timedelta(seconds=start_offset)
-    duration = random.randint(1, 300)
-    end_time = start_time + timedelta(seconds=duration)
-    return start_time, end_time
+def _label(line: int, mutation: Mutation) -> ErrorLabel:
+    field = None if mutation.field is None else FIELD_NAMES[mutation.field]
+    return ErrorLabel(line, mutation.category, mutation.kind, field, mutation.value)
+
+def _plan_field_error(category: str, rng: random.Random) -> Mutation:
+    if category == "record_format":
+        # Неправильный тип вызова или неправильное количество полей
+        if rng.choice([True, False]):
+            return Mutation(category, "call_type", 0, rng.choice(['03', 'AB', '']))
+        return Mutation(category, "field_count", value=rng.choice([2, 3, 4]))
+
+    if category == "phone_numbers":
+        # Неправильный номер абонента или собеседника
+        return Mutation(category, "invalid_number", rng.choice([1, 2]), generate_invalid_phone(rng))
+
+    if category == "timestamps":
+        # Время окончания раньше времени начала или некорректный формат времени
+        if rng.choice([True, False]):
+            return Mutation(category, "end_before_start", 4, rng.randint(1, 60))
+        return Mutation(category, "start_format", 3, INVALID_START_TIME)
+
+    if category == "security":
+        # Возможная SQL-инъекция в любом поле
+        return Mutation(category, "sql_injection", rng.choice([0, 1, 2, 3, 4]), rng.choice(SQL_INJECTIONS))
+
+    # Неправильный код оператора абонента (должен быть 900); код собеседника валидатор не проверяет
+    code = rng.choice(['921', '999', '123'])
+    return Mutation(category, "operator_code", 1, f"7{code}{''.join(rng.choices('0123456789', k=7))}")
+
+def _iter_planned_records(plan: ErrorPlan, base_time: datetime,
+                          rng: random.Random) -> Iterator[Tuple[Optional[int], Fields, List[Mutation]]]:
+    base = to_timestamp(base_time)
+    texts: Dict[Timestamp, str] = {}
+    midnight_end = _next_midnight(base) + MIDNIGHT_CALL_END - base
+    # Номера абонентов случайны, но не совпадают с номерами звонков, которые еще
+    # идут: иначе появились бы пересечения звонков, не внесенные по плану
+    active: Dict[int, Timestamp] = {}
+    ends: List[Tuple[Timestamp, int]] = []
+
+    def text(offset: Timestamp) -> str:
+        # Метки времени повторяются, поэтому каждая форматируется один раз
+        value = texts.get(offset)
+        if value is None:
+            value = texts[offset] = format_timestamp(base + offset)
+        return value
+
+    # Вставляемые строки по номеру записи, перед которой они выводятся
+    pending: Dict[int, List[tuple]] = {}
+    index = 0
+    for offset, count in plan.counts:
+        for _ in range(count):
+            if index in pending:
+                for _, inserted, mutation in sorted(pending.pop(index), key=lambda item: item[0]):
+                    yield None, inserted, [mutation]
+            changes = plan.changes.get(index, ())
+            # В звонок с конфликтом должен помещаться звонок не короче секунды
+            min_duration = MIN_DURATION + 2 if any(m.kind == "conflict" for m in changes) else MIN_DURATION
+            end = offset + rng.randint(min_duration, MAX_DURATION)
+            while ends and ends[0][0] <= offset:
+                _, number = heapq.heappop(ends)
+                del active[number]
+            subscriber = rng.randrange(SUBSCRIBER_DIGITS)
+            while subscriber in active:
+                subscriber = rng.randrange(SUBSCRIBER_DIGITS)
+            busy_until = midnight_end if any(m.kind == "midnight" for m in changes) else end
+            active[subscriber] = busy_until
+            heapq.heappush(ends, (busy_until, subscriber))
+            contact = f"79{rng.choice(['00', '21', '99'])}{rng.randrange(SUBSCRIBER_DIGITS):07d}"
+            fields = [rng.choice(CALL_TYPES), f"7900{subscriber:07d}", contact, text(offset), text(end)]
+            applied = []
+            for mutation in changes:
+                if mutation.kind == "conflict":
+                    # Конфликтующий звонок того же абонента внутри выбранного
+                    conflict = [rng.choice(CALL_TYPES), fields[1], generate_phone_number(rng=rng),
+                                text(offset + 1), text(end - 1)]
+                    pending.setdefault(mutation.value, []).append((offset + 1, conflict, mutation))
+                elif _apply_mutation(fields, mutation, offset, base, text):
+                    applied.append(mutation)
+            yield index, fields, applied
+            index += 1
+
+    for position in sorted(pending):
+        for _, inserted, mutation in sorted(pending[position], key=lambda item: item[0]):
+            yield None, inserted, [mutation]
+
+def _apply_mutation(fields: Fields, mutation: Mutation, offset: int, base: Timestamp,
+                    text: Callable[[Timestamp], str]) -> bool:
+    if len(fields) != 5:
+        # В строке с неправильным количеством полей остальные ошибки не вносятся
+        return False
+    kind = mutation.kind
+    if kind == "field_count":
+        del fields[mutation.value:]
+    elif kind == "end_before_start":
+        fields[4] = text(offset - mutation.value)
+    elif kind == "midnight":
+        fields[3] = format_timestamp(_midnight_call_start(base))
+        fields[4] = format_timestamp(_next_midnight(base) + MIDNIGHT_CALL_END)
+    else:
+        fields[mutation.field] = mutation.value
+    return True
+
+def _swap_adjacent(records: Iterator[Tuple[Optional[int], Fields, List[Mutation]]],
+                   swaps: FrozenSet[int]) -> Iterator[Tuple[Fields, List[Mutation]]]:
+    # Запись с номером из swaps выводится перед предыдущей строкой (та задерживается на одну строку);
+    # ошибку порядка валидатор находит в задержанной строке
+    previous = None
+    for index, fields, mutations in records:
+        if previous is None:
+            previous = fields, mutations
+        elif index in swaps:
+            previous[1].append(Mutation("time_sequence", "swap"))
+            yield fields, mutations
+        else:
+            yield previous
+            previous = fields, mutations
+    if previous is not None:
+        yield previous
+
+def _next_midnight(base: Timestamp) -> int:
+    return int(base // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY
+
+def _midnight_call_start(base: Timestamp) -> Timestamp:
+    # Время начала звонка через полночь: за 5 минут до конца дня base (23:54:59.999999)
+    return _next_midnight(base) - Fraction(1, 1_000_000) - MIDNIGHT_CALL_START
 
 # Пример использования
 if __name__ == "__main__":
@@ -211,12 +430,12 @@ if __name__ == "__main__":
         "timestamps": 1,     # 1 ошибка во временных метках
         "operator_code": 1   # 1 ошибка в коде оператора
     }
-    
+
     # Генерация файла с ошибками
     output_path = generate_error_cdr_file(
         "error_cdr.txt",
         error_config=error_config,
         num_records=10
     )
-    
-    print(f"Сгенерирован файл с ошибками: {output_path}")
\ No newline at end of file
+
+    print(f"Сгенерирован файл с ошибками: {output_path}")
@@ -1,117 +1,160 @@
-from ast import Tuple
+import hashlib
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import random
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
 
-def generate_phone_number(operator_code: str = None) -> str:
+from tests.cdr.record import CdrRecord
+
+# Список возможных кодов операторов (можно расширить)
+OPERATOR_CODES = ['900', '921', '999', '901', '902']
+
+# Шаг по времени между соседними файлами generate_multiple_cdr_files
+FILE_INTERVAL = timedelta(minutes=15)
+
+# Источник текущего времени: по умолчанию системные часы, в тестах - фиксированное время
+Clock = Callable[[], datetime]
+
+def make_rng(seed: Optional[int] = None, rng: Optional[random.Random] = None) -> random.Random:
+    """
+    Возвращает генератор случайных чисел: переданный rng, новый с заданным
+    seed или (если не задано ни то, ни другое) общий генератор модуля random,
+    поэтому random.seed() перед вызовом воспроизводит результат.
+    """
+    if rng is not None:
+        if seed is not None:
+            raise ValueError("Нужно указать либо seed, либо rng")
+        return rng
+    if seed is None:
+        # Экземпляр, на котором работают функции модуля random
+        return random._inst
+    return random.Random(seed)
+
+def generate_phone_number(operator_code: str = None, rng: Optional[random.Random] = None) -> str:
     """Генерирует случайный номер телефона с возможностью указания кода оператора."""
-    # Список возможных кодов операторов (можно расширить)
-    operator_codes = ['900', '921', '999', '901', '902']
-    
+    rng = make_rng(rng=rng)
     # Если код оператора не указан, выбираем случайный
     if operator_code is None:
-        operator_code = random.choice(operator_codes)
+        operator_code = rng.choice(OPERATOR_CODES)
     
     # Формат: 7 (код страны) + код оператора (3 цифры) + остальные цифры (7 цифр)
-    remaining_digits = ''.join([str(random.randint(0, 9)) for _ in range(7)])
+    remaining_digits = ''.join([str(rng.randint(0, 9)) for _ in range(7)])
     return f"7{operator_code}{remaining_digits}"
 
 def generate_timestamp(base_time: Optional[datetime] = None, 
                       min_duration: int = 1, 
-                      max_duration: int = 300) -> Tuple[datetime, datetime]:
+                      max_duration: int = 300,
+                      rng: Optional[random.Random] = None,
+                      clock: Clock = datetime.now) -> Tuple[datetime, datetime]:
     """Генерирует временные метки начала и окончания звонка."""
+    rng = make_rng(rng=rng)
     if base_time is None:
-        base_time = datetime.now()
+        base_time = clock()
     
     # Генерируем случайное смещение от базового времени (до 1 часа)
-    start_offset = random.randint(0, 3600)
+    start_offset = rng.randint(0, 3600)
     start_time = base_time + timedelta(seconds=start_offset)
     
     # Генерируем длительность звонка
-    duration = random.randint(min_duration, max_duration)
+    duration = rng.randint(min_duration, max_duration)
     end_time = start_time + timedelta(seconds=duration)
     
     return start_time, end_time
 
-def generate_split_call(base_time: datetime) -> List[Tuple[str, str, str, str, str]]:
+def generate_split_call(base_time: datetime, rng: Optional[random.Random] = None) -> List[CdrRecord]:
     """Генерирует звонок, который пересекает полночь, разделяя его на две записи."""
+    rng = make_rng(rng=rng)
     # Создаем звонок, который начинается до полуночи и заканчивается после
-    call_type = random.choice(['01', '02'])
-    subscriber = generate_phone_number()
-    contact = generate_phone_number()
+    call_type = rng.choice(['01', '02'])
+    subscriber = generate_phone_number(rng=rng)
+    contact = generate_phone_number(rng=rng)
     
     # Устанавливаем время начала незадолго до полуночи
-    start_time = datetime.combine(base_time.date(), datetime.max.time()) - timedelta(seconds=random.randint(5, 30))
+    start_time = datetime.combine(base_time.date(), datetime.max.time()) - timedelta(seconds=rng.randint(5, 30))
     
     # Устанавливаем время окончания после полуночи
-    end_time = datetime.combine(base_time.date() + timedelta(days=1), datetime.min.time()) + timedelta(seconds=random.randint(5, 60))
+    end_time = datetime.combine(base_time.date() + timedelta(days=1), datetime.min.time()) + timedelta(seconds=rng.randint(5, 60))
     
     # Разделяем звонок на две части
     first_part_end = datetime.combine(base_time.date(), datetime.max.time())
     second_part_start = datetime.combine(base_time.date() + timedelta(days=1), datetime.min.time())
     
     return [
-        (call_type, subscriber, contact, start_time.isoformat(), first_part_end.isoformat()),
-        (call_type, subscriber, contact, second_part_start.isoformat(), end_time.isoformat())
+        CdrRecord.from_datetimes(call_type, subscriber, contact, start_time, first_part_end),
+        CdrRecord.from_datetimes(call_type, subscriber, contact, second_part_start, end_time)
     ]
 
 def generate_cdr_record(base_time: Optional[datetime] = None, 
-                       allow_split_calls: bool = True) -> Tuple[str, str, str, str, str]:
+                       allow_split_calls: bool = True,
+                       rng: Optional[random.Random] = None,
+                       clock: Clock = datetime.now) -> CdrRecord:
     """Генерирует одну запись CDR."""
-    call_type = random.choice(['01', '02'])
+    rng = make_rng(rng=rng)
+    call_type = rng.choice(['01', '02'])
     
     # Первый номер всегда с кодом оператора '900'
-    subscriber = generate_phone_number(operator_code='900')
+    subscriber = generate_phone_number(operator_code='900', rng=rng)
     
     # Второй номер может быть с любым кодом оператора (включая '900')
     # 30% вероятность, что будет не '900'
-    if random.random() < 0.3:
-        contact = generate_phone_number()  # случайный код оператора
+    if rng.random() < 0.3:
+        contact = generate_phone_number(rng=rng)  # случайный код оператора
     else:
-        contact = generate_phone_number(operator_code='900')
+        contact = generate_phone_number(operator_code='900', rng=rng)
     
     # 10% chance to generate a call that crosses midnight
-    if allow_split_calls and random.random() < 0.1 and base_time is not None:
+    if allow_split_calls and rng.random() < 0.1 and base_time is not None:
         # Generate a call that crosses midnight
         start_time, end_time = generate_timestamp(
             base_time=datetime.combine(base_time.date(), datetime.max.time()) - timedelta(minutes=5),
             min_duration=60,
-            max_duration=300
+            max_duration=300,
+            rng=rng
         )
     else:
-        start_time, end_time = generate_timestamp(base_time)
+        start_time, end_time = generate_timestamp(base_time, rng=rng, clock=clock)
     
-    return (call_type, subscriber, contact, start_time.isoformat(), end_time.isoformat())
+    return CdrRecord.from_datetimes(call_type, subscriber, contact, start_time, end_time)
 
 def generate_cdr_file(output_path: str, 
                      base_time: Optional[datetime] = None, 
-                     num_records: int = 10) -> str:
+                     num_records: int = 10,
+                     seed: Optional[int] = None,
+                     rng: Optional[random.Random] = None,
+                     clock: Clock = datetime.now) -> str:
     """
     Генерирует один CDR-файл с заданным количеством записей.
+
+    С одинаковыми seed и base_time файл получается одинаковым.
     
     Args:
         output_path (str): Путь для сохранения файла
-        base_time (datetime, optional): Базовое время для генерации записей
+        base_time (datetime, optional): Базовое время для генерации записей (по умолчанию - clock())
         num_records (int): Количество записей в файле (по умолчанию 10)
+        seed (int, optional): Начальное значение генератора случайных чисел (по умолчанию -
+            генератор модуля random, поэтому random.seed() перед вызовом воспроизводит файл)
+        rng (random.Random, optional): Генератор случайных чисел (вместо seed)
+        clock (Clock): Источник текущего времени
         
     Returns:
         str: Путь к созданному файлу
     """
+    rng = make_rng(seed, rng)
     if base_time is None:
-        base_time = datetime.now()
+        base_time = clock()
     
     records = []
     records_remaining = num_records
     
     while records_remaining > 0:
         # 10% chance to generate a split call (which produces 2 records)
-        if records_remaining >= 2 and random.random() < 0.1:
-            split_records = generate_split_call(base_time)
+        if records_remaining >= 2 and rng.random() < 0.1:
+            split_records = generate_split_call(base_time, rng=rng)
             records.extend(split_records)
             records_remaining -= 2
         else:
-            record = generate_cdr_record(base_time, allow_split_calls=False)
+            record = generate_cdr_record(base_time, allow_split_calls=False, rng=rng)
             records.append(record)
             records_remaining -= 1
     
@@ -119,12 +162,12 @@ def generate_cdr_file(output_path: str,
     records = records[:num_records]
     
     # Сортируем записи по времени начала
-    records.sort(key=lambda x: x[3])
+    records.sort(key=lambda record: record.start)
     
     # Формируем содержимое файла
     file_content = []
     for record in records:
-        file_content.append(','.join(record))
+        file_content.append(record.to_line())
     
     # Создаем директорию, если ее нет
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -135,37 +178,68 @@ def generate_cdr_file(output_path: str,
     
     return output_path
 
+def derive_seed(seed: int, index: int) -> int:
+    """
+    Возвращает seed файла с номером index, производный от общего seed.
+
+    Seed зависит только от общего seed и номера файла, поэтому каждый файл
+    воспроизводится независимо от порядка генерации и количества процессов.
+    """
+    digest = hashlib.sha256(f"{seed}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def _generate_seeded_file(output_path: str, base_time: datetime, seed: int) -> str:
+    """Генерирует файл с собственным seed (задача пула процессов)."""
+    return generate_cdr_file(output_path, base_time=base_time, seed=seed)
+
+
 def generate_multiple_cdr_files(output_dir: str, 
                               num_files: int, 
-                              start_time: Optional[datetime] = None) -> List[str]:
+                              start_time: Optional[datetime] = None,
+                              seed: Optional[int] = None,
+                              workers: Optional[int] = 1,
+                              chunksize: int = 16,
+                              clock: Clock = datetime.now) -> List[str]:
     """
     Генерирует несколько CDR-файлов с общей временной логикой.
+
+    Файл с номером i покрывает интервал start_time + i * FILE_INTERVAL и
+    генерируется со своим seed (derive_seed(seed, i)), поэтому результат
+    одинаков при любом количестве процессов.
     
     Args:
         output_dir (str): Директория для сохранения файлов
         num_files (int): Количество файлов для генерации
-        start_time (datetime, optional): Начальное время для первого файла
+        start_time (datetime, optional): Начальное время для первого файла (по умолчанию - clock())
+        seed (int, optional): Общий seed (по умолчанию - из модуля random,
+            поэтому random.seed() перед вызовом воспроизводит файлы)
+        workers (int, optional): Количество процессов; 1 - генерация в текущем процессе,
+            None - по числу ядер
+        chunksize (int): Количество файлов в одной задаче пула процессов
+        clock (Clock): Источник текущего времени
         
     Returns:
         List[str]: Список путей к созданным файлам
     """
     if start_time is None:
-        start_time = datetime.now()
-    
-    generated_files = []
-    current_time = start_time
-    
-    for i in range(num_files):
-        filename = f"cdr_{current_time.strftime('%Y-%m-%d_%H-%M-%S')}.txt"
-        file_path = os.path.join(output_dir, filename)
-        
-        generate_cdr_file(file_path, base_time=current_time)
-        generated_files.append(file_path)
-        
-        # Сдвигаем время для следующего файла (например, на 15 минут)
-        current_time += timedelta(minutes=15)
-    
-    return generated_files
+        start_time = clock()
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    times = [start_time + i * FILE_INTERVAL for i in range(num_files)]
+    paths = [
+        os.path.join(output_dir, f"cdr_{current_time.strftime('%Y-%m-%d_%H-%M-%S')}.txt")
+        for current_time in times
+    ]
+    seeds = [derive_seed(seed, i) for i in range(num_files)]
+
+    if workers == 1 or num_files <= 1:
+        return [_generate_seeded_file(*task) for task in zip(paths, times, seeds)]
+
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_generate_seeded_file, paths, times, seeds, chunksize=chunksize))
 
 # Пример использования
 if __name__ == "__main__":
@@ -0,0 +1,470 @@
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для пакетной генерации
+    np = None
+
+from tests.cdr.timestamps import SECONDS_PER_DAY, to_timestamp
+from tests.generators.positive_cdr_generator import OPERATOR_CODES
+
+# Распределение записей то же, что у generate_cdr_file
+SPLIT_CALL_PROBABILITY = 0.1
+OTHER_OPERATOR_PROBABILITY = 0.3
+MAX_START_OFFSET = 3600
+MIN_DURATION = 1
+MAX_DURATION = 300
+# Звонок через полночь начинается за 5-30 секунд до конца дня и заканчивается через 5-60 секунд после
+SPLIT_START_BEFORE = (5, 30)
+SPLIT_END_AFTER = (5, 60)
+
+MICROSECONDS = 1_000_000
+CHUNK_RECORDS = 1_000_000
+# Потоковая генерация: записей в порции и размер буфера записи в файл
+STREAM_CHUNK_RECORDS = 256 * 1024
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+# Виды записей в расписании потоковой генерации (при равном времени начала - в этом порядке)
+_CALL, _SPLIT_FIRST, _SPLIT_SECOND = range(3)
+_MASK64 = (1 << 64) - 1
+
+# Строка записи в матрице байт: TT,SSSSSSSSSSS,CCCCCCCCCCC,<начало>[.ffffff],<окончание>[.ffffff]\n
+# Незаполненные доли секунды остаются нулевыми байтами и удаляются при выводе
+_TIMESTAMP_WIDTH = 19
+_FRACTION_WIDTH = 7
+_START_COLUMN = 27
+_END_COLUMN = _START_COLUMN + _TIMESTAMP_WIDTH + _FRACTION_WIDTH + 1
+LINE_WIDTH = _END_COLUMN + _TIMESTAMP_WIDTH + _FRACTION_WIDTH + 1
+
+
+class CdrArrays(NamedTuple):
+    """
+    Записи CDR в виде массивов NumPy, упорядоченные по времени начала.
+
+    call_type - 1 или 2 (тип вызова '01' или '02'), subscriber и contact -
+    номера из 11 цифр (int64), start и end - микросекунды от начала эпохи.
+    """
+    call_type: Any
+    subscriber: Any
+    contact: Any
+    start: Any
+    end: Any
+
+
+def generate_cdr_arrays(num_records: int,
+                        base_time: datetime,
+                        rng: Optional[Any] = None) -> CdrArrays:
+    """
+    Генерирует записи CDR массивами с тем же распределением, что generate_cdr_file.
+
+    С вероятностью 10% вместо звонка генерируется звонок через полночь
+    из двух записей (если до num_records осталось не меньше двух записей);
+    номер абонента обычного звонка - с кодом '900', номер собеседника
+    с вероятностью 30% - со случайным кодом из OPERATOR_CODES; обычный звонок
+    начинается в течение часа после base_time и длится 1-300 секунд.
+
+    Args:
+        num_records (int): Количество записей
+        base_time (datetime): Базовое время
+        rng (numpy.random.Generator, optional): Генератор случайных чисел
+
+    Returns:
+        CdrArrays: Записи, упорядоченные по времени начала
+    """
+    _require_numpy()
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # События: обычный звонок (одна запись) или звонок через полночь (две записи)
+    split = rng.random(num_records) < SPLIT_CALL_PROBABILITY
+    filled = np.cumsum(1 + split)
+    num_events = int(np.searchsorted(filled, num_records)) + 1 if num_records else 0
+    split = split[:num_events]
+    if num_events and filled[num_events - 1] > num_records:
+        # На последнюю запись звонок через полночь не помещается
+        split[-1] = False
+    sizes = 1 + split
+
+    codes = np.array([int(code) for code in OPERATOR_CODES], dtype=np.int64)
+    call_type = rng.integers(1, 3, num_events, dtype=np.int8)
+    subscriber_code = np.where(split, codes[rng.integers(0, len(codes), num_events)], 900)
+    other_contact = split | (rng.random(num_events) < OTHER_OPERATOR_PROBABILITY)
+    contact_code = np.where(other_contact, codes[rng.integers(0, len(codes), num_events)], 900)
+    subscriber = _phone_numbers(rng, subscriber_code)
+    contact = _phone_numbers(rng, contact_code)
+
+    # Доли секунды base_time переводятся в микросекунды точно
+    base = int(to_timestamp(base_time) * MICROSECONDS)
+    start = base + rng.integers(0, MAX_START_OFFSET + 1, num_events) * MICROSECONDS
+    end = start + rng.integers(MIN_DURATION, MAX_DURATION + 1, num_events) * MICROSECONDS
+
+    # Звонок через полночь: до 23:59:59.999999 дня base_time и с 00:00:00 следующего дня
+    midnight = int(to_timestamp(base_time) // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY * MICROSECONDS
+    day_end = midnight - 1
+    before = rng.integers(SPLIT_START_BEFORE[0], SPLIT_START_BEFORE[1] + 1, num_events) * MICROSECONDS
+    after = rng.integers(SPLIT_END_AFTER[0], SPLIT_END_AFTER[1] + 1, num_events) * MICROSECONDS
+    start = np.where(split, day_end - before, start)
+    end = np.where(split, day_end, end)
+
+    # Первые записи событий и вторые части звонков через полночь
+    first = np.cumsum(sizes) - sizes
+    second = first[split] + 1
+    records = CdrArrays(*(np.repeat(column, sizes) for column in (call_type, subscriber, contact, start, end)))
+    records.start[second] = midnight
+    records.end[second] = midnight + after[split]
+
+    # Устойчивая сортировка сохраняет порядок записей с одинаковым временем начала
+    order = np.argsort(records.start, kind='stable')
+    return CdrArrays(*(column[order] for column in records))
+
+
+def format_cdr_lines(records: CdrArrays, begin: int = 0, end: Optional[int] = None) -> bytes:
+    """
+    Форматирует записи [begin, end) строками CDR файла, как CdrRecord.to_line().
+
+    Args:
+        records (CdrArrays): Записи
+        begin (int): Первая запись
+        end (int, optional): Запись после последней (по умолчанию - все записи)
+
+    Returns:
+        bytes: Строки с переводом строки после каждой
+    """
+    _require_numpy()
+    records = CdrArrays(*(column[begin:end] for column in records))
+    chars = np.zeros((len(records.start), LINE_WIDTH), dtype=np.uint8)
+
+    chars[:, 0] = ord('0')
+    chars[:, 1] = records.call_type + ord('0')
+    chars[:, [2, 14, 26, _END_COLUMN - 1]] = ord(',')
+    chars[:, -1] = ord('\n')
+    _put_phone_numbers(chars, 3, records.subscriber)
+    _put_phone_numbers(chars, 15, records.contact)
+    _put_timestamps(chars, _START_COLUMN, records.start)
+    _put_timestamps(chars, _END_COLUMN, records.end)
+
+    data = chars.ravel()
+    return data[data != 0].tobytes()
+
+
+def generate_cdr_file_vectorized(output_path: str,
+                                 base_time: Optional[datetime] = None,
+                                 num_records: int = 10,
+                                 seed: Optional[int] = None,
+                                 chunk_records: int = CHUNK_RECORDS) -> str:
+    """
+    Генерирует CDR-файл, как generate_cdr_file, но массивами NumPy:
+    записи создаются целиком, а в текст переводятся порциями по chunk_records.
+
+    Args:
+        output_path (str): Путь для сохранения файла
+        base_time (datetime, optional): Базовое время для генерации записей
+        num_records (int): Количество записей в файле
+        seed (int, optional): Начальное значение генератора случайных чисел
+        chunk_records (int): Количество записей, форматируемых за один раз
+
+    Returns:
+        str: Путь к созданному файлу
+    """
+    _require_numpy()
+    if base_time is None:
+        base_time = datetime.now()
+
+    records = generate_cdr_arrays(num_records, base_time, np.random.default_rng(seed))
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(output_path, 'wb') as f:
+        for begin in range(0, num_records, chunk_records):
+            text = format_cdr_lines(records, begin, begin + chunk_records)
+            if begin + chunk_records >= num_records:
+                # Как и generate_cdr_file, файл не заканчивается переводом строки
+                text = text[:-1]
+            f.write(text)
+
+    return output_path
+
+
+def iter_cdr_chunks(num_records: int,
+                    base_time: datetime,
+                    rng: Optional[Any] = None,
+                    chunk_records: int = STREAM_CHUNK_RECORDS) -> Iterator[CdrArrays]:
+    """
+    Генерирует записи порциями в порядке возрастания времени начала, без общей сортировки.
+
+    Распределение то же, что у generate_cdr_arrays. Сначала определяется
+    количество звонков через полночь, затем количество записей на каждую
+    секунду начала (полиномиальное распределение по секундам часа после
+    base_time и по 5-30 секундам до полуночи). Секунды перебираются по
+    возрастанию, и записи каждой секунды создаются порциями. Вторая часть
+    звонка через полночь повторяет номера и тип вызова первой: они
+    вычисляются хешем номера звонка, а не хранятся, поэтому расход памяти
+    определяется только размером порции.
+
+    Args:
+        num_records (int): Количество записей
+        base_time (datetime): Базовое время
+        rng (numpy.random.Generator, optional): Генератор случайных чисел
+        chunk_records (int): Количество записей в порции
+
+    Yields:
+        CdrArrays: Очередная порция записей
+    """
+    _require_numpy()
+    if rng is None:
+        rng = np.random.default_rng()
+    if chunk_records < 1:
+        raise ValueError("Размер порции должен быть положительным")
+
+    num_split = _count_split_calls(num_records, rng, chunk_records)
+    num_calls = num_records - 2 * num_split
+    # Ключ хеша, по которому вычисляются номера звонков через полночь
+    key = int(rng.integers(0, 1 << 63))
+
+    base = int(to_timestamp(base_time) * MICROSECONDS)
+    midnight = int(to_timestamp(base_time) // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY * MICROSECONDS
+    day_end = midnight - 1
+
+    # Расписание: время начала, вид записей и их количество
+    schedule: List[Tuple[int, int, int]] = []
+    call_seconds = MAX_START_OFFSET + 1
+    call_counts = rng.multinomial(num_calls, np.full(call_seconds, 1 / call_seconds))
+    for offset in np.flatnonzero(call_counts):
+        schedule.append((base + int(offset) * MICROSECONDS, _CALL, int(call_counts[offset])))
+    before_seconds = np.arange(SPLIT_START_BEFORE[0], SPLIT_START_BEFORE[1] + 1)
+    split_counts = rng.multinomial(num_split, np.full(len(before_seconds), 1 / len(before_seconds)))
+    for before, count in zip(before_seconds, split_counts):
+        if count:
+            schedule.append((day_end - int(before) * MICROSECONDS, _SPLIT_FIRST, int(count)))
+    if num_split:
+        schedule.append((midnight, _SPLIT_SECOND, num_split))
+    schedule.sort()
+
+    parts: List[CdrArrays] = []
+    pending = 0
+    split_index = {_SPLIT_FIRST: 0, _SPLIT_SECOND: 0}
+    for start, kind, count in schedule:
+        while count:
+            size = min(count, chunk_records - pending)
+            if kind == _CALL:
+                parts.append(_regular_calls(rng, start, size))
+            else:
+                index = split_index[kind]
+                parts.append(_split_call_parts(key, index, size, kind, start, day_end, midnight))
+                split_index[kind] = index + size
+            pending += size
+            count -= size
+            if pending == chunk_records:
+                yield _concatenate(parts)
+                parts, pending = [], 0
+    if parts:
+        yield _concatenate(parts)
+
+
+def generate_cdr_file_streaming(output_path: str,
+                                base_time: Optional[datetime] = None,
+                                num_records: int = 10,
+                                seed: Optional[int] = None,
+                                chunk_records: int = STREAM_CHUNK_RECORDS,
+                                buffer_size: int = WRITE_BUFFER_SIZE) -> str:
+    """
+    Генерирует CDR-файл любого размера при постоянном расходе памяти:
+    записи создаются порциями уже упорядоченными по времени начала
+    (см. iter_cdr_chunks) и пишутся в файл через буфер фиксированного размера.
+
+    Args:
+        output_path (str): Путь для сохранения файла
+        base_time (datetime, optional): Базовое время для генерации записей
+        num_records (int): Количество записей в файле
+        seed (int, optional): Начальное значение генератора случайных чисел
+        chunk_records (int): Количество записей в порции
+        buffer_size (int): Размер буфера записи в байтах
+
+    Returns:
+        str: Путь к созданному файлу
+    """
+    _require_numpy()
+    if base_time is None:
+        base_time = datetime.now()
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    written = 0
+    with open(output_path, 'wb', buffering=buffer_size) as f:
+        for chunk in iter_cdr_chunks(num_records, base_time, np.random.default_rng(seed), chunk_records):
+            text = format_cdr_lines(chunk)
+            written += len(chunk.start)
+            if written == num_records:
+                # Как и generate_cdr_file, файл не заканчивается переводом строки
+                text = text[:-1]
+            f.write(text)
+
+    return output_path
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Для пакетной генерации CDR требуется пакет numpy")
+
+
+def _count_split_calls(num_records: int, rng: Any, chunk_records: int) -> int:
+    # Количество звонков через полночь, как в generate_cdr_arrays, без хранения всех событий
+    remaining = num_records
+    num_split = 0
+    while remaining > 0:
+        split = rng.random(min(chunk_records, remaining)) < SPLIT_CALL_PROBABILITY
+        filled = np.cumsum(1 + split)
+        last = int(np.searchsorted(filled, remaining))
+        if last < len(split):
+            split = split[:last + 1]
+            if filled[last] > remaining:
+                # На последнюю запись звонок через полночь не помещается
+                split[-1] = False
+            remaining = 0
+        else:
+            remaining -= int(filled[-1])
+        num_split += int(split.sum())
+    return num_split
+
+
+def _regular_calls(rng: Any, start: int, size: int) -> CdrArrays:
+    # Обычные звонки с общим временем начала
+    codes = np.array([int(code) for code in OPERATOR_CODES], dtype=np.int64)
+    call_type = rng.integers(1, 3, size, dtype=np.int8)
+    subscriber = _phone_numbers(rng, np.full(size, 900, dtype=np.int64))
+    other_contact = rng.random(size) < OTHER_OPERATOR_PROBABILITY
+    contact = _phone_numbers(rng, np.where(other_contact, codes[rng.integers(0, len(codes), size)], 900))
+    starts = np.full(size, start, dtype=np.int64)
+    ends = starts + rng.integers(MIN_DURATION, MAX_DURATION + 1, size) * MICROSECONDS
+    return CdrArrays(call_type, subscriber, contact, starts, ends)
+
+
+def _split_call_parts(key: int, index: int, size: int, kind: int,
+                      start: int, day_end: int, midnight: int) -> CdrArrays:
+    # Части звонков через полночь с номерами index, ..., index + size - 1:
+    # тип вызова, номера и окончание второй части вычисляются хешем номера звонка
+    codes = np.array([int(code) for code in OPERATOR_CODES], dtype=np.uint64)
+    calls = np.arange(index, index + size, dtype=np.uint64)
+    first_hash, second_hash = _mix64(calls, key), _mix64(calls, key ^ 0x5851F42D4C957F2D)
+
+    call_type = (first_hash % np.uint64(2) + np.uint64(1)).astype(np.int8)
+    subscriber_code = codes[(first_hash >> np.uint64(8)) % np.uint64(len(codes))]
+    contact_code = codes[(first_hash >> np.uint64(16)) % np.uint64(len(codes))]
+    subscriber = (7 * 10 ** 10 + subscriber_code.astype(np.int64) * 10 ** 7
+                  + ((first_hash >> np.uint64(24)) % np.uint64(10 ** 7)).astype(np.int64))
+    contact = (7 * 10 ** 10 + contact_code.astype(np.int64) * 10 ** 7
+               + (second_hash % np.uint64(10 ** 7)).astype(np.int64))
+    starts = np.full(size, start, dtype=np.int64)
+    if kind == _SPLIT_FIRST:
+        ends = np.full(size, day_end, dtype=np.int64)
+    else:
+        span = np.uint64(SPLIT_END_AFTER[1] - SPLIT_END_AFTER[0] + 1)
+        after = ((second_hash >> np.uint64(32)) % span).astype(np.int64) + SPLIT_END_AFTER[0]
+        ends = midnight + after * MICROSECONDS
+    return CdrArrays(call_type, subscriber, contact, starts, ends)
+
+
+def _mix64(values: Any, key: int) -> Any:
+    # Хеш splitmix64: независимые случайные 64-битные значения для каждого номера
+    values = values + np.uint64((key * 0x9E3779B97F4A7C15) & _MASK64)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _concatenate(parts: List[CdrArrays]) -> CdrArrays:
+    if len(parts) == 1:
+        return parts[0]
+    return CdrArrays(*(np.concatenate(columns) for columns in zip(*parts)))
+
+
+def _phone_numbers(rng: Any, operator_code: Any) -> Any:
+    # 7, код оператора и 7 случайных цифр
+    return 7 * 10 ** 10 + operator_code * 10 ** 7 + rng.integers(0, 10 ** 7, len(operator_code))
+
+
+def _put_digits(chars: Any, column: int, values: Any, width: int) -> None:
+    for position in range(width - 1, -1, -1):
+        chars[:, column + position] = values % 10 + ord('0')
+        values = values // 10
+
+
+@lru_cache(maxsize=None)
+def _digit_table(width: int) -> Any:
+    # Все числа из width цифр в виде строк символов: table[value] - цифры value
+    table = np.zeros((10 ** width, width), dtype=np.uint8)
+    _put_digits(table, 0, np.arange(10 ** width), width)
+    return table
+
+
+@lru_cache(maxsize=None)
+def _time_of_day_table() -> Any:
+    # HH:MM:SS для каждой секунды суток
+    seconds = np.arange(SECONDS_PER_DAY)
+    table = np.full((SECONDS_PER_DAY, 8), ord(':'), dtype=np.uint8)
+    _put_digits(table, 0, seconds // 3600, 2)
+    _put_digits(table, 3, seconds // 60 % 60, 2)
+    _put_digits(table, 6, seconds % 60, 2)
+    return table
+
+
+def _put_phone_numbers(chars: Any, column: int, numbers: Any) -> None:
+    # Номер из 11 цифр: 3 старшие цифры и две группы по 4 цифры из таблицы
+    table = _digit_table(4)
+    chars[:, column:column + 3] = table[numbers // 10 ** 8, 1:]
+    chars[:, column + 3:column + 7] = table[numbers // 10 ** 4 % 10 ** 4]
+    chars[:, column + 7:column + 11] = table[numbers % 10 ** 4]
+
+
+def _date_chars(days: Any) -> Any:
+    # YYYY-MM-DD для каждого номера дня от начала эпохи
+    year, month, day = _civil_from_days(days)
+    chars = np.full((len(days), 10), ord('-'), dtype=np.uint8)
+    _put_digits(chars, 0, year, 4)
+    _put_digits(chars, 5, month, 2)
+    _put_digits(chars, 8, day, 2)
+    return chars
+
+
+def _put_timestamps(chars: Any, column: int, microseconds: Any) -> None:
+    # YYYY-MM-DDTHH:MM:SS и доли секунды (.ffffff), если они есть
+    seconds, fraction = np.divmod(microseconds, MICROSECONDS)
+    days, seconds = np.divmod(seconds, SECONDS_PER_DAY)
+
+    if len(days):
+        first, last = int(days.min()), int(days.max())
+        if last - first < len(days):
+            # Записи файла укладываются в несколько дней: даты форматируются один раз на день
+            chars[:, column:column + 10] = _date_chars(np.arange(first, last + 1))[days - first]
+        else:
+            chars[:, column:column + 10] = _date_chars(days)
+    chars[:, column + 10] = ord('T')
+    chars[:, column + 11:column + _TIMESTAMP_WIDTH] = _time_of_day_table()[seconds]
+
+    rows = np.flatnonzero(fraction)
+    if len(rows):
+        fraction_column = column + _TIMESTAMP_WIDTH
+        chars[rows, fraction_column] = ord('.')
+        fraction_chars = np.zeros((len(rows), _FRACTION_WIDTH - 1), dtype=np.uint8)
+        _put_digits(fraction_chars, 0, fraction[rows], _FRACTION_WIDTH - 1)
+        chars[rows, fraction_column + 1:fraction_column + _FRACTION_WIDTH] = fraction_chars
+
+
+def _civil_from_days(days: Any) -> Any:
+    # Год, месяц и день по номеру дня от начала эпохи (пролептический григорианский календарь)
+    shifted = days + 719468
+    era = shifted // 146097
+    day_of_era = shifted - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    month_index = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * month_index + 2) // 5 + 1
+    month = np.where(month_index < 10, month_index + 3, month_index - 9)
+    year = year_of_era + era * 400 + (month <= 2)
+    return year, month, day